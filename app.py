@@ -1,13 +1,21 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import requests
-import os
-from dotenv import load_dotenv
+import pandas as pd
+import altair as alt
+import time
 from datetime import datetime
 import json
+from vnforecast import config, forecast_frame, heap, history, overview, styles, units, weather_api
+from vnforecast.fragments import fragment_cache
+from vnforecast.json_api import json_api
+from vnforecast.metrics import render_metrics
+from vnforecast.breaker import CLOSED, weather_breaker
+from vnforecast.quota import quota_limiter
+from vnforecast.weather_cache import response_cache
+from vnforecast.provinces import VIETNAMESE_PROVINCES, POPULAR_PROVINCES
+from vnforecast.search import search_provinces
 # Force redeploy
-# update check: dotenv load fix
-load_dotenv()
-WEATHER_API_KEY = os.getenv("WEATHER_API_KEY")
 
 # Language translations
 TRANSLATIONS = {
@@ -16,6 +24,11 @@ TRANSLATIONS = {
         "subtitle": "Real-time weather for all 63 provinces",
         "search_placeholder": "Search for a province...",
         "search_label": "Search provinces",
+        "search_query": "Find a province",
+        "search_query_placeholder": "Type a name, city or abbreviation: da nang, hcm, sa pa...",
+        "no_matches": "No province matches \"{query}\"",
+        "stale_data": "WeatherAPI is not responding. Showing the last data received, {age} old.",
+        "near_me": "Near me",
         "loading": "Getting weather data for",
         "loading_forecast": "Loading hourly forecast...",
         "feels_like": "FEELS LIKE",
@@ -27,7 +40,7 @@ TRANSLATIONS = {
         "air_quality": "AIR QUALITY",
         "weather_details": "WEATHER DETAILS",
         "comfort_index": "COMFORT INDEX",
-        "hourly_forecast": "24-HOUR FORECAST",
+        "hourly_forecast": "{hours}-HOUR FORECAST",
         "daily_forecast": "3-DAY FORECAST",
         "weather_alerts": "WEATHER ALERTS",
         "popular_destinations": "POPULAR DESTINATIONS",
@@ -57,6 +70,8 @@ TRANSLATIONS = {
         "refresh_interval": "Refresh Interval",
         "show_alerts": "Show Weather Alerts",
         "show_forecast": "Show Extended Forecast",
+        "hourly_horizon": "Hourly Forecast Range",
+        "hours": "hours",
         "celsius": "Celsius (°C)",
         "fahrenheit": "Fahrenheit (°F)",
         "kmh": "km/h",
@@ -65,13 +80,41 @@ TRANSLATIONS = {
         "inhg": "inHg",
         "minutes": "minutes",
         "enabled": "Enabled",
-        "disabled": "Disabled"
+        "disabled": "Disabled",
+        "view": "View",
+        "province_view": "Province",
+        "nationwide_view": "Nationwide",
+        "nationwide_overview": "NATIONWIDE OVERVIEW",
+        "province": "Province",
+        "temperature": "Temperature",
+        "condition": "Condition",
+        "alerts": "Alerts",
+        "status": "Status",
+        "loaded_in": "Loaded {count} provinces in {seconds:.1f}s",
+        "show_history": "Show History",
+        "history": "HISTORY",
+        "history_range": "History range",
+        "no_history": "No local history for this period yet. It builds up as observations are fetched.",
+        "rain": "Rain (mm)",
+        "rain_next_24h": "Rain chance, next 24h (%)",
+        "performance": "🛠️ Performance",
+        "rerun_total": "This rerun: {ms:.1f} ms",
+        "cache_summary": "Cache hit rate {hit_rate:.0f}% · {size} entries · {upstream} upstream calls",
+        "fragment_summary": "HTML fragments: hit rate {hit_rate:.0f}% · {size} cached · {evictions} evicted",
+        "quota_summary": "API budget {used:,}/{budget:,} this month · {rate:.0f} calls/h · runs out {exhaustion} · TTL ×{stretch:.1f}",
+        "quota_not_this_month": "after month end",
+        "breaker_summary": "WeatherAPI breaker {state} · opened {opened}× · {rejected} calls skipped · {fallbacks} stale fallbacks"
     },
     "vi": {
         "title": "Thời Tiết Việt Nam",
         "subtitle": "Dữ liệu thời tiết thời gian thực cho 63 tỉnh thành",
         "search_placeholder": "Tìm kiếm tỉnh thành...",
         "search_label": "Tìm kiếm tỉnh thành",
+        "search_query": "Tìm tỉnh thành",
+        "search_query_placeholder": "Nhập tên, thành phố hoặc viết tắt: da nang, hcm, sa pa...",
+        "no_matches": "Không có tỉnh thành nào khớp với \"{query}\"",
+        "stale_data": "WeatherAPI không phản hồi. Đang hiển thị dữ liệu nhận được gần nhất, cách đây {age}.",
+        "near_me": "Gần tôi",
         "loading": "Đang tải dữ liệu thời tiết cho",
         "loading_forecast": "Đang tải dự báo theo giờ...",
         "feels_like": "CẢM GIÁC NHƯ",
@@ -83,7 +126,7 @@ TRANSLATIONS = {
         "air_quality": "CHẤT LƯỢNG KHÔNG KHÍ",
         "weather_details": "CHI TIẾT THỜI TIẾT",
         "comfort_index": "CHỈ SỐ THOẢI MÁI",
-        "hourly_forecast": "DỰ BÁO 24 GIỜ",
+        "hourly_forecast": "DỰ BÁO {hours} GIỜ",
         "daily_forecast": "DỰ BÁO 3 NGÀY",
         "weather_alerts": "CẢNH BÁO THỜI TIẾT",
         "popular_destinations": "ĐIỂM ĐẾN PHỔ BIẾN",
@@ -113,6 +156,8 @@ TRANSLATIONS = {
         "refresh_interval": "Thời gian làm mới",
         "show_alerts": "Hiển thị cảnh báo thời tiết",
         "show_forecast": "Hiển thị dự báo mở rộng",
+        "hourly_horizon": "Khoảng dự báo theo giờ",
+        "hours": "giờ",
         "celsius": "Độ C (°C)",
         "fahrenheit": "Độ F (°F)",
         "kmh": "km/h",
@@ -121,7 +166,30 @@ TRANSLATIONS = {
         "inhg": "inHg",
         "minutes": "phút",
         "enabled": "Bật",
-        "disabled": "Tắt"
+        "disabled": "Tắt",
+        "view": "Chế độ xem",
+        "province_view": "Tỉnh thành",
+        "nationwide_view": "Toàn quốc",
+        "nationwide_overview": "TỔNG QUAN TOÀN QUỐC",
+        "province": "Tỉnh thành",
+        "temperature": "Nhiệt độ",
+        "condition": "Thời tiết",
+        "alerts": "Cảnh báo",
+        "status": "Trạng thái",
+        "loaded_in": "Đã tải {count} tỉnh thành trong {seconds:.1f} giây",
+        "show_history": "Hiển thị lịch sử",
+        "history": "LỊCH SỬ",
+        "history_range": "Khoảng thời gian",
+        "no_history": "Chưa có dữ liệu lịch sử cho khoảng thời gian này. Dữ liệu sẽ được tích lũy dần khi cập nhật thời tiết.",
+        "rain": "Lượng mưa (mm)",
+        "rain_next_24h": "Khả năng mưa 24 giờ tới (%)",
+        "performance": "🛠️ Hiệu năng",
+        "rerun_total": "Lần chạy này: {ms:.1f} ms",
+        "cache_summary": "Tỷ lệ trúng bộ đệm {hit_rate:.0f}% · {size} mục · {upstream} lần gọi API",
+        "fragment_summary": "Đoạn HTML: tỷ lệ trúng {hit_rate:.0f}% · {size} đã lưu · {evictions} đã loại bỏ",
+        "quota_summary": "Hạn mức API {used:,}/{budget:,} tháng này · {rate:.0f} lần gọi/giờ · hết vào {exhaustion} · TTL ×{stretch:.1f}",
+        "quota_not_this_month": "sau cuối tháng",
+        "breaker_summary": "Cầu dao WeatherAPI {state} · đã ngắt {opened} lần · bỏ qua {rejected} lần gọi · {fallbacks} lần dùng dữ liệu cũ"
     }
 }
 
@@ -147,83 +215,24 @@ st.markdown("""
 <meta name="theme-color" content="#1E3A8A">
 """, unsafe_allow_html=True)
 
-# Load environment variables
-WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "your_api_key_here")
-
-# Vietnamese provinces with coordinates for WeatherAPI
-VIETNAMESE_PROVINCES = {
-    "An Giang": "An Giang, Vietnam",
-    "Bà Rịa - Vũng Tàu": "Ba Ria, Vietnam",
-    "Bạc Liêu": "Bac Lieu, Vietnam",
-    "Bắc Giang": "Bac Giang, Vietnam",
-    "Bắc Kạn": "Bac Kan, Vietnam",
-    "Bắc Ninh": "Bac Ninh, Vietnam",
-    "Bến Tre": "Ben Tre, Vietnam",
-    "Bình Dương": "Binh Duong, Vietnam",
-    "Bình Định": "Binh Dinh, Vietnam",
-    "Bình Phước": "Binh Phuoc, Vietnam",
-    "Bình Thuận": "Binh Thuan, Vietnam",
-    "Cà Mau": "Ca Mau, Vietnam",
-    "Cần Thơ": "Can Tho, Vietnam",
-    "Cao Bằng": "Cao Bang, Vietnam",
-    "Đà Nẵng": "Da Nang, Vietnam",
-    "Đắk Lắk": "Dak Lak, Vietnam",
-    "Đắk Nông": "Dak Nong, Vietnam",
-    "Điện Biên": "Dien Bien, Vietnam",
-    "Đồng Nai": "Dong Nai, Vietnam",
-    "Đồng Tháp": "Dong Thap, Vietnam",
-    "Gia Lai": "Gia Lai, Vietnam",
-    "Hà Giang": "Ha Giang, Vietnam",
-    "Hà Nam": "Ha Nam, Vietnam",
-    "Hà Nội": "Hanoi, Vietnam",
-    "Hà Tĩnh": "Ha Tinh, Vietnam",
-    "Hải Dương": "Hai Duong, Vietnam",
-    "Hải Phòng": "Hai Phong, Vietnam",
-    "Hậu Giang": "Hau Giang, Vietnam",
-    "Hòa Bình": "Hoa Binh, Vietnam",
-    "Hưng Yên": "Hung Yen, Vietnam",
-    "Khánh Hòa": "Khanh Hoa, Vietnam",
-    "Kiên Giang": "Kien Giang, Vietnam",
-    "Kon Tum": "Kon Tum, Vietnam",
-    "Lai Châu": "Lai Chau, Vietnam",
-    "Lâm Đồng": "Lam Dong, Vietnam",
-    "Lạng Sơn": "Lang Son, Vietnam",
-    "Lào Cai": "Lao Cai, Vietnam",
-    "Long An": "Long An, Vietnam",
-    "Nam Định": "Nam Dinh, Vietnam",
-    "Nghệ An": "Nghe An, Vietnam",
-    "Ninh Bình": "Ninh Binh, Vietnam",
-    "Ninh Thuận": "Ninh Thuan, Vietnam",
-    "Phú Thọ": "Phu Tho, Vietnam",
-    "Phú Yên": "Phu Yen, Vietnam",
-    "Quảng Bình": "Quang Binh, Vietnam",
-    "Quảng Nam": "Quang Nam, Vietnam",
-    "Quảng Ngãi": "Quang Ngai, Vietnam",
-    "Quảng Ninh": "Quang Ninh, Vietnam",
-    "Quảng Trị": "Quang Tri, Vietnam",
-    "Sóc Trăng": "Soc Trang, Vietnam",
-    "Sơn La": "Son La, Vietnam",
-    "Tây Ninh": "Tay Ninh, Vietnam",
-    "Thái Bình": "Thai Binh, Vietnam",
-    "Thái Nguyên": "Thai Nguyen, Vietnam",
-    "Thanh Hóa": "Thanh Hoa, Vietnam",
-    "Thừa Thiên Huế": "Hue, Vietnam",
-    "Tiền Giang": "Tien Giang, Vietnam",
-    "TP. Hồ Chí Minh": "Ho Chi Minh City, Vietnam",
-    "Trà Vinh": "Tra Vinh, Vietnam",
-    "Tuyên Quang": "Tuyen Quang, Vietnam",
-    "Vĩnh Long": "Vinh Long, Vietnam",
-    "Vĩnh Phúc": "Vinh Phuc, Vietnam",
-    "Yên Bái": "Yen Bai, Vietnam"
-}
+# Keep every province warm in the shared cache (started once per server process)
+weather_api.start_prefetch()
+render_metrics.start_exporter(config.METRICS_HOST, config.METRICS_PORT)
+# JSON API for other services, answered from the same cache (off unless enabled)
+json_api.start(config.API_HOST, config.API_PORT)
+# Libraries and registries are loaded by now; keep them out of the full
+# collection Streamlit runs after every rerun and auto-refresh tick
+heap.freeze_startup_objects()
 
 def get_weather_data(location):
-    """Fetch current weather data from WeatherAPI.com"""
+    """Fetch current weather data from WeatherAPI.com (shared across sessions)
+
+    Current conditions come from the same combined forecast request that
+    get_forecast_data reads, so a page view costs one upstream call.
+    """
     try:
-        url = f"https://api.weatherapi.com/v1/current.json?key={WEATHER_API_KEY}&q={location}&aqi=yes"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        with render_metrics.fetch("current", location):
+            return weather_api.get_current(location)
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching weather data: {str(e)}")
         return None
@@ -231,13 +240,11 @@ def get_weather_data(location):
         st.error(f"Unexpected error: {str(e)}")
         return None
 
-def get_forecast_data(location, days=3):
-    """Fetch forecast data from WeatherAPI.com"""
+def get_forecast_data(location, days=None):
+    """Fetch forecast data from WeatherAPI.com (shared across sessions)"""
     try:
-        url = f"https://api.weatherapi.com/v1/forecast.json?key={WEATHER_API_KEY}&q={location}&days={days}&aqi=no&alerts=yes"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        with render_metrics.fetch("forecast", location):
+            return weather_api.get_forecast(location, days)
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching forecast data: {str(e)}")
         return None
@@ -245,6 +252,18 @@ def get_forecast_data(location, days=3):
         st.error(f"Unexpected error: {str(e)}")
         return None
 
+def served_stale():
+    """Whether this thread's last fetch returned old data because WeatherAPI is failing"""
+    outcome = response_cache.last_outcome()
+    return outcome == "fallback" or (outcome == "stale" and weather_breaker.state != CLOSED)
+
+def format_age(seconds, language):
+    """Age like "45 minutes" or "3 hours 20 minutes" """
+    minutes = max(int(seconds) // 60, 0)
+    if minutes < 60:
+        return f"{minutes} {get_text('minutes', language)}"
+    return f"{minutes // 60} {get_text('hours', language)} {minutes % 60} {get_text('minutes', language)}"
+
 def get_weather_icon_url(icon_code):
     """Get weather icon URL from WeatherAPI"""
     return f"https:{icon_code}" if icon_code.startswith('//') else icon_code
@@ -257,115 +276,556 @@ def format_time(time_str):
     except:
         return time_str
 
-def get_weather_gradient(condition, temp_c):
-    """Get dynamic background gradient based on weather condition and temperature"""
-    condition_lower = condition.lower()
+def get_weather_gradient(condition, is_day, temp_c):
+    """Get the background gradient class for a weather condition and temperature (defined in vnforecast/dashboard.css)"""
+    return styles.gradient_class(styles.condition_style(condition.code, is_day, condition.text), temp_c)
+
+def get_weather_animation(condition, is_day):
+    """Get the animation class for a weather condition (defined in vnforecast/dashboard.css)"""
+    return styles.condition_style(condition.code, is_day, condition.text).animation
+
+def get_text(key, lang="en"):
+    """Get translated text based on selected language"""
+    return TRANSLATIONS[lang].get(key, TRANSLATIONS["en"].get(key, key))
+
+def format_value(value, spec, suffix=""):
+    """Format a converted value, or N/A when the provider omitted it"""
+    return "N/A" if value is None else f"{value:{spec}}{suffix}"
+
+def section_title_html(title):
+    """HTML for a small grey section heading"""
+    return f'<div style="margin-top: 2rem;"><div style="color: #666; font-size: 0.9rem; margin-bottom: 1rem;">{title}</div></div>'
+
+def join_html(fragments):
+    """Join HTML fragments into one markdown-safe block (no blank or indented lines)"""
+    return "\n".join(line.strip() for fragment in fragments for line in fragment.splitlines() if line.strip())
+
+def build_weather_card(current, location_info, unit_system):
+    """HTML for the dynamic weather card"""
+    gradient = get_weather_gradient(current.condition, current.is_day, current.temp_c)
+    values = forecast_frame.current_values(current, unit_system)
+    temp_display = values['temp']
+    temp_unit_symbol = unit_system.symbol("temperature")
+    high = temp_display + units.convert_delta(3, "temperature", unit_system.temperature)
+    low = temp_display - units.convert_delta(5, "temperature", unit_system.temperature)
+    return f"""
+    <div class="dynamic-weather-card {gradient} weather-animation {get_weather_animation(current.condition, current.is_day)} fade-in">
+        <div class="location-text">
+            {location_info.name}, {location_info.region}
+        </div>
+        <div class="temp-display">
+            <img src="{get_weather_icon_url(current.condition.icon)}" class="weather-icon-large" style="margin-bottom: 1rem;">
+            <div class="main-temp">{temp_display:.0f}{temp_unit_symbol}</div>
+            <div class="condition-text">{current.condition.text}</div>
+            <div style="color: rgba(255, 255, 255, 0.7); margin-top: 0.5rem; font-size: 1rem;">
+                H:{high:.0f}{temp_unit_symbol} L:{low:.0f}{temp_unit_symbol}
+            </div>
+        </div>
+    </div>
+    """
+
+def build_metric_cards(current, language, unit_system):
+    """HTML for the six metric cards, in grid order"""
+    values = forecast_frame.current_values(current, unit_system)
+    temp_unit_symbol = unit_system.symbol("temperature")
+    feels_like_display = values['feelslike']
+    wind_display = values['wind']
+    wind_unit_label = get_text(unit_system.wind, language)
+    pressure_display = values['pressure']
+    pressure_unit_label = get_text(unit_system.pressure, language)
+    return [
+        f"""
+        <div class="metric-card">
+            <div style="color: #666; font-size: 0.9rem; margin-bottom: 0.5rem;">{get_text("feels_like", language)}</div>
+            <div style="font-size: 2rem; font-weight: 300;">{feels_like_display:.0f}{temp_unit_symbol}</div>
+        </div>
+        """,
+        f"""
+        <div class="metric-card">
+            <div style="color: #666; font-size: 0.9rem; margin-bottom: 0.5rem;">{get_text("humidity", language)}</div>
+            <div style="font-size: 2rem; font-weight: 300;">{current.humidity}%</div>
+        </div>
+        """,
+        f"""
+        <div class="metric-card">
+            <div style="color: #666; font-size: 0.9rem; margin-bottom: 0.5rem;">{get_text("wind", language)}</div>
+            <div style="font-size: 2rem; font-weight: 300;">{wind_display:.0f}</div>
+            <div style="color: #999; font-size: 0.8rem;">{wind_unit_label} {current.wind_dir}</div>
+        </div>
+        """,
+        f"""
+        <div class="metric-card">
+            <div style="color: #666; font-size: 0.9rem; margin-bottom: 0.5rem;">{get_text("pressure", language)}</div>
+            <div style="font-size: 2rem; font-weight: 300;">{pressure_display:.1f}</div>
+            <div style="color: #999; font-size: 0.8rem;">{pressure_unit_label}</div>
+        </div>
+        """,
+        f"""
+        <div class="metric-card">
+            <div style="color: #666; font-size: 0.9rem; margin-bottom: 0.5rem;">{get_text("visibility", language)}</div>
+            <div style="font-size: 2rem; font-weight: 300;">{current.vis_km}</div>
+            <div style="color: #999; font-size: 0.8rem;">km</div>
+        </div>
+        """,
+        f"""
+        <div class="metric-card">
+            <div style="color: #666; font-size: 0.9rem; margin-bottom: 0.5rem;">{get_text("uv_index", language)}</div>
+            <div style="font-size: 2rem; font-weight: 300;">{current.uv}</div>
+        </div>
+        """,
+    ]
+
+def build_detail_cards(current, location_info, language, unit_system):
+    """HTML for the air quality card (weather details without AQI data) and the comfort card"""
+    if current.air_quality is not None:
+        aqi = current.air_quality
+        aqi_value = aqi.us_epa_index or 0
+        aqi_levels = ["Good", "Moderate", "Unhealthy for Sensitive", "Unhealthy", "Very Unhealthy", "Hazardous"]
+        aqi_level = aqi_levels[min(aqi_value - 1, 5)] if aqi_value > 0 else "N/A"
+        aqi_colors = ["#00E400", "#FFFF00", "#FF7E00", "#FF0000", "#8F3F97", "#7E0023"]
+        aqi_color = aqi_colors[min(aqi_value - 1, 5)] if aqi_value > 0 else "#999"
+        
+        details_html = f"""
+        <div class="metric-card" style="text-align: left; padding: 1.5rem;">
+            <div style="color: #666; font-size: 0.9rem; margin-bottom: 1rem;">AIR QUALITY</div>
+            <div style="font-size: 2rem; font-weight: 300; color: {aqi_color}; margin-bottom: 0.5rem;">{aqi_value}</div>
+            <div style="color: {aqi_color}; font-weight: 500;">{aqi_level}</div>
+            <div style="margin-top: 1rem; font-size: 0.8rem; color: #666;">
+                CO: {aqi.co or 0:.1f} μg/m³<br>
+                NO₂: {aqi.no2 or 0:.1f} μg/m³<br>
+                PM2.5: {aqi.pm2_5 or 0:.1f} μg/m³
+            </div>
+        </div>
+        """
+    else:
+        details_html = f"""
+        <div class="metric-card" style="text-align: left; padding: 1.5rem;">
+            <div style="color: #666; font-size: 0.9rem; margin-bottom: 1rem;">WEATHER DETAILS</div>
+            <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; font-size: 0.9rem;">
+                <div><strong>Cloud Cover:</strong> {current.cloud}%</div>
+                <div><strong>Precipitation:</strong> {current.precip_mm} mm</div>
+                <div><strong>Local Time:</strong> {location_info.localtime.split()[1]}</div>
+                <div><strong>Timezone:</strong> {location_info.tz_id.split('/')[-1]}</div>
+            </div>
+        </div>
+        """
     
-    # Temperature-based color intensity
-    temp_intensity = min(max((temp_c - 10) / 30, 0), 1)  # 0-1 scale based on temp
+    values = forecast_frame.current_values(current, unit_system)
+    temp_unit_symbol = unit_system.symbol("temperature")
+    comfort_html = f"""
+    <div class="metric-card" style="text-align: left; padding: 1.5rem;">
+        <div style="color: #666; font-size: 0.9rem; margin-bottom: 1rem;">COMFORT INDEX</div>
+        <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; font-size: 0.9rem;">
+            <div><strong>Heat Index:</strong> {format_value(values['feelslike'], '.1f', temp_unit_symbol)}</div>
+            <div><strong>Wind Chill:</strong> {format_value(values['windchill'], '.1f', temp_unit_symbol)}</div>
+            <div><strong>Wind Gust:</strong> {format_value(values['gust'], '.1f', ' ' + get_text(unit_system.wind, language))}</div>
+            <div><strong>Dew Point:</strong> {format_value(values['dewpoint'], '.1f', temp_unit_symbol)}</div>
+        </div>
+    </div>
+    """
+    return details_html, comfort_html
+
+def build_current_block(current, location_info, language, unit_system):
+    """Weather card, metrics grid and detail cards as a single HTML block"""
+    return join_html(
+        [build_weather_card(current, location_info, unit_system), '<div class="metrics-grid">']
+        + build_metric_cards(current, language, unit_system)
+        + ['</div>', '<div class="details-grid">']
+        + list(build_detail_cards(current, location_info, language, unit_system))
+        + ['</div>']
+    )
+
+def build_hourly_items(forecast_data, hour_start, horizon, language, unit_system):
+    """HTML for the forecast hours from the one starting at hour_start, up to horizon hours"""
+    hourly, _ = forecast_frame.frames(forecast_data, unit_system)
+    window = forecast_frame.next_hours(hourly, hour_start, horizon)
+    temp_unit_symbol = unit_system.symbol("temperature")
     
-    if any(word in condition_lower for word in ['sunny', 'clear']):
-        if temp_c > 25:
-            return "linear-gradient(135deg, #FFD700 0%, #FFA500 50%, #FF6B35 100%)"
-        else:
-            return "linear-gradient(135deg, #87CEEB 0%, #FFD700 50%, #FFA500 100%)"
-    elif any(word in condition_lower for word in ['rain', 'drizzle', 'shower']):
-        return "linear-gradient(135deg, #4682B4 0%, #5F9EA0 50%, #708090 100%)"
-    elif any(word in condition_lower for word in ['cloud', 'overcast']):
-        return "linear-gradient(135deg, #B0C4DE 0%, #D3D3D3 50%, #A9A9A9 100%)"
-    elif any(word in condition_lower for word in ['fog', 'mist']):
-        return "linear-gradient(135deg, #F5F5F5 0%, #E0E0E0 50%, #D3D3D3 100%)"
-    elif any(word in condition_lower for word in ['snow']):
-        return "linear-gradient(135deg, #F0F8FF 0%, #E6E6FA 50%, #D8BFD8 100%)"
-    elif any(word in condition_lower for word in ['thunder', 'storm']):
-        return "linear-gradient(135deg, #2F4F4F 0%, #696969 50%, #808080 100%)"
-    else:
-        # Default gradient based on temperature
-        if temp_c > 30:
-            return "linear-gradient(135deg, #FF6B35 0%, #F7931E 50%, #FFD700 100%)"
-        elif temp_c > 20:
-            return "linear-gradient(135deg, #87CEEB 0%, #98FB98 50%, #FFD700 100%)"
+    labels = window["time"].str[11:16].tolist()
+    if labels and window["time_epoch"].iat[0] == hour_start:
+        labels[0] = get_text("now", language)
+    return [f"""
+    <div class="hourly-item">
+        <div style="font-size: 0.8rem; color: #666; margin-bottom: 0.5rem;">{label}</div>
+        <img src="{get_weather_icon_url(icon)}" width="40" style="margin: 0.5rem 0;">
+        <div style="font-weight: 500;">{temp:.0f}{temp_unit_symbol}</div>
+        <div style="font-size: 0.7rem; color: #999; margin-top: 0.3rem;">{rain:.0f}%</div>
+    </div>
+    """ for label, icon, temp, rain in zip(labels, window["condition_icon"], window["temp"], window["chance_of_rain"])]
+
+def build_alert_card(alert):
+    """HTML for one weather alert"""
+    return f"""
+    <div style="background: linear-gradient(135deg, #FF6B35 0%, #F7931E 100%); 
+                color: white; padding: 1.5rem; border-radius: 15px; margin: 1rem 0;
+                box-shadow: 0 4px 15px rgba(255, 107, 53, 0.3);">
+        <div style="font-weight: 600; margin-bottom: 0.5rem;">⚠️ {alert.headline}</div>
+        <div style="font-size: 0.9rem; opacity: 0.9;">{alert.desc}</div>
+        <div style="font-size: 0.8rem; margin-top: 0.5rem; opacity: 0.8;">
+            Effective: {alert.effective} - {alert.expires}
+        </div>
+    </div>
+    """
+
+def build_daily_cards(forecast_data, language, unit_system):
+    """HTML for one card per forecast day"""
+    _, daily = forecast_frame.frames(forecast_data, unit_system)
+    temp_unit_symbol = unit_system.symbol("temperature")
+    wind_unit_label = get_text(unit_system.wind, language)
+    
+    cards = []
+    for i, day in enumerate(daily.itertuples(index=False)):
+        date_obj = datetime.strptime(day.date, '%Y-%m-%d')
+        day_name = get_text("today", language) if i == 0 else date_obj.strftime('%A')
+        date_str = date_obj.strftime('%b %d')
+        
+        cards.append(f"""
+        <div class="metric-card" style="padding: 1.5rem; margin: 0.5rem 0;">
+            <div style="display: flex; align-items: center; justify-content: space-between;">
+                <div style="flex: 1;">
+                    <div style="font-weight: 500; margin-bottom: 0.2rem;">{day_name}</div>
+                    <div style="color: #666; font-size: 0.9rem;">{date_str}</div>
+                </div>
+                <div style="flex: 1; text-align: center;">
+                    <img src="{get_weather_icon_url(day.condition_icon)}" width="50">
+                    <div style="font-size: 0.8rem; color: #666; margin-top: 0.2rem;">{day.avg_chance_of_rain:.0f}%</div>
+                </div>
+                <div style="flex: 1; text-align: right;">
+                    <div style="font-weight: 500;">{day.maxtemp:.0f}{temp_unit_symbol}</div>
+                    <div style="color: #666;">{day.mintemp:.0f}{temp_unit_symbol}</div>
+                </div>
+            </div>
+            <div style="margin-top: 1rem; padding-top: 1rem; border-top: 1px solid #eee; font-size: 0.8rem; color: #666;">
+                {day.condition_text} • UV Index: {day.uv} • Max Wind: {day.maxwind:.0f} {wind_unit_label}
+            </div>
+        </div>
+        """)
+    return cards
+
+def build_near_me_button(input_label, button_label):
+    """Button that puts the browser's "lat,lon" into the search box labelled input_label
+
+    The search resolves coordinates to the nearest province locally, so no
+    geocoding request is made.
+    """
+    return f"""
+    <button id="near-me" style="width: 100%; padding: 0.45rem; border: 1px solid #ddd; border-radius: 10px;
+            background: white; color: #333; font-size: 0.9rem; cursor: pointer;">📍 {button_label}</button>
+    <script>
+    document.getElementById("near-me").onclick = function() {{
+        navigator.geolocation.getCurrentPosition(function(position) {{
+            var parent = window.parent;
+            var input = parent.document.querySelector('input[aria-label={json.dumps(input_label)}]');
+            if (!input) return;
+            var setValue = Object.getOwnPropertyDescriptor(parent.HTMLInputElement.prototype, "value").set;
+            input.focus();
+            setValue.call(input, position.coords.latitude.toFixed(4) + "," + position.coords.longitude.toFixed(4));
+            input.dispatchEvent(new Event("input", {{bubbles: true}}));
+            input.dispatchEvent(new KeyboardEvent("keydown", {{key: "Enter", code: "Enter", keyCode: 13, bubbles: true}}));
+            input.dispatchEvent(new KeyboardEvent("keypress", {{key: "Enter", code: "Enter", keyCode: 13, charCode: 13, bubbles: true}}));
+            input.blur();
+        }});
+    }};
+    </script>
+    """
+
+def inject_styles():
+    """Add the dashboard stylesheet to the browser page once per session"""
+    if st.session_state.get("stylesheet_hash") != styles.STYLESHEET_HASH:
+        components.html(styles.injector_html(), height=0)
+        st.session_state.stylesheet_hash = styles.STYLESHEET_HASH
+
+def render_nationwide_overview(language, unit_system):
+    """Fetch every province concurrently and stream rows into a sortable table"""
+    st.markdown(f'<div style="margin-top: 1rem;"><div style="color: #666; font-size: 0.9rem; margin-bottom: 1rem;">{get_text("nationwide_overview", language)}</div></div>', unsafe_allow_html=True)
+
+    temp_unit_symbol = unit_system.symbol("temperature")
+    columns = {
+        "province": get_text("province", language),
+        "temp": f'{get_text("temperature", language)} ({temp_unit_symbol})',
+        "humidity": f'{get_text("humidity", language).capitalize()} (%)',
+        "wind": f'{get_text("wind", language).capitalize()} ({get_text(unit_system.wind, language)})',
+        "aqi": "AQI",
+        "rain_24h": get_text("rain_next_24h", language),
+        "alerts": get_text("alerts", language),
+        "condition": get_text("condition", language),
+        "status": get_text("status", language),
+    }
+    table = st.empty()
+    caption = st.empty()
+    rows = []
+    started = time.perf_counter()
+    last_draw = 0.0
+    now = int(time.time())
+
+    for province, views, error in overview.iter_views(VIETNAMESE_PROVINCES):
+        if error is not None:
+            rows.append({"province": province, "status": f"⚠️ {error}"})
         else:
-            return "linear-gradient(135deg, #B0E0E6 0%, #87CEEB 50%, #ADD8E6 100%)"
+            current = views["current"].current
+            values = forecast_frame.current_values(current, unit_system)
+            hourly, _ = forecast_frame.frames(views["current"])
+            rows.append({
+                "province": province,
+                "temp": round(values["temp"], 1),
+                "humidity": current.humidity,
+                "wind": round(values["wind"], 1),
+                "aqi": current.air_quality.us_epa_index if current.air_quality is not None else None,
+                "rain_24h": forecast_frame.window_summary(hourly, now, 24)["max_chance_of_rain"],
+                "alerts": len(views["alerts"]),
+                "condition": current.condition.text,
+                "status": "✓",
+            })
+        # Redraw at most a few times per second while rows stream in
+        if time.perf_counter() - last_draw > 0.2:
+            table.dataframe(pd.DataFrame(rows, columns=list(columns)).rename(columns=columns), hide_index=True, use_container_width=True)
+            last_draw = time.perf_counter()
+
+    order = {name: i for i, name in enumerate(VIETNAMESE_PROVINCES)}
+    rows.sort(key=lambda row: order[row["province"]])
+    table.dataframe(pd.DataFrame(rows, columns=list(columns)).rename(columns=columns), hide_index=True, use_container_width=True)
+    caption.caption(get_text("loaded_in", language).format(count=len(rows), seconds=time.perf_counter() - started))
 
-def get_weather_animation(condition):
-    """Get CSS animation based on weather condition"""
-    condition_lower = condition.lower()
+def render_history_panel(province, language, temp_unit):
+    """Charts of locally stored observations for the province, downsampled per bucket"""
+    st.markdown(f'<div style="margin-top: 2rem;"><div style="color: #666; font-size: 0.9rem; margin-bottom: 1rem;">{get_text("history", language)}</div></div>', unsafe_allow_html=True)
     
-    if any(word in condition_lower for word in ['sunny', 'clear']):
-        return """
-        @keyframes sunGlow {
-            0%, 100% { box-shadow: 0 0 20px rgba(255, 215, 0, 0.8); }
-            50% { box-shadow: 0 0 40px rgba(255, 215, 0, 1), 0 0 60px rgba(255, 165, 0, 0.8); }
-        }
-        .weather-animation { animation: sunGlow 3s ease-in-out infinite; }
-        """
-    elif any(word in condition_lower for word in ['rain', 'drizzle']):
-        return """
-        @keyframes rainDrop {
-            0% { transform: translateY(-10px); opacity: 0; }
-            50% { opacity: 1; }
-            100% { transform: translateY(10px); opacity: 0; }
-        }
-        .weather-animation::before {
-            content: '💧 💧 💧';
-            position: absolute;
-            top: -20px;
-            left: 50%;
-            transform: translateX(-50%);
-            animation: rainDrop 2s ease-in-out infinite;
-        }
-        """
-    elif any(word in condition_lower for word in ['cloud']):
-        return """
-        @keyframes cloudFloat {
-            0%, 100% { transform: translateX(-5px); }
-            50% { transform: translateX(5px); }
-        }
-        .weather-animation { animation: cloudFloat 4s ease-in-out infinite; }
-        """
-    elif any(word in condition_lower for word in ['thunder', 'storm']):
-        return """
-        @keyframes lightning {
-            0%, 90%, 100% { opacity: 1; }
-            95% { opacity: 0.7; box-shadow: 0 0 50px rgba(255, 255, 255, 0.9); }
-        }
-        .weather-animation { animation: lightning 3s ease-in-out infinite; }
-        """
-    else:
-        return """
-        @keyframes gentle {
-            0%, 100% { transform: scale(1); }
-            50% { transform: scale(1.02); }
-        }
-        .weather-animation { animation: gentle 4s ease-in-out infinite; }
-        """
+    range_key = st.radio(
+        get_text("history_range", language),
+        options=list(history.RANGES),
+        horizontal=True,
+        label_visibility="collapsed"
+    )
+    frame = history.load_history(province, range_key)
+    if frame.empty:
+        st.info(get_text("no_history", language))
+        return
+    
+    temp_unit_symbol = units.TEMPERATURE[temp_unit][2]
+    for column in ("temp_c_min", "temp_c_mean", "temp_c_max"):
+        frame[column] = units.convert(frame[column], "temperature", temp_unit)
+    
+    charts = [
+        ("temp_c", f'{get_text("temperature", language)} ({temp_unit_symbol})', "#FF6B35"),
+        ("humidity", f'{get_text("humidity", language).capitalize()} (%)', "#4682B4"),
+        ("precip_mm", get_text("rain", language), "#5F9EA0"),
+        ("pm2_5", "PM2.5 (μg/m³)", "#8F3F97"),
+    ]
+    columns = st.columns(2)
+    for i, (metric, title, color) in enumerate(charts):
+        base = alt.Chart(frame).encode(x=alt.X("time:T", title=None))
+        band = base.mark_area(opacity=0.2, color=color).encode(
+            y=alt.Y(f"{metric}_min:Q", title=title, scale=alt.Scale(zero=False)),
+            y2=f"{metric}_max:Q"
+        )
+        line = base.mark_line(color=color).encode(y=f"{metric}_mean:Q")
+        with columns[i % 2]:
+            st.altair_chart((band + line).properties(height=180), use_container_width=True)
 
-def get_text(key, lang="en"):
-    """Get translated text based on selected language"""
-    return TRANSLATIONS[lang].get(key, TRANSLATIONS["en"].get(key, key))
+def render_live_sections(slots, selected_province, location, language, unit_system,
+                         show_forecast, show_alerts, hourly_horizon):
+    """Draw current conditions, hourly strip, alerts and daily list into the full run's placeholders
 
-def convert_temperature(temp_c, unit):
-    """Convert temperature between Celsius and Fahrenheit"""
-    if unit == "fahrenheit":
-        return (temp_c * 9/5) + 32
-    return temp_c
+    Called as a fragment, so auto refresh reruns only this function on a
+    timer. A timer run that finds the observation and hour already on screen
+    returns without sending anything; the placeholders belong to the full
+    run and keep their content.
+    """
+    drawn = st.session_state.get("live_sections_drawn")
+    if drawn is None:
+        with st.spinner(f"{get_text('loading', language)} {selected_province}..."):
+            weather_data = get_weather_data(location)
+    else:
+        # A timer run: this session's own page has not been rerun since the last draw
+        render_metrics.start_run()
+        weather_data = get_weather_data(location)
+    
+    if not weather_data:
+        slots["current"].error("Unable to fetch weather data. Please check your internet connection and try again.")
+        st.session_state.live_sections_drawn = ()
+        return None
+    
+    stale = served_stale()
+    current = weather_data.current
+    location_info = weather_data.location
+    # Start of the current hour; Vietnam's UTC offset is a whole number of hours
+    hour_start = int(time.time()) // 3600 * 3600
+    if drawn == (selected_province, current.last_updated_epoch, hour_start, stale):
+        # Nothing new upstream: send nothing, the placeholders keep their content
+        return weather_data
+    st.session_state.live_sections_drawn = (selected_province, current.last_updated_epoch, hour_start, stale)
+    
+    # Rendered fragments are shared by every session viewing the same
+    # observation with the same language and units
+    fragment_key = (selected_province, current.last_updated_epoch, language) + unit_system
+    
+    with slots["current"].container():
+        if stale:
+            age = format_age(time.time() - current.last_updated_epoch, language)
+            st.warning(get_text("stale_data", language).format(age=age))
+        if config.RENDER_MODE == "consolidated":
+            # Weather card, metrics grid and detail cards as one element
+            with render_metrics.section("current_block"):
+                st.markdown(fragment_cache.get(
+                    ("current_block",) + fragment_key,
+                    lambda: build_current_block(current, location_info, language, unit_system)
+                ), unsafe_allow_html=True)
+        else:
+            # Get dynamic styling based on weather
+            with render_metrics.section("weather_card"):
+                # Dynamic animated weather card
+                st.markdown(fragment_cache.get(
+                    ("weather_card",) + fragment_key,
+                    lambda: build_weather_card(current, location_info, unit_system)
+                ), unsafe_allow_html=True)
+        
+            # Apple-style metrics grid with mobile optimization
+            with render_metrics.section("metric_cards"):
+                metric_cards = fragment_cache.get(
+                    ("metric_cards",) + fragment_key,
+                    lambda: build_metric_cards(current, language, unit_system)
+                )
+            
+                st.markdown("""
+                <div class="metrics-container" style="margin: 2rem 0;">
+                """, unsafe_allow_html=True)
+        
+                # Responsive metrics layout, two rows of three
+                for row in (metric_cards[:3], metric_cards[3:]):
+                    for col, card_html in zip(st.columns(3), row):
+                        with col:
+                            st.markdown(card_html, unsafe_allow_html=True)
+        
+                st.markdown("</div>", unsafe_allow_html=True)
+        
+            # Air Quality and Extended Weather Info
+            with render_metrics.section("details"):
+                detail_cards = fragment_cache.get(
+                    ("detail_cards",) + fragment_key,
+                    lambda: build_detail_cards(current, location_info, language, unit_system)
+                )
+                for col, card_html in zip(st.columns(2), detail_cards):
+                    with col:
+                        st.markdown(card_html, unsafe_allow_html=True)
+        
+    # Fetch and display hourly forecast (if enabled)
+    forecast_data = None
+    with slots["hourly"].container():
+        if show_forecast:
+            # Titled once the strip is built, with the hours it really shows
+            heading = st.empty()
+            
+            with st.spinner(get_text("loading_forecast", language)):
+                forecast_data = get_forecast_data(location, days=config.FORECAST_DAYS)
+                # Late in the day a long horizon runs past the days the prefetcher keeps warm
+                hourly_days = forecast_frame.days_for_horizon(hourly_horizon, hour_start)
+                hourly_data = (forecast_data if hourly_days <= config.FORECAST_DAYS or forecast_data is None
+                               else get_forecast_data(location, days=min(hourly_days, config.FORECAST_MAX_DAYS))
+                               or forecast_data)
+        
+        if show_forecast and forecast_data is not None:
+            with render_metrics.section("hourly"):
+                # Get hourly data safely
+                hourly_key = (hour_start, hourly_horizon, hourly_data.current.last_updated_epoch) + fragment_key
+                try:
+                    hourly_items = fragment_cache.get(
+                        ("hourly",) + hourly_key,
+                        lambda: build_hourly_items(hourly_data, hour_start, hourly_horizon, language, unit_system)
+                    )
+                    heading.markdown(f'<div style="margin-top: 2rem;"><div style="color: #666; font-size: 0.9rem; margin-bottom: 1rem;">{get_text("hourly_forecast", language).format(hours=len(hourly_items) or hourly_horizon)}</div></div>', unsafe_allow_html=True)
+                
+                    if hourly_items and config.RENDER_MODE == "consolidated":
+                        # The whole strip as one element, scrolling horizontally
+                        st.markdown(fragment_cache.get(
+                            ("hourly_strip",) + hourly_key,
+                            lambda: join_html(['<div class="hourly-forecast">', *hourly_items, '</div>'])
+                        ), unsafe_allow_html=True)
+                    elif hourly_items:
+                        # Render hourly forecast without string concatenation
+                        st.markdown('<div class="hourly-forecast">', unsafe_allow_html=True)
+                    
+                        # Create columns for hourly items
+                        cols = st.columns(len(hourly_items))
+                        for i, item_html in enumerate(hourly_items):
+                            with cols[i]:
+                                st.markdown(item_html, unsafe_allow_html=True)
+                    
+                        st.markdown('</div>', unsafe_allow_html=True)
+                    else:
+                        st.info("Hourly forecast data not available for this location.")
+                    
+                except Exception as e:
+                    st.info("Unable to load hourly forecast data.")
+    
+    # Weather alerts (if any and enabled)
+    with slots["alerts"].container(), render_metrics.section("alerts"):
+        if show_forecast and forecast_data is not None and show_alerts and forecast_data.alerts:
+            title_html = section_title_html(get_text("weather_alerts", language))
+            alert_cards = [build_alert_card(alert) for alert in forecast_data.alerts]
+            if config.RENDER_MODE == "consolidated":
+                st.markdown(join_html([title_html] + alert_cards), unsafe_allow_html=True)
+            else:
+                st.markdown(title_html, unsafe_allow_html=True)
+                for card_html in alert_cards:
+                    st.markdown(card_html, unsafe_allow_html=True)
 
-def convert_wind_speed(speed_kmh, unit):
-    """Convert wind speed between km/h and mph"""
-    if unit == "mph":
-        return speed_kmh * 0.621371
-    return speed_kmh
+    # 3-Day Forecast
+    with slots["daily"].container(), render_metrics.section("daily"):
+        if show_forecast and forecast_data is not None:
+            title_html = section_title_html(get_text("daily_forecast", language))
+            daily_cards = fragment_cache.get(
+                ("daily",) + fragment_key,
+                lambda: build_daily_cards(forecast_data, language, unit_system)
+            )
+            if config.RENDER_MODE == "consolidated":
+                st.markdown(fragment_cache.get(
+                    ("daily_block",) + fragment_key,
+                    lambda: join_html([title_html] + daily_cards)
+                ), unsafe_allow_html=True)
+            else:
+                st.markdown(title_html, unsafe_allow_html=True)
+                for card_html in daily_cards:
+                    st.markdown(card_html, unsafe_allow_html=True)
+    
+    return weather_data
 
-def convert_pressure(pressure_mb, unit):
-    """Convert pressure between mbar and inHg"""
-    if unit == "inhg":
-        return pressure_mb * 0.02953
-    return pressure_mb
+def render_debug_panel(language):
+    """Sidebar breakdown of this rerun's section timings and data fetches"""
+    trace = render_metrics.finish_run()
+    with st.sidebar.expander(get_text("performance", language)):
+        st.caption(get_text("rerun_total", language).format(ms=trace.total * 1000))
+        averages = render_metrics.section_summary()
+        st.dataframe(pd.DataFrame(
+            [{"section": name, "ms": round(seconds * 1000, 2), "avg ms": round(averages[name][1] * 1000, 2)}
+             for name, seconds in trace.sections]
+        ), hide_index=True, use_container_width=True)
+        if trace.fetches:
+            st.dataframe(pd.DataFrame(
+                [{"fetch": f["kind"], "ms": round(f["seconds"] * 1000, 1), "cache": f["outcome"],
+                  "upstream": f["upstream_calls"], "upstream ms": round(f["upstream_seconds"] * 1000, 1),
+                  "KB": round(f["bytes"] / 1024, 1)} for f in trace.fetches]
+            ), hide_index=True, use_container_width=True)
+        cache = response_cache.stats()
+        st.caption(get_text("cache_summary", language).format(
+            hit_rate=cache["hit_rate"] * 100, size=cache["size"], upstream=cache["upstream_calls"]))
+        fragments = fragment_cache.stats()
+        st.caption(get_text("fragment_summary", language).format(
+            hit_rate=fragments["hit_rate"] * 100, size=fragments["size"], evictions=fragments["evictions"]))
+        quota = quota_limiter.stats()
+        st.caption(get_text("quota_summary", language).format(
+            used=quota["used"], budget=quota["budget"], rate=quota["burn_rate_per_hour"],
+            exhaustion=quota["exhaustion_date"] or get_text("quota_not_this_month", language),
+            stretch=quota["stretch"]))
+        breaker_stats = weather_breaker.stats()
+        st.caption(get_text("breaker_summary", language).format(
+            state=breaker_stats["state"], opened=breaker_stats["opened"], rejected=breaker_stats["rejected"],
+            fallbacks=cache["fallbacks"]))
 
 def main():
+    render_metrics.start_run()
+    
     # Enhanced sidebar with mobile-friendly settings
-    with st.sidebar:
+    with st.sidebar, render_metrics.section("sidebar"):
         # Mobile-friendly header
         st.markdown("""
         <div style="text-align: center; padding: 1rem 0;">
@@ -382,6 +842,13 @@ def main():
             label_visibility="collapsed"
         )
         
+        view = st.radio(
+            get_text("view", language),
+            options=["province", "nationwide"],
+            format_func=lambda x: get_text(f"{x}_view", language),
+            horizontal=True
+        )
+        
         st.markdown("---")
         st.markdown(f"### {get_text('settings', language)}")
         
@@ -408,7 +875,8 @@ def main():
             format_func=lambda x: get_text(x, language),
             index=0
         )
-        
+        unit_system = units.UnitSystem(temp_unit, wind_unit, pressure_unit)
+
         st.markdown("---")
         
         # Display options
@@ -422,6 +890,19 @@ def main():
             value=True
         )
         
+        # Hours shown in the hourly strip, limited to what FORECAST_MAX_DAYS covers from this hour
+        hourly_horizon = st.selectbox(
+            get_text("hourly_horizon", language),
+            options=forecast_frame.horizons(time.time()),
+            format_func=lambda h: f"{h} {get_text('hours', language)}",
+            index=0
+        )
+        
+        show_history = st.checkbox(
+            get_text("show_history", language),
+            value=True
+        )
+        
         # Auto refresh setting
         auto_refresh = st.checkbox(
             get_text("auto_refresh", language),
@@ -435,674 +916,113 @@ def main():
                 max_value=60,
                 value=5
             )
-            
-            # Auto refresh implementation
-            import time
-            if 'last_refresh' not in st.session_state:
-                st.session_state.last_refresh = time.time()
-            
-            if time.time() - st.session_state.last_refresh > refresh_interval * 60:
-                st.session_state.last_refresh = time.time()
-                st.rerun()
     
     # Enhanced CSS for Apple Weather-like styling with animations
-    st.markdown("""
-    <style>
-    .main-header {
-        text-align: center;
-        padding: 2rem 0 1rem 0;
-        font-size: 2.5rem;
-        font-weight: 300;
-        color: #1a1a1a;
-    }
-    .subtitle {
-        text-align: center;
-        color: #666;
-        font-size: 1.1rem;
-        margin-bottom: 2rem;
-    }
-    .weather-card {
-        background: rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(10px);
-        border-radius: 20px;
-        padding: 2rem;
-        margin: 1rem 0;
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-        position: relative;
-        overflow: hidden;
-    }
-    .dynamic-weather-card {
-        border-radius: 25px;
-        padding: 3rem 2rem;
-        margin: 2rem 0;
-        position: relative;
-        overflow: hidden;
-        transition: all 0.5s ease;
-    }
-    .temp-display {
-        text-align: center;
-        padding: 2rem 0;
-        position: relative;
-    }
-    .main-temp {
-        font-size: 5rem;
-        font-weight: 100;
-        margin: 0;
-        color: white;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        transition: all 0.3s ease;
-    }
-    .condition-text {
-        font-size: 1.5rem;
-        font-weight: 300;
-        color: rgba(255, 255, 255, 0.9);
-        margin-top: 0.5rem;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.3);
-    }
-    .location-text {
-        font-size: 1.2rem;
-        font-weight: 400;
-        color: rgba(255, 255, 255, 0.8);
-        margin-bottom: 1rem;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.3);
-    }
-    .metric-card {
-        background: rgba(255, 255, 255, 0.9);
-        border-radius: 15px;
-        padding: 1.2rem;
-        text-align: center;
-        margin: 0.5rem 0;
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-        transition: transform 0.2s ease, box-shadow 0.2s ease;
-    }
-    .metric-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 20px rgba(0, 0, 0, 0.15);
-    }
-    .search-container {
-        max-width: 400px;
-        margin: 0 auto 2rem auto;
-    }
-    .stSelectbox > div > div {
-        border-radius: 15px;
-        border: 2px solid #e0e0e0;
-        background: rgba(255, 255, 255, 0.9);
-        transition: all 0.3s ease;
-    }
-    .hourly-forecast {
-        display: flex;
-        overflow-x: auto;
-        gap: 1rem;
-        padding: 1rem 0;
-        scrollbar-width: none;
-        -ms-overflow-style: none;
-        -webkit-overflow-scrolling: touch;
-        scroll-snap-type: x mandatory;
-    }
-    .hourly-forecast::-webkit-scrollbar {
-        display: none;
-    }
-    .hourly-item {
-        min-width: 80px;
-        text-align: center;
-        background: rgba(255, 255, 255, 0.8);
-        border-radius: 15px;
-        padding: 1rem 0.5rem;
-        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
-    }
-    .weather-icon-large {
-        width: 120px;
-        height: 120px;
-        filter: drop-shadow(0 4px 8px rgba(0,0,0,0.2));
-        transition: transform 0.3s ease;
-    }
-    .weather-icon-large:hover {
-        transform: scale(1.1);
-    }
-    .fade-in {
-        animation: fadeIn 0.5s ease-in;
-    }
-    @keyframes fadeIn {
-        from { opacity: 0; transform: translateY(10px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    
-    /* Enhanced Mobile Responsiveness */
-    @media (max-width: 768px) {
-        .main-header { 
-            font-size: 2rem; 
-            padding: 1rem 0 0.5rem 0;
-            line-height: 1.2;
-        }
-        .subtitle {
-            font-size: 1rem;
-            margin-bottom: 1.5rem;
-            padding: 0 1rem;
-        }
-        .main-temp { 
-            font-size: 3.5rem;
-            line-height: 1;
-        }
-        .condition-text { 
-            font-size: 1.2rem;
-            margin-top: 0.3rem;
-        }
-        .location-text {
-            font-size: 1rem;
-            margin-bottom: 0.8rem;
-        }
-        .weather-icon-large { 
-            width: 80px; 
-            height: 80px; 
-        }
-        .dynamic-weather-card { 
-            padding: 1.5rem 1rem; 
-            margin: 1rem 0.5rem;
-            border-radius: 20px;
-        }
-        .metric-card { 
-            padding: 1rem 0.8rem; 
-            margin: 0.3rem 0;
-            font-size: 0.9rem;
-        }
-        .metric-card > div:first-child {
-            font-size: 0.8rem !important;
-            margin-bottom: 0.3rem !important;
-        }
-        .metric-card > div:nth-child(2) {
-            font-size: 1.5rem !important;
-        }
-        .hourly-item { 
-            min-width: 70px; 
-            padding: 0.8rem 0.3rem;
-            font-size: 0.8rem;
-        }
-        .search-container { 
-            max-width: 100%; 
-            padding: 0 1rem; 
-            margin: 0 auto 1.5rem auto;
-        }
-        .stSelectbox > div > div {
-            font-size: 1rem;
-            padding: 0.8rem;
-        }
-        
-        /* Mobile grid adjustments */
-        .mobile-grid-2 {
-            display: grid !important;
-            grid-template-columns: 1fr 1fr !important;
-            gap: 0.5rem !important;
-        }
-        .mobile-grid-1 {
-            display: grid !important;
-            grid-template-columns: 1fr !important;
-            gap: 0.5rem !important;
-        }
-        
-        /* Touch-friendly buttons */
-        .stButton > button {
-            height: 3rem;
-            font-size: 1rem;
-            border-radius: 12px;
-            touch-action: manipulation;
-        }
-        
-        /* Improved scrolling for hourly forecast */
-        .hourly-forecast {
-            padding: 1rem 0.5rem;
-            -webkit-overflow-scrolling: touch;
-        }
-    }
-    
-    @media (max-width: 480px) {
-        .main-header { 
-            font-size: 1.8rem;
-            padding: 0.8rem 0 0.3rem 0;
-        }
-        .subtitle {
-            font-size: 0.9rem;
-            margin-bottom: 1rem;
-        }
-        .main-temp { 
-            font-size: 3rem;
-            margin: 0.5rem 0;
-        }
-        .condition-text {
-            font-size: 1.1rem;
-        }
-        .dynamic-weather-card {
-            padding: 1rem 0.8rem;
-            margin: 0.8rem 0.3rem;
-        }
-        .metric-card { 
-            font-size: 0.85rem;
-            padding: 0.8rem 0.6rem;
-        }
-        .metric-card > div:nth-child(2) {
-            font-size: 1.3rem !important;
-        }
-        .hourly-forecast { 
-            gap: 0.3rem;
-            padding: 0.8rem 0.3rem;
-        }
-        .hourly-item { 
-            min-width: 60px;
-            padding: 0.6rem 0.2rem;
-            font-size: 0.75rem;
-        }
-        .hourly-item img {
-            width: 30px !important;
-            margin: 0.3rem 0 !important;
-        }
-        .search-container {
-            padding: 0 0.5rem;
-        }
-        
-        /* Stack columns on very small screens */
-        .mobile-stack {
-            flex-direction: column !important;
-        }
-        .mobile-stack > div {
-            width: 100% !important;
-            margin-bottom: 0.5rem;
-        }
-    }
-    
-    /* Touch and interaction improvements */
-    @media (hover: none) and (pointer: coarse) {
-        .metric-card:hover {
-            transform: none;
-            box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-        }
-        .weather-icon-large:hover {
-            transform: none;
-        }
-        
-        /* Improve tap targets */
-        .stSelectbox, .stCheckbox, .stSlider {
-            touch-action: manipulation;
-        }
-        
-        /* Prevent zoom on input focus */
-        input, select, textarea {
-            font-size: 16px !important;
-        }
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    with render_metrics.section("styles"):
+        inject_styles()
     
 
     
     # Header
-    st.markdown(f'<div class="main-header">{get_text("title", language)}</div>', unsafe_allow_html=True)
-    st.markdown(f'<div class="subtitle">{get_text("subtitle", language)}</div>', unsafe_allow_html=True)
+    with render_metrics.section("header"):
+        st.markdown(f'<div class="main-header">{get_text("title", language)}</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="subtitle">{get_text("subtitle", language)}</div>', unsafe_allow_html=True)
     
-    # Province selection with custom styling
-    st.markdown('<div class="search-container">', unsafe_allow_html=True)
-    selected_province = st.selectbox(
-        get_text("search_label", language),
-        options=list(VIETNAMESE_PROVINCES.keys()),
-        index=None,
-        placeholder=get_text("search_placeholder", language),
-        label_visibility="collapsed"
-    )
-    st.markdown('</div>', unsafe_allow_html=True)
+        # Province selection with custom styling
+        selected_province = None
+        if view == "province":
+            st.markdown('<div class="search-container">', unsafe_allow_html=True)
+            # Accent-insensitive server-side search; its best match is preselected.
+            # "lat,lon" (typed, or filled in by the near-me button) finds the nearest province
+            query = st.text_input(
+                get_text("search_query", language),
+                placeholder=get_text("search_query_placeholder", language),
+                label_visibility="collapsed"
+            ).strip()
+            matches = search_provinces(query) if query else list(VIETNAMESE_PROVINCES.keys())
+            if matches:
+                selected_province = st.selectbox(
+                    get_text("search_label", language),
+                    options=matches,
+                    index=0 if query else None,
+                    placeholder=get_text("search_placeholder", language),
+                    label_visibility="collapsed"
+                )
+            else:
+                st.caption(get_text("no_matches", language).format(query=query))
+            st.markdown('</div>', unsafe_allow_html=True)
     
-    if selected_province:
+    if view == "nationwide":
+        with render_metrics.section("nationwide"):
+            render_nationwide_overview(language, unit_system)
+    
+    elif selected_province:
         location = VIETNAMESE_PROVINCES[selected_province]
         
-        # Fetch weather data
-        with st.spinner(f"{get_text('loading', language)} {selected_province}..."):
-            weather_data = get_weather_data(location)
+        # Data sections go into placeholders that the timer-driven fragment
+        # below redraws in place; a full rerun always draws them
+        slots = {name: st.empty() for name in ("current", "hourly", "alerts", "daily")}
+        st.session_state.live_sections_drawn = None
+        live_sections = st.fragment(render_live_sections, run_every=refresh_interval * 60 if auto_refresh else None)
+        weather_data = live_sections(slots, selected_province, location, language, unit_system,
+                                     show_forecast, show_alerts, hourly_horizon)
         
         if weather_data:
-            current = weather_data['current']
-            location_info = weather_data['location']
-            
-            # Get dynamic styling based on weather
-            gradient = get_weather_gradient(current['condition']['text'], current['temp_c'])
-            animation_css = get_weather_animation(current['condition']['text'])
-            
-            # Add weather-specific animation CSS
-            st.markdown(f"<style>{animation_css}</style>", unsafe_allow_html=True)
-            
-            # Apply unit conversions
-            temp_display = convert_temperature(current['temp_c'], temp_unit)
-            temp_unit_symbol = "°F" if temp_unit == "fahrenheit" else "°C"
-            feels_like_display = convert_temperature(current['feelslike_c'], temp_unit)
-            wind_display = convert_wind_speed(current['wind_kph'], wind_unit)
-            wind_unit_label = get_text(wind_unit, language)
-            pressure_display = convert_pressure(current['pressure_mb'], pressure_unit)
-            pressure_unit_label = get_text(pressure_unit, language)
-            
-            # Dynamic animated weather card
+            # Local observation history
+            with render_metrics.section("history"):
+                if show_history:
+                    render_history_panel(selected_province, language, temp_unit)
+    
+    else:
+        # Welcome message with Apple-style design
+        with render_metrics.section("welcome"):
             st.markdown(f"""
-            <div class="dynamic-weather-card weather-animation fade-in" style="background: {gradient};">
-                <div class="location-text">
-                    {location_info['name']}, {location_info['region']}
+            <div class="weather-card" style="text-align: center; margin-top: 3rem;">
+                <div style="font-size: 3rem; margin-bottom: 1rem;">🌤️</div>
+                <div style="font-size: 1.5rem; font-weight: 300; margin-bottom: 1rem; color: #666;">
+                    {get_text("welcome_text", language)}
                 </div>
-                <div class="temp-display">
-                    <img src="{get_weather_icon_url(current['condition']['icon'])}" class="weather-icon-large" style="margin-bottom: 1rem;">
-                    <div class="main-temp">{temp_display:.0f}{temp_unit_symbol}</div>
-                    <div class="condition-text">{current['condition']['text']}</div>
-                    <div style="color: rgba(255, 255, 255, 0.7); margin-top: 0.5rem; font-size: 1rem;">
-                        H:{convert_temperature(current['temp_c'] + 3, temp_unit):.0f}{temp_unit_symbol} L:{convert_temperature(current['temp_c'] - 5, temp_unit):.0f}{temp_unit_symbol}
-                    </div>
+                <div style="font-size: 1rem; color: #999; line-height: 1.6;">
+                    {get_text("powered_by", language)}
                 </div>
             </div>
             """, unsafe_allow_html=True)
-            
-            # Apple-style metrics grid with mobile optimization
-            st.markdown("""
-            <div class="metrics-container" style="margin: 2rem 0;">
+        
+            # Quick access to popular cities
+            st.markdown(f"""
+            <div style="margin-top: 2rem;">
+                <div style="text-align: center; color: #666; margin-bottom: 1rem; font-size: 0.9rem;">{get_text("popular_destinations", language)}</div>
+            </div>
             """, unsafe_allow_html=True)
-            
-            # Responsive metrics layout
+        
+            # Mobile-optimized popular provinces layout
+            popular_provinces = POPULAR_PROVINCES
+        
             col1, col2, col3 = st.columns(3)
+            for i, province in enumerate(popular_provinces):
+                with [col1, col2, col3][i]:
+                    if st.button(
+                        province, 
+                        key=f"popular_{i}", 
+                        use_container_width=True,
+                        help=f"View weather for {province}"
+                    ):
+                        st.session_state.selected_province = province
+                        st.rerun()
             
-            with col1:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div style="color: #666; font-size: 0.9rem; margin-bottom: 0.5rem;">{get_text("feels_like", language)}</div>
-                    <div style="font-size: 2rem; font-weight: 300;">{feels_like_display:.0f}{temp_unit_symbol}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div style="color: #666; font-size: 0.9rem; margin-bottom: 0.5rem;">{get_text("humidity", language)}</div>
-                    <div style="font-size: 2rem; font-weight: 300;">{current['humidity']}%</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col3:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div style="color: #666; font-size: 0.9rem; margin-bottom: 0.5rem;">{get_text("wind", language)}</div>
-                    <div style="font-size: 2rem; font-weight: 300;">{wind_display:.0f}</div>
-                    <div style="color: #999; font-size: 0.8rem;">{wind_unit_label} {current['wind_dir']}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            # Second row of metrics
-            col4, col5, col6 = st.columns(3)
-            
-            with col4:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div style="color: #666; font-size: 0.9rem; margin-bottom: 0.5rem;">{get_text("pressure", language)}</div>
-                    <div style="font-size: 2rem; font-weight: 300;">{pressure_display:.1f}</div>
-                    <div style="color: #999; font-size: 0.8rem;">{pressure_unit_label}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col5:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div style="color: #666; font-size: 0.9rem; margin-bottom: 0.5rem;">{get_text("visibility", language)}</div>
-                    <div style="font-size: 2rem; font-weight: 300;">{current['vis_km']}</div>
-                    <div style="color: #999; font-size: 0.8rem;">km</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col6:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div style="color: #666; font-size: 0.9rem; margin-bottom: 0.5rem;">{get_text("uv_index", language)}</div>
-                    <div style="font-size: 2rem; font-weight: 300;">{current['uv']}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            st.markdown("</div>", unsafe_allow_html=True)
-            
-            # Air Quality and Extended Weather Info
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Air Quality (if available)
-                if 'air_quality' in current:
-                    aqi = current['air_quality']
-                    aqi_value = aqi.get('us-epa-index', 0)
-                    aqi_levels = ["Good", "Moderate", "Unhealthy for Sensitive", "Unhealthy", "Very Unhealthy", "Hazardous"]
-                    aqi_level = aqi_levels[min(aqi_value - 1, 5)] if aqi_value > 0 else "N/A"
-                    aqi_colors = ["#00E400", "#FFFF00", "#FF7E00", "#FF0000", "#8F3F97", "#7E0023"]
-                    aqi_color = aqi_colors[min(aqi_value - 1, 5)] if aqi_value > 0 else "#999"
-                    
-                    st.markdown(f"""
-                    <div class="metric-card" style="text-align: left; padding: 1.5rem;">
-                        <div style="color: #666; font-size: 0.9rem; margin-bottom: 1rem;">AIR QUALITY</div>
-                        <div style="font-size: 2rem; font-weight: 300; color: {aqi_color}; margin-bottom: 0.5rem;">{aqi_value}</div>
-                        <div style="color: {aqi_color}; font-weight: 500;">{aqi_level}</div>
-                        <div style="margin-top: 1rem; font-size: 0.8rem; color: #666;">
-                            CO: {aqi.get('co', 0):.1f} μg/m³<br>
-                            NO₂: {aqi.get('no2', 0):.1f} μg/m³<br>
-                            PM2.5: {aqi.get('pm2_5', 0):.1f} μg/m³
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                    <div class="metric-card" style="text-align: left; padding: 1.5rem;">
-                        <div style="color: #666; font-size: 0.9rem; margin-bottom: 1rem;">WEATHER DETAILS</div>
-                        <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; font-size: 0.9rem;">
-                            <div><strong>Cloud Cover:</strong> {current['cloud']}%</div>
-                            <div><strong>Precipitation:</strong> {current['precip_mm']} mm</div>
-                            <div><strong>Local Time:</strong> {location_info['localtime'].split()[1]}</div>
-                            <div><strong>Timezone:</strong> {location_info['tz_id'].split('/')[-1]}</div>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-            
-            with col2:
-                # Extended weather metrics
-                st.markdown(f"""
-                <div class="metric-card" style="text-align: left; padding: 1.5rem;">
-                    <div style="color: #666; font-size: 0.9rem; margin-bottom: 1rem;">COMFORT INDEX</div>
-                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; font-size: 0.9rem;">
-                        <div><strong>Heat Index:</strong> {current['feelslike_c']}°C</div>
-                        <div><strong>Wind Chill:</strong> {current['windchill_c'] if 'windchill_c' in current else 'N/A'}</div>
-                        <div><strong>Wind Gust:</strong> {current.get('gust_kph', 'N/A')} km/h</div>
-                        <div><strong>Dew Point:</strong> {current.get('dewpoint_c', 'N/A')}°C</div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            # Fetch and display hourly forecast (if enabled)
-            forecast_data = None
-            if show_forecast:
-                st.markdown(f'<div style="margin-top: 2rem;"><div style="color: #666; font-size: 0.9rem; margin-bottom: 1rem;">{get_text("hourly_forecast", language)}</div></div>', unsafe_allow_html=True)
-                
-                with st.spinner(get_text("loading_forecast", language)):
-                    forecast_data = get_forecast_data(location, days=2)
-            
-            if show_forecast and forecast_data and 'forecast' in forecast_data:
-                # Get hourly data safely
-                try:
-                    today_hours = forecast_data['forecast']['forecastday'][0]['hour']
-                    current_hour = int(location_info['localtime'].split()[1].split(':')[0])
-                    
-                    # Show next 12 hours starting from current hour
-                    hourly_items = []
-                    for i in range(12):
-                        try:
-                            if i < (24 - current_hour):
-                                # Today's remaining hours
-                                hour_data = today_hours[current_hour + i]
-                                time_label = get_text("now", language) if i == 0 else f"{(current_hour + i):02d}:00"
-                            else:
-                                # Tomorrow's hours
-                                if len(forecast_data['forecast']['forecastday']) > 1:
-                                    tomorrow_hours = forecast_data['forecast']['forecastday'][1]['hour']
-                                    tomorrow_hour_index = (current_hour + i) - 24
-                                    if tomorrow_hour_index < len(tomorrow_hours):
-                                        hour_data = tomorrow_hours[tomorrow_hour_index]
-                                        time_label = f"{tomorrow_hour_index:02d}:00"
-                                    else:
-                                        continue
-                                else:
-                                    continue
-                            
-                            # Store data for rendering with unit conversions
-                            hourly_items.append({
-                                'time': time_label,
-                                'icon': get_weather_icon_url(hour_data['condition']['icon']),
-                                'temp': convert_temperature(hour_data['temp_c'], temp_unit),
-                                'temp_symbol': temp_unit_symbol,
-                                'rain': hour_data['chance_of_rain']
-                            })
-                        except (IndexError, KeyError) as e:
-                            # Skip this hour if data is not available
-                            continue
-                    
-                    if hourly_items:
-                        # Render hourly forecast without string concatenation
-                        st.markdown('<div class="hourly-forecast">', unsafe_allow_html=True)
-                        
-                        # Create columns for hourly items
-                        cols = st.columns(len(hourly_items))
-                        for i, item in enumerate(hourly_items):
-                            with cols[i]:
-                                st.markdown(f"""
-                                <div class="hourly-item">
-                                    <div style="font-size: 0.8rem; color: #666; margin-bottom: 0.5rem;">{item['time']}</div>
-                                    <img src="{item['icon']}" width="40" style="margin: 0.5rem 0;">
-                                    <div style="font-weight: 500;">{item['temp']:.0f}{item['temp_symbol']}</div>
-                                    <div style="font-size: 0.7rem; color: #999; margin-top: 0.3rem;">{item['rain']}%</div>
-                                </div>
-                                """, unsafe_allow_html=True)
-                        
-                        st.markdown('</div>', unsafe_allow_html=True)
-                    else:
-                        st.info("Hourly forecast data not available for this location.")
-                        
-                except Exception as e:
-                    st.info("Unable to load hourly forecast data.")
-                
-                # Weather alerts (if any and enabled)
-                if show_alerts and 'alerts' in forecast_data and forecast_data['alerts']['alert']:
-                    st.markdown(f'<div style="margin-top: 2rem;"><div style="color: #666; font-size: 0.9rem; margin-bottom: 1rem;">{get_text("weather_alerts", language)}</div></div>', unsafe_allow_html=True)
-                    
-                    for alert in forecast_data['alerts']['alert']:
-                        st.markdown(f"""
-                        <div style="background: linear-gradient(135deg, #FF6B35 0%, #F7931E 100%); 
-                                    color: white; padding: 1.5rem; border-radius: 15px; margin: 1rem 0;
-                                    box-shadow: 0 4px 15px rgba(255, 107, 53, 0.3);">
-                            <div style="font-weight: 600; margin-bottom: 0.5rem;">⚠️ {alert['headline']}</div>
-                            <div style="font-size: 0.9rem; opacity: 0.9;">{alert['desc']}</div>
-                            <div style="font-size: 0.8rem; margin-top: 0.5rem; opacity: 0.8;">
-                                Effective: {alert['effective']} - {alert['expires']}
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-            
-            # 3-Day Forecast
-            if show_forecast and forecast_data and 'forecast' in forecast_data:
-                st.markdown(f'<div style="margin-top: 2rem;"><div style="color: #666; font-size: 0.9rem; margin-bottom: 1rem;">{get_text("daily_forecast", language)}</div></div>', unsafe_allow_html=True)
-                
-                forecast_days = forecast_data['forecast']['forecastday']
-                
-                for i, day in enumerate(forecast_days):
-                    date_obj = datetime.strptime(day['date'], '%Y-%m-%d')
-                    day_name = get_text("today", language) if i == 0 else date_obj.strftime('%A')
-                    date_str = date_obj.strftime('%b %d')
-                    
-                    day_data = day['day']
-                    
-                    # Apply temperature conversions for daily forecast
-                    max_temp_display = convert_temperature(day_data['maxtemp_c'], temp_unit)
-                    min_temp_display = convert_temperature(day_data['mintemp_c'], temp_unit)
-                    max_wind_display = convert_wind_speed(day_data['maxwind_kph'], wind_unit)
-                    
-                    # Calculate rain probability from hourly data
-                    avg_rain_chance = sum([hour['chance_of_rain'] for hour in day['hour']]) / 24
-                    
-                    st.markdown(f"""
-                    <div class="metric-card" style="padding: 1.5rem; margin: 0.5rem 0;">
-                        <div style="display: flex; align-items: center; justify-content: space-between;">
-                            <div style="flex: 1;">
-                                <div style="font-weight: 500; margin-bottom: 0.2rem;">{day_name}</div>
-                                <div style="color: #666; font-size: 0.9rem;">{date_str}</div>
-                            </div>
-                            <div style="flex: 1; text-align: center;">
-                                <img src="{get_weather_icon_url(day_data['condition']['icon'])}" width="50">
-                                <div style="font-size: 0.8rem; color: #666; margin-top: 0.2rem;">{avg_rain_chance:.0f}%</div>
-                            </div>
-                            <div style="flex: 1; text-align: right;">
-                                <div style="font-weight: 500;">{max_temp_display:.0f}{temp_unit_symbol}</div>
-                                <div style="color: #666;">{min_temp_display:.0f}{temp_unit_symbol}</div>
-                            </div>
-                        </div>
-                        <div style="margin-top: 1rem; padding-top: 1rem; border-top: 1px solid #eee; font-size: 0.8rem; color: #666;">
-                            {day_data['condition']['text']} • UV Index: {day_data['uv']} • Max Wind: {max_wind_display:.0f} {wind_unit_label}
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-            
-        else:
-            st.error("Unable to fetch weather data. Please check your internet connection and try again.")
+            # Weather near the browser's location, resolved without geocoding
+            components.html(build_near_me_button(get_text("search_query", language), get_text("near_me", language)), height=48)
     
-    else:
-        # Welcome message with Apple-style design
-        st.markdown(f"""
-        <div class="weather-card" style="text-align: center; margin-top: 3rem;">
-            <div style="font-size: 3rem; margin-bottom: 1rem;">🌤️</div>
-            <div style="font-size: 1.5rem; font-weight: 300; margin-bottom: 1rem; color: #666;">
-                {get_text("welcome_text", language)}
-            </div>
-            <div style="font-size: 1rem; color: #999; line-height: 1.6;">
-                {get_text("powered_by", language)}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Quick access to popular cities
+    # Footer with minimal styling
+    with render_metrics.section("footer"):
         st.markdown(f"""
-        <div style="margin-top: 2rem;">
-            <div style="text-align: center; color: #666; margin-bottom: 1rem; font-size: 0.9rem;">{get_text("popular_destinations", language)}</div>
+        <div style="text-align: center; color: #ccc; padding: 3rem 0 1rem 0; font-size: 0.8rem;">
+            {get_text("title", language)}
         </div>
         """, unsafe_allow_html=True)
-        
-        # Mobile-optimized popular provinces layout
-        popular_provinces = ["Hà Nội", "TP. Hồ Chí Minh", "Đà Nẵng"]
-        
-        # Create responsive grid for popular provinces
-        st.markdown("""
-        <style>
-        .popular-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
-            gap: 0.8rem;
-            margin: 1rem 0;
-        }
-        @media (max-width: 768px) {
-            .popular-grid {
-                grid-template-columns: 1fr;
-                gap: 0.5rem;
-            }
-        }
-        </style>
-        """, unsafe_allow_html=True)
-        
-        col1, col2, col3 = st.columns(3)
-        for i, province in enumerate(popular_provinces):
-            with [col1, col2, col3][i]:
-                if st.button(
-                    province, 
-                    key=f"popular_{i}", 
-                    use_container_width=True,
-                    help=f"View weather for {province}"
-                ):
-                    st.session_state.selected_province = province
-                    st.rerun()
     
-    # Footer with minimal styling
-    st.markdown(f"""
-    <div style="text-align: center; color: #ccc; padding: 3rem 0 1rem 0; font-size: 0.8rem;">
-        {get_text("title", language)}
-    </div>
-    """, unsafe_allow_html=True)
+    if render_metrics.enabled:
+        render_debug_panel(language)
 
 if __name__ == "__main__":
     main()
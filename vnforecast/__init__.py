@@ -0,0 +1 @@
+"""Process-wide services shared by every Streamlit session of the dashboard."""
@@ -0,0 +1,130 @@
+"""Circuit breaker that stops calling WeatherAPI while it is failing or too slow."""
+import threading
+import time
+
+import requests
+
+from vnforecast import config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(requests.exceptions.RequestException):
+    """The call was not sent because the breaker is open"""
+
+    def __init__(self, retry_in):
+        super().__init__(f"WeatherAPI is unavailable, retrying in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker shared by every upstream call.
+
+    Closed, calls go through and ``failure_threshold`` consecutive failures
+    (errors, or responses slower than ``slow_seconds``) open it. Open,
+    ``before_call()`` raises CircuitOpen at once instead of letting callers
+    wait out timeouts. After ``open_seconds`` the breaker is half-open and
+    lets ``probes`` calls through: a success closes it, a failure opens it
+    again for twice as long (up to ``max_open_seconds``).
+    """
+
+    def __init__(self, failure_threshold=5, slow_seconds=5.0, open_seconds=30, max_open_seconds=300,
+                 probes=1, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.slow_seconds = slow_seconds
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.probes = probes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._open_for = open_seconds
+        self._probing = 0
+        self._stats = {"opened": 0, "rejected": 0, "probes": 0, "failures": 0, "slow": 0}
+
+    @property
+    def state(self):
+        with self._lock:
+            self._advance(self._clock())
+            return self._state
+
+    def before_call(self):
+        """Let a call through, or raise CircuitOpen"""
+        now = self._clock()
+        with self._lock:
+            self._advance(now)
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._probing < self.probes:
+                self._probing += 1
+                self._stats["probes"] += 1
+                return
+            self._stats["rejected"] += 1
+            retry_in = max(self._opened_at + self._open_for - now, 0.0)
+        raise CircuitOpen(retry_in)
+
+    def record_success(self, seconds):
+        """Count a call that got an answer; one slower than slow_seconds counts as a failure"""
+        if self.slow_seconds and seconds > self.slow_seconds:
+            with self._lock:
+                self._stats["slow"] += 1
+            self.record_failure()
+            return
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probing = max(self._probing - 1, 0)
+                self._open_for = self.open_seconds
+            self._state = CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        """Count a failed call, opening the breaker when it is one too many"""
+        now = self._clock()
+        with self._lock:
+            self._stats["failures"] += 1
+            if self._state == HALF_OPEN:
+                # The probe failed: back off for longer before the next one
+                self._probing = max(self._probing - 1, 0)
+                self._open_for = min(self._open_for * 2, self.max_open_seconds)
+                self._open(now)
+            elif self._state == CLOSED:
+                self._failures += 1
+                if self._failures >= self.failure_threshold:
+                    self._open(now)
+
+    def stats(self):
+        """State, consecutive failures and open/reject/probe counters"""
+        now = self._clock()
+        with self._lock:
+            self._advance(now)
+            snapshot = dict(self._stats)
+            snapshot["state"] = self._state
+            snapshot["consecutive_failures"] = self._failures
+            snapshot["retry_in"] = (max(self._opened_at + self._open_for - now, 0.0)
+                                    if self._state == OPEN else 0.0)
+        return snapshot
+
+    def _open(self, now):
+        # Called with self._lock held
+        self._state = OPEN
+        self._opened_at = now
+        self._failures = 0
+        self._stats["opened"] += 1
+
+    def _advance(self, now):
+        # Called with self._lock held
+        if self._state == OPEN and now >= self._opened_at + self._open_for:
+            self._state = HALF_OPEN
+            self._probing = 0
+
+
+weather_breaker = CircuitBreaker(
+    failure_threshold=config.BREAKER_FAILURES,
+    slow_seconds=config.BREAKER_SLOW_SECONDS,
+    open_seconds=config.BREAKER_OPEN_SECONDS,
+    max_open_seconds=config.BREAKER_MAX_OPEN_SECONDS,
+)
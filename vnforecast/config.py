@@ -0,0 +1,123 @@
+"""Settings read from the environment (and .env) once per server process."""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_int(name, default):
+    """Read an integer setting, falling back to the default on bad values"""
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name, default):
+    """Read a float setting, falling back to the default on bad values"""
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "your_api_key_here")
+WEATHER_API_BASE_URL = os.getenv("WEATHER_API_BASE_URL", "https://api.weatherapi.com/v1")
+# "weatherapi" for the live service, "fixtures" for the offline stand-in (vnforecast.fixtures)
+WEATHER_PROVIDER = os.getenv("WEATHER_PROVIDER", "weatherapi")
+# Forecast days requested by the dashboard (and warmed by the prefetcher)
+FORECAST_DAYS = _env_int("WEATHER_FORECAST_DAYS", 2)
+# Most days fetched (on demand, for one province) when a long hourly horizon runs past FORECAST_DAYS
+FORECAST_MAX_DAYS = _env_int("WEATHER_FORECAST_MAX_DAYS", 4)
+
+# Shared response cache
+CACHE_MAX_ENTRIES = _env_int("WEATHER_CACHE_MAX_ENTRIES", 512)
+# WeatherAPI refreshes current observations roughly every 15 minutes
+CACHE_UPDATE_INTERVAL = _env_int("WEATHER_CACHE_UPDATE_INTERVAL", 900)
+CACHE_MIN_TTL = _env_int("WEATHER_CACHE_MIN_TTL", 60)
+CACHE_MAX_TTL = _env_int("WEATHER_CACHE_MAX_TTL", 1800)
+# How long an expired entry may still be served while it is refreshed
+CACHE_STALE_TTL = _env_int("WEATHER_CACHE_STALE_TTL", 3600)
+
+# Background prefetch of every province
+PREFETCH_ENABLED = os.getenv("WEATHER_PREFETCH_ENABLED", "1").lower() not in ("0", "false", "no")
+# Seconds for one full pass over all provinces
+PREFETCH_INTERVAL = _env_int("WEATHER_PREFETCH_INTERVAL", 900)
+# How long a page view waits for a province that has not been warmed yet
+PREFETCH_WAIT = _env_int("WEATHER_PREFETCH_WAIT", 15)
+
+# Pooled HTTP client
+HTTP_POOL_SIZE = _env_int("WEATHER_HTTP_POOL_SIZE", 16)
+HTTP_CONNECT_TIMEOUT = _env_float("WEATHER_HTTP_CONNECT_TIMEOUT", 3.05)
+HTTP_READ_TIMEOUT = _env_float("WEATHER_HTTP_READ_TIMEOUT", 10)
+# Extra attempts after the first on 429/5xx and network errors
+HTTP_RETRIES = _env_int("WEATHER_HTTP_RETRIES", 2)
+
+# WeatherAPI call budget shared by every fetch path (vnforecast.quota)
+QUOTA_ENABLED = os.getenv("WEATHER_QUOTA_ENABLED", "1").lower() not in ("0", "false", "no")
+QUOTA_MONTHLY_CALLS = _env_int("WEATHER_QUOTA_MONTHLY_CALLS", 1000000)
+# Upstream requests per second (token bucket refill rate and size); 0 disables spacing
+QUOTA_PER_SECOND = _env_float("WEATHER_QUOTA_PER_SECOND", 10)
+QUOTA_BURST = _env_int("WEATHER_QUOTA_BURST", 10)
+# Month-to-date usage survives restarts in this file
+QUOTA_PERSIST = os.getenv("WEATHER_QUOTA_PERSIST", "1").lower() not in ("0", "false", "no")
+QUOTA_STATE_PATH = os.getenv("WEATHER_QUOTA_STATE_PATH", os.path.join("data", "quota.json"))
+# Once the month is projected to end above this fraction of the budget, cache
+# TTLs and the prefetch interval are stretched (up to QUOTA_MAX_STRETCH times)
+QUOTA_STRETCH_AT = _env_float("WEATHER_QUOTA_STRETCH_AT", 0.8)
+QUOTA_MAX_STRETCH = _env_float("WEATHER_QUOTA_MAX_STRETCH", 4.0)
+
+# Circuit breaker around WeatherAPI calls (vnforecast.breaker)
+BREAKER_ENABLED = os.getenv("WEATHER_BREAKER_ENABLED", "1").lower() not in ("0", "false", "no")
+# Consecutive failed or slow attempts that open the breaker
+BREAKER_FAILURES = _env_int("WEATHER_BREAKER_FAILURES", 5)
+# An attempt slower than this counts as a failure even if it succeeds
+BREAKER_SLOW_SECONDS = _env_float("WEATHER_BREAKER_SLOW_SECONDS", 5.0)
+# Seconds the breaker stays open before a half-open probe; doubles after each failed probe
+BREAKER_OPEN_SECONDS = _env_int("WEATHER_BREAKER_OPEN_SECONDS", 30)
+BREAKER_MAX_OPEN_SECONDS = _env_int("WEATHER_BREAKER_MAX_OPEN_SECONDS", 300)
+
+# Nationwide overview: concurrent province fetches per page view
+OVERVIEW_WORKERS = _env_int("WEATHER_OVERVIEW_WORKERS", 16)
+
+# WeatherAPI bulk requests (many locations per POST); disabled automatically
+# for the process if the plan rejects them
+BULK_ENABLED = os.getenv("WEATHER_BULK_ENABLED", "1").lower() not in ("0", "false", "no")
+BULK_BATCH_SIZE = _env_int("WEATHER_BULK_BATCH_SIZE", 50)
+# Below this many locations, single requests are used instead
+BULK_MIN_LOCATIONS = _env_int("WEATHER_BULK_MIN_LOCATIONS", 4)
+
+# "consolidated" renders the weather card, metrics grid, hourly strip and daily
+# list as a few large elements; "columns" uses one Streamlit column per card
+RENDER_MODE = os.getenv("WEATHER_RENDER_MODE", "consolidated")
+
+# Rendered HTML fragments (weather card, metric grid, forecast blocks) shared across sessions
+FRAGMENT_CACHE_MAX_ENTRIES = _env_int("WEATHER_FRAGMENT_CACHE_MAX_ENTRIES", 2048)
+
+# Local Parquet history of fetched observations
+OBSERVATION_STORE_ENABLED = os.getenv("WEATHER_OBSERVATION_STORE_ENABLED", "1").lower() not in ("0", "false", "no")
+OBSERVATION_DIR = os.getenv("WEATHER_OBSERVATION_DIR", os.path.join("data", "observations"))
+# Seconds between batched writes; each write adds one small file per partition
+OBSERVATION_FLUSH_INTERVAL = _env_int("WEATHER_OBSERVATION_FLUSH_INTERVAL", 300)
+
+# Offline stand-in used when WEATHER_PROVIDER=fixtures (or served by `python -m vnforecast.fixtures serve`)
+FIXTURE_DIR = os.getenv("WEATHER_FIXTURE_DIR", os.path.join("fixtures", "weatherapi"))
+FIXTURE_LATENCY_MS = _env_float("WEATHER_FIXTURE_LATENCY_MS", 120)
+FIXTURE_LATENCY_SIGMA = _env_float("WEATHER_FIXTURE_LATENCY_SIGMA", 0.5)
+FIXTURE_ERROR_RATE = _env_float("WEATHER_FIXTURE_ERROR_RATE", 0.0)
+# Requests per second before the stand-in answers 429; 0 disables throttling
+FIXTURE_RATE_LIMIT = _env_float("WEATHER_FIXTURE_RATE_LIMIT", 0)
+FIXTURE_SEED = _env_int("WEATHER_FIXTURE_SEED", None)
+
+# Render/fetch timing instrumentation (sidebar debug panel and Prometheus export); off by default
+METRICS_ENABLED = os.getenv("WEATHER_METRICS_ENABLED", "0").lower() not in ("0", "false", "no")
+METRICS_HOST = os.getenv("WEATHER_METRICS_HOST", "127.0.0.1")
+# Port of the Prometheus text endpoint (GET /metrics); 0 keeps the debug panel only
+METRICS_PORT = _env_int("WEATHER_METRICS_PORT", 9464)
+
+# Headless JSON API (GET /api/v1/...) served from the shared cache next to the dashboard; off by default
+API_ENABLED = os.getenv("WEATHER_API_SERVER_ENABLED", "0").lower() not in ("0", "false", "no")
+API_HOST = os.getenv("WEATHER_API_SERVER_HOST", "127.0.0.1")
+API_PORT = _env_int("WEATHER_API_SERVER_PORT", 8502)
+# Threads that fetch provinces missing from the cache; cached responses never leave the event loop
+API_WORKERS = _env_int("WEATHER_API_SERVER_WORKERS", 4)
@@ -0,0 +1,415 @@
+"""Offline stand-in for WeatherAPI.com, for development and load testing.
+
+Serves current.json, forecast.json and bulk forecast requests for every
+province from recorded payloads in the fixture directory (one
+``<province-slug>.json`` forecast payload each), or from deterministic
+synthetic payloads for provinces without a recording. Latency follows a
+log-normal distribution, and a configurable share of requests fails with
+5xx or is throttled with 429, so the retry, cache and prefetch paths can be
+exercised without network access or API quota.
+
+Select it in-process with ``WEATHER_PROVIDER=fixtures``, or run it as a
+local server and point ``WEATHER_API_BASE_URL`` at it::
+
+    python -m vnforecast.fixtures serve --port 8765
+    python -m vnforecast.fixtures record   # needs WEATHER_API_KEY
+"""
+import argparse
+import copy
+import json
+import math
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+from zoneinfo import ZoneInfo
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from vnforecast import config
+from vnforecast.geo import nearest_province, parse_coordinates
+from vnforecast.provinces import PROVINCE_BY_LOCATION, REGISTRY, VIETNAMESE_PROVINCES, province_slug
+
+VN_TZ = ZoneInfo("Asia/Ho_Chi_Minh")
+
+# (code, day text, night text, icon number) for synthetic conditions
+CONDITIONS = [
+    (1000, "Sunny", "Clear", 113),
+    (1003, "Partly cloudy", "Partly cloudy", 116),
+    (1006, "Cloudy", "Cloudy", 119),
+    (1009, "Overcast", "Overcast", 122),
+    (1030, "Mist", "Mist", 143),
+    (1063, "Patchy rain nearby", "Patchy rain nearby", 176),
+    (1183, "Light rain", "Light rain", 296),
+    (1195, "Heavy rain", "Heavy rain", 308),
+    (1240, "Light rain shower", "Light rain shower", 353),
+    (1276, "Moderate or heavy rain with thunder", "Moderate or heavy rain with thunder", 389),
+]
+
+
+def _condition(rng, is_day):
+    code, day_text, night_text, icon = rng.choice(CONDITIONS)
+    period = "day" if is_day else "night"
+    return {
+        "text": day_text if is_day else night_text,
+        "icon": f"//cdn.weatherapi.com/weather/64x64/{period}/{icon}.png",
+        "code": code,
+    }
+
+
+def _air_quality(rng):
+    pm2_5 = round(rng.uniform(5, 90), 1)
+    index = 1 if pm2_5 < 12 else 2 if pm2_5 < 35 else 3 if pm2_5 < 55 else 4
+    return {
+        "co": round(rng.uniform(200, 900), 1),
+        "no2": round(rng.uniform(2, 40), 1),
+        "o3": round(rng.uniform(20, 120), 1),
+        "so2": round(rng.uniform(1, 15), 1),
+        "pm2_5": pm2_5,
+        "pm10": round(pm2_5 * rng.uniform(1.1, 1.6), 1),
+        "us-epa-index": index,
+        "gb-defra-index": min(index * 2, 10),
+    }
+
+
+def _hour(rng, base_temp, when):
+    is_day = 1 if 6 <= when.hour < 18 else 0
+    temp = round(base_temp + 4 * math.sin((when.hour - 9) / 24 * 2 * math.pi) + rng.uniform(-0.5, 0.5), 1)
+    humidity = int(min(100, max(40, 85 - (temp - base_temp) * 5 + rng.uniform(-5, 5))))
+    wind = round(rng.uniform(3, 25), 1)
+    return {
+        "time_epoch": int(when.timestamp()),
+        "time": when.strftime("%Y-%m-%d %H:%M"),
+        "temp_c": temp,
+        "temp_f": round(temp * 9 / 5 + 32, 1),
+        "is_day": is_day,
+        "condition": _condition(rng, is_day),
+        "wind_kph": wind,
+        "wind_mph": round(wind * 0.621371, 1),
+        "wind_degree": rng.randrange(360),
+        "wind_dir": rng.choice(["N", "NE", "E", "SE", "S", "SW", "W", "NW"]),
+        "pressure_mb": float(rng.randrange(1002, 1016)),
+        "precip_mm": round(max(0.0, rng.gauss(0.2, 0.6)), 2),
+        "humidity": humidity,
+        "cloud": rng.randrange(101),
+        "feelslike_c": round(temp + (humidity - 60) / 10, 1),
+        "windchill_c": round(temp - wind / 20, 1),
+        "heatindex_c": round(temp + (humidity - 60) / 10, 1),
+        "dewpoint_c": round(temp - (100 - humidity) / 5, 1),
+        "will_it_rain": int(rng.random() < 0.4),
+        "chance_of_rain": rng.randrange(0, 101, 5),
+        "vis_km": 10.0,
+        "gust_kph": round(wind * rng.uniform(1.2, 1.8), 1),
+        "uv": round(rng.uniform(0, 11), 1) if is_day else 0.0,
+        "air_quality": _air_quality(rng),
+    }
+
+
+def synthesize(province, location, days=3, now=None):
+    """Deterministic, plausible forecast.json payload for a province"""
+    now = datetime.fromtimestamp(now or time.time(), VN_TZ)
+    slug = province_slug(province)
+    rng = random.Random(f"{slug}:{now:%Y-%m-%d}")
+    base_temp = rng.uniform(18, 30)
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    forecast_days = []
+    for offset in range(days):
+        date = midnight + timedelta(days=offset)
+        hours = [_hour(rng, base_temp, date + timedelta(hours=h)) for h in range(24)]
+        temps = [h["temp_c"] for h in hours]
+        forecast_days.append({
+            "date": date.strftime("%Y-%m-%d"),
+            "date_epoch": int(date.timestamp()),
+            "day": {
+                "maxtemp_c": max(temps),
+                "mintemp_c": min(temps),
+                "avgtemp_c": round(sum(temps) / 24, 1),
+                "maxwind_kph": max(h["wind_kph"] for h in hours),
+                "totalprecip_mm": round(sum(h["precip_mm"] for h in hours), 1),
+                "avghumidity": sum(h["humidity"] for h in hours) // 24,
+                "daily_will_it_rain": int(any(h["will_it_rain"] for h in hours)),
+                "daily_chance_of_rain": max(h["chance_of_rain"] for h in hours),
+                "condition": hours[12]["condition"],
+                "uv": max(h["uv"] for h in hours),
+            },
+            "astro": {"sunrise": "05:45 AM", "sunset": "05:40 PM"},
+            "hour": hours,
+        })
+
+    current_hour = forecast_days[0]["hour"][now.hour]
+    current = {key: value for key, value in current_hour.items() if key not in ("time_epoch", "time", "will_it_rain", "chance_of_rain")}
+    observed = int(now.timestamp()) - int(now.timestamp()) % 900
+    current["last_updated_epoch"] = observed
+    current["last_updated"] = datetime.fromtimestamp(observed, VN_TZ).strftime("%Y-%m-%d %H:%M")
+    alerts = []
+    if rng.random() < 0.1:
+        alerts.append({
+            "headline": "Heavy rain warning",
+            "severity": "Moderate",
+            "event": "Heavy rain",
+            "effective": now.strftime("%Y-%m-%dT%H:00:00+07:00"),
+            "expires": (now + timedelta(hours=12)).strftime("%Y-%m-%dT%H:00:00+07:00"),
+            "desc": f"Heavy rain is expected over {province} in the next 12 hours.",
+        })
+    return {
+        "location": {
+            "name": REGISTRY[province].capital,
+            "region": province,
+            "country": "Vietnam",
+            "lat": REGISTRY[province].lat,
+            "lon": REGISTRY[province].lon,
+            "tz_id": "Asia/Ho_Chi_Minh",
+            "localtime_epoch": int(now.timestamp()),
+            "localtime": now.strftime("%Y-%m-%d %H:%M"),
+        },
+        "current": current,
+        "forecast": {"forecastday": forecast_days},
+        "alerts": {"alert": alerts},
+    }
+
+
+class FixtureBackend:
+    """Answers WeatherAPI requests from fixtures with simulated latency and faults"""
+
+    def __init__(self, fixture_dir=None, latency_ms=120.0, latency_sigma=0.5, error_rate=0.0,
+                 rate_limit=0.0, seed=None):
+        self.fixture_dir = fixture_dir
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recorded = {}
+        self._tokens = rate_limit
+        self._refilled = time.monotonic()
+        self._stats = {"requests": 0, "locations": 0, "errors": 0, "throttled": 0}
+
+    @classmethod
+    def from_config(cls):
+        return cls(
+            fixture_dir=config.FIXTURE_DIR,
+            latency_ms=config.FIXTURE_LATENCY_MS,
+            latency_sigma=config.FIXTURE_LATENCY_SIGMA,
+            error_rate=config.FIXTURE_ERROR_RATE,
+            rate_limit=config.FIXTURE_RATE_LIMIT,
+            seed=config.FIXTURE_SEED,
+        )
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def latency(self):
+        """Seconds the next response should take"""
+        with self._lock:
+            return self._rng.lognormvariate(math.log(self.latency_ms / 1000), self.latency_sigma)
+
+    def respond(self, method, path, params, body=None):
+        """(status, payload) for one request; does not sleep"""
+        endpoint = path.rsplit("/", 1)[-1]
+        with self._lock:
+            self._stats["requests"] += 1
+            if not self._take_token():
+                self._stats["throttled"] += 1
+                return 429, {"error": {"code": 2007, "message": "API key has exceeded calls per month quota."}}
+            if self._rng.random() < self.error_rate:
+                self._stats["errors"] += 1
+                return self._rng.choice([500, 502, 503]), {"error": {"code": 9999, "message": "Internal application error."}}
+        if endpoint not in ("current.json", "forecast.json"):
+            return 400, {"error": {"code": 1005, "message": "API request url is invalid."}}
+
+        if params.get("q") == "bulk":
+            results = []
+            for item in (body or {}).get("locations", []):
+                status, payload = self._payload(endpoint, item.get("q", ""), params)
+                query = {"custom_id": item.get("custom_id"), "q": item.get("q")}
+                # Failed locations carry their "error" block inside the query, as upstream does
+                query.update(payload)
+                results.append({"query": query})
+            return 200, {"bulk": results}
+        return self._payload(endpoint, params.get("q", ""), params)
+
+    def _payload(self, endpoint, location, params):
+        province = PROVINCE_BY_LOCATION.get(location)
+        if province is None and parse_coordinates(location) is not None:
+            # Like upstream, any coordinate resolves to the nearest place
+            province = nearest_province(*parse_coordinates(location))
+        if province is None:
+            return 400, {"error": {"code": 1006, "message": "No matching location found."}}
+        with self._lock:
+            self._stats["locations"] += 1
+        days = min(int(params.get("days", 1)), 14)
+        payload = self._recorded_payload(province)
+        if payload is None:
+            payload = synthesize(province, location, days=max(days, 1))
+        else:
+            payload = copy.deepcopy(payload)
+            _refresh_timestamps(payload)
+
+        if params.get("aqi") != "yes":
+            payload["current"].pop("air_quality", None)
+            for day in payload.get("forecast", {}).get("forecastday", []):
+                for hour in day.get("hour", []):
+                    hour.pop("air_quality", None)
+        if endpoint == "current.json":
+            return 200, {"location": payload["location"], "current": payload["current"]}
+        payload["forecast"]["forecastday"] = payload["forecast"]["forecastday"][:days]
+        if params.get("alerts") != "yes":
+            payload.pop("alerts", None)
+        return 200, payload
+
+    def _recorded_payload(self, province):
+        if not self.fixture_dir:
+            return None
+        slug = province_slug(province)
+        if slug not in self._recorded:
+            path = os.path.join(self.fixture_dir, f"{slug}.json")
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._recorded[slug] = json.load(f)
+            except (OSError, ValueError):
+                self._recorded[slug] = None
+        return self._recorded[slug]
+
+    def _take_token(self):
+        # Called with self._lock held
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+        self._refilled = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+def _refresh_timestamps(payload):
+    # Recorded payloads are replayed as if observed now, so TTLs behave as live
+    now = int(time.time())
+    observed = now - now % 900
+    shift = observed - payload["current"].get("last_updated_epoch", observed)
+    payload["current"]["last_updated_epoch"] = observed
+    payload["current"]["last_updated"] = datetime.fromtimestamp(observed, VN_TZ).strftime("%Y-%m-%d %H:%M")
+    payload["location"]["localtime_epoch"] = now
+    payload["location"]["localtime"] = datetime.fromtimestamp(now, VN_TZ).strftime("%Y-%m-%d %H:%M")
+    days = shift // 86400 * 86400
+    for day in payload.get("forecast", {}).get("forecastday", []):
+        day["date_epoch"] = day.get("date_epoch", 0) + days
+        day["date"] = datetime.fromtimestamp(day["date_epoch"], VN_TZ).strftime("%Y-%m-%d")
+        for hour in day.get("hour", []):
+            hour["time_epoch"] = hour.get("time_epoch", 0) + days
+            hour["time"] = datetime.fromtimestamp(hour["time_epoch"], VN_TZ).strftime("%Y-%m-%d %H:%M")
+
+
+class FixtureAdapter(BaseAdapter):
+    """requests transport adapter that answers from a FixtureBackend in-process"""
+
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        parts = urlsplit(request.url)
+        params = dict(parse_qsl(parts.query))
+        body = json.loads(request.body) if request.body else None
+        status, payload = self.backend.respond(request.method, parts.path, params, body)
+
+        delay = self.backend.latency()
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            raise requests.exceptions.ReadTimeout(f"Fixture response took longer than {read_timeout}s", request=request)
+        time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = {200: "OK", 400: "Bad Request", 429: "Too Many Requests"}.get(status, "Server Error")
+        response._content = json.dumps(payload).encode("utf-8")
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def serve(host="127.0.0.1", port=8765, backend=None):
+    """Run the stand-in as an HTTP server (blocks)"""
+    backend = backend or FixtureBackend.from_config()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, body=None):
+            parts = urlsplit(self.path)
+            status, payload = backend.respond(self.command, parts.path, dict(parse_qsl(parts.query)), body)
+            time.sleep(backend.latency())
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._reply()
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self._reply(json.loads(self.rfile.read(length) or b"{}"))
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    print(f"WeatherAPI stand-in on http://{host}:{server.server_port}/v1")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def record(fixture_dir, days=3):
+    """Save a live forecast payload for every province into fixture_dir"""
+    os.makedirs(fixture_dir, exist_ok=True)
+    for province, location in VIETNAMESE_PROVINCES.items():
+        response = requests.get(
+            "https://api.weatherapi.com/v1/forecast.json",
+            params={"key": config.WEATHER_API_KEY, "q": location, "days": days, "aqi": "yes", "alerts": "yes"},
+            timeout=10,
+        )
+        response.raise_for_status()
+        with open(os.path.join(fixture_dir, f"{province_slug(province)}.json"), "w", encoding="utf-8") as f:
+            json.dump(response.json(), f, ensure_ascii=False)
+        print(f"Recorded {province}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="Run the stand-in HTTP server")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    record_parser = commands.add_parser("record", help="Record live payloads for every province")
+    record_parser.add_argument("--dir", default=config.FIXTURE_DIR)
+    record_parser.add_argument("--days", type=int, default=3)
+    args = parser.parse_args()
+    if args.command == "serve":
+        serve(args.host, args.port)
+    else:
+        record(args.dir, args.days)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Decoded forecasts flattened into time-indexed frames for slicing by horizon."""
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from vnforecast import config
+from vnforecast.units import convert_frame, convert_record
+
+# Hourly horizons the dashboard offers; anything up to the fetched days works
+HORIZONS = (12, 24, 48, 72)
+# Forecast days start at local midnight in every province
+VN_TZ = ZoneInfo("Asia/Ho_Chi_Minh")
+
+HOURLY_COLUMNS = ["time_epoch", "time", "temp_c", "feelslike_c", "chance_of_rain", "precip_mm",
+                  "humidity", "wind_kph", "is_day"]
+
+
+def hourly_frame(forecast):
+    """Every forecast hour across all days as one frame, in time order.
+
+    Columns are HOURLY_COLUMNS plus ``condition_text``, ``condition_icon``,
+    ``condition_code`` and ``day`` (index of the forecast day the hour
+    belongs to), built straight from the forecast's hourly arrays. ``time``
+    is the hour's local time at the location, as WeatherAPI formats it.
+    """
+    hourly = forecast.hourly
+    times = pd.to_datetime(hourly.time_epoch, unit="s", utc=True)
+    if forecast.location.tz_id:
+        times = times.tz_convert(forecast.location.tz_id)
+    frame = pd.DataFrame({
+        name: times.strftime("%Y-%m-%d %H:%M") if name == "time" else getattr(hourly, name)
+        for name in HOURLY_COLUMNS
+    })
+    frame["condition_text"] = [c.text for c in hourly.conditions]
+    frame["condition_icon"] = [c.icon for c in hourly.conditions]
+    frame["condition_code"] = [c.code for c in hourly.conditions]
+    frame["day"] = hourly.day
+    return frame
+
+
+def daily_frame(forecast, hourly=None):
+    """One row per forecast day: the provider's day block plus hourly aggregates.
+
+    ``avg_chance_of_rain`` and ``total_precip_mm`` are computed from the
+    hours that day actually has, so partial days are not diluted.
+    """
+    days = forecast.days
+    hourly = hourly_frame(forecast) if hourly is None else hourly
+    frame = pd.DataFrame({
+        "date": [day.date for day in days],
+        "maxtemp_c": [day.maxtemp_c for day in days],
+        "mintemp_c": [day.mintemp_c for day in days],
+        "maxwind_kph": [day.maxwind_kph for day in days],
+        "uv": [day.uv for day in days],
+        "condition_text": [day.condition.text for day in days],
+        "condition_icon": [day.condition.icon for day in days],
+    })
+    by_day = hourly.groupby("day")
+    frame["avg_chance_of_rain"] = by_day["chance_of_rain"].mean().reindex(frame.index).to_numpy()
+    frame["total_precip_mm"] = by_day["precip_mm"].sum().reindex(frame.index).to_numpy()
+    return frame
+
+
+def start_index(hourly, now_epoch):
+    """Row of the hour containing now_epoch (the first row if now is before the forecast)"""
+    epochs = hourly["time_epoch"].to_numpy()
+    return max(int(np.searchsorted(epochs, now_epoch, side="right")) - 1, 0)
+
+
+def next_hours(hourly, now_epoch, hours=24):
+    """The hour containing now_epoch and the following hours, up to hours rows.
+
+    A plain slice of the flattened frame, so windows crossing midnight (or
+    several days) cost the same as any other.
+    """
+    start = start_index(hourly, now_epoch)
+    return hourly.iloc[start:start + hours]
+
+
+def days_for_horizon(horizon, now_epoch, min_days=None):
+    """Forecast days needed for the hour containing now_epoch and the horizon - 1 hours after it"""
+    hour = datetime.fromtimestamp(now_epoch, VN_TZ).hour
+    return max(min_days or config.FORECAST_DAYS, -(-(hour + horizon) // 24))
+
+
+def horizons(now_epoch, max_days=None):
+    """HORIZONS that max_days forecast days still cover in full from the hour containing now_epoch"""
+    max_days = max_days or config.FORECAST_MAX_DAYS
+    fitting = [h for h in HORIZONS if days_for_horizon(h, now_epoch, 1) <= max_days]
+    return fitting or [HORIZONS[0]]
+
+
+def window_summary(hourly, now_epoch, hours=24):
+    """Aggregates over the next hours for compact multi-province views"""
+    window = next_hours(hourly, now_epoch, hours)
+    if window.empty:
+        return {"min_temp_c": None, "max_temp_c": None, "max_chance_of_rain": None, "precip_mm": None}
+    return {
+        "min_temp_c": float(window["temp_c"].min()),
+        "max_temp_c": float(window["temp_c"].max()),
+        "max_chance_of_rain": float(window["chance_of_rain"].max()),
+        "precip_mm": float(window["precip_mm"].sum()),
+    }
+
+
+class FrameCache:
+    """Values derived from a forecast object, so each is computed only once.
+
+    Entries are keyed by the source object's id() and a variant (None for
+    the plain frames, a UnitSystem for a converted view) and hold a
+    reference to the source, which keeps the id() from being reused while
+    the entry lives.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, source, variant, build):
+        """build(source), computed on the first lookup of (source, variant)"""
+        key = (id(source), variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is source:
+                self._entries.move_to_end(key)
+                return entry[1]
+        value = build(source)
+        with self._lock:
+            self._entries[key] = (source, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+
+# A forecast has its plain frames plus one view per unit system in use
+frame_cache = FrameCache(max_entries=config.CACHE_MAX_ENTRIES * 4)
+
+
+def _flatten(forecast):
+    hourly = hourly_frame(forecast)
+    return hourly, daily_frame(forecast, hourly)
+
+
+def frames(forecast, units=None):
+    """Cached (hourly, daily) frames for a model.Forecast.
+
+    With a UnitSystem, the frames also carry the converted columns added by
+    ``units.convert_frame`` (``temp``, ``feelslike``, ``maxtemp``,
+    ``maxwind`` ...). Each unit system is converted once per forecast, so
+    switching units is a cache lookup.
+    """
+    if units is None:
+        return frame_cache.get(forecast, None, _flatten)
+    return frame_cache.get(forecast, units,
+                           lambda p: tuple(convert_frame(frame, units) for frame in frames(p)))
+
+
+def current_values(current, units):
+    """The current block's temperatures, speeds and pressure in units, cached per observation"""
+    return frame_cache.get(current, units, lambda c: convert_record(c, units))
@@ -0,0 +1,61 @@
+"""Process-wide LRU cache of rendered HTML fragments."""
+import threading
+from collections import OrderedDict
+
+from vnforecast import config
+
+
+class FragmentCache:
+    """Bounded LRU of prebuilt HTML shared by all sessions.
+
+    Keys carry everything a fragment depends on (fragment name, province,
+    the observation's ``last_updated_epoch``, language and units), so a
+    fragment never needs invalidating: a new observation or a different
+    setting is simply a different key, and the old one ages out.
+    """
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key, build):
+        """Return the fragment for key, calling build() to render it on a miss.
+
+        Errors raised by build propagate and nothing is cached.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return value
+            self._stats["misses"] += 1
+
+        # Two sessions missing the same key both render it; fragments are
+        # cheap enough that coalescing is not worth holding the lock
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Snapshot of hit/miss/eviction counters and current size"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["size"] = len(self._entries)
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = snapshot["hits"] / lookups if lookups else 0.0
+        return snapshot
+
+
+fragment_cache = FragmentCache(max_entries=config.FRAGMENT_CACHE_MAX_ENTRIES)
@@ -0,0 +1,101 @@
+"""Coordinate parsing and nearest-province lookup over a uniform grid."""
+import math
+import re
+
+from vnforecast.provinces import PROVINCES
+
+EARTH_RADIUS_KM = 6371.0
+
+_COORDINATES = re.compile(r"^\s*(-?\d{1,2}(?:\.\d+)?)\s*[,;\s]\s*(-?\d{1,3}(?:\.\d+)?)\s*$")
+
+
+def parse_coordinates(text):
+    """(lat, lon) from text like "16.05,108.2" or "16.05 108.2", else None"""
+    match = _COORDINATES.match(text or "")
+    if match is None:
+        return None
+    lat, lon = float(match.group(1)), float(match.group(2))
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in km"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class GridIndex:
+    """Nearest-point lookup over a fixed set of points bucketed into square cells.
+
+    Points are projected onto a plane (longitude scaled by the cosine of a
+    reference latitude, which keeps cells close to square across Vietnam)
+    and searched ring by ring outwards from the query's cell. The search
+    stops as soon as no unvisited ring can hold anything closer, so a lookup
+    touches a handful of cells whatever the number of points.
+    """
+
+    def __init__(self, points, cell_deg=1.0, ref_lat=16.0):
+        """points: iterable of (key, lat, lon)"""
+        self.cell_deg = cell_deg
+        self._scale = math.cos(math.radians(ref_lat))
+        self._cells = {}
+        for key, lat, lon in points:
+            x, y = self._project(lat, lon)
+            self._cells.setdefault(self._cell(x, y), []).append((x, y, key, lat, lon))
+        columns = [cx for cx, _ in self._cells]
+        rows = [cy for _, cy in self._cells]
+        self._bounds = (min(columns), max(columns), min(rows), max(rows)) if self._cells else None
+
+    def _project(self, lat, lon):
+        return lon * self._scale, lat
+
+    def _cell(self, x, y):
+        return math.floor(x / self.cell_deg), math.floor(y / self.cell_deg)
+
+    def nearest(self, lat, lon):
+        """(key, distance in km) of the point closest to lat, lon, or None when empty"""
+        if self._bounds is None:
+            return None
+        x, y = self._project(lat, lon)
+        cx, cy = self._cell(x, y)
+        min_x, max_x, min_y, max_y = self._bounds
+        last_ring = max(abs(cx - min_x), abs(cx - max_x), abs(cy - min_y), abs(cy - max_y))
+        best, best_d2 = None, math.inf
+        for ring in range(last_ring + 1):
+            for cell in self._ring(cx, cy, ring):
+                for px, py, key, plat, plon in self._cells.get(cell, ()):
+                    d2 = (px - x) ** 2 + (py - y) ** 2
+                    if d2 < best_d2:
+                        best, best_d2 = (key, plat, plon), d2
+            # Anything in a later ring is at least ring cells away
+            if best is not None and (ring * self.cell_deg) ** 2 >= best_d2:
+                break
+        key, plat, plon = best
+        return key, haversine_km(lat, lon, plat, plon)
+
+    @staticmethod
+    def _ring(cx, cy, ring):
+        if ring == 0:
+            yield cx, cy
+            return
+        for dx in range(-ring, ring + 1):
+            yield cx + dx, cy - ring
+            yield cx + dx, cy + ring
+        for dy in range(-ring + 1, ring):
+            yield cx - ring, cy + dy
+            yield cx + ring, cy + dy
+
+
+# Built once per server process, on first import
+province_grid = GridIndex((province.name, province.lat, province.lon) for province in PROVINCES)
+
+
+def nearest_province(lat, lon, max_km=150):
+    """Name of the province whose capital is closest to lat, lon; None if none is within max_km"""
+    found = province_grid.nearest(lat, lon)
+    if found is None or (max_km is not None and found[1] > max_km):
+        return None
+    return found[0]
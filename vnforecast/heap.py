@@ -0,0 +1,26 @@
+"""Keeps Streamlit's post-run garbage collection cheap."""
+import gc
+import threading
+
+_frozen = False
+_lock = threading.Lock()
+
+
+def freeze_startup_objects():
+    """Move everything allocated so far out of the cyclic collector's reach, once per process.
+
+    Streamlit runs a full ``gc.collect()`` after every script and fragment
+    run. Most of what it scans is long-lived: imported libraries, the
+    province registry, search and grid indexes, module-level caches. Frozen
+    objects are skipped by every later collection, so the cost of a run's
+    collection follows the garbage that run made instead of the size of the
+    process.
+    """
+    global _frozen
+    with _lock:
+        if _frozen:
+            return
+        # Free whatever is already garbage so it is not frozen with the rest
+        gc.collect()
+        gc.freeze()
+        _frozen = True
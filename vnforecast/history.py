@@ -0,0 +1,55 @@
+"""Downsampled per-province history read from the local observation store."""
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from vnforecast.observation_store import observation_store
+
+RANGES = {
+    "24h": 24 * 3600,
+    "7d": 7 * 24 * 3600,
+    "30d": 30 * 24 * 3600,
+}
+
+# Observed columns shown in the history panel
+METRICS = ["temp_c", "humidity", "precip_mm", "pm2_5"]
+
+# WeatherAPI publishes a new observation about every 15 minutes, so finer
+# buckets would only hold one point each
+MIN_BUCKET_SECONDS = 900
+
+
+def bucket_seconds(span, max_points):
+    """Bucket width that keeps a span under max_points buckets"""
+    return max(MIN_BUCKET_SECONDS, -(-span // max_points))
+
+
+def downsample(table, time_column, metrics, bucket):
+    """Aggregate rows into fixed-width time buckets with min/mean/max per metric"""
+    buckets = pc.multiply(pc.divide(table[time_column], pa.scalar(bucket, pa.int64())), pa.scalar(bucket, pa.int64()))
+    grouped = table.select(metrics).append_column("bucket", buckets).group_by("bucket").aggregate(
+        [(metric, agg) for metric in metrics for agg in ("min", "mean", "max")]
+    )
+    return grouped.sort_by("bucket")
+
+
+def load_history(province, range_key="24h", max_points=240, now=None):
+    """History for province over one of RANGES as a DataFrame.
+
+    Columns are ``time`` (bucket start, Asia/Ho_Chi_Minh) and
+    ``<metric>_min/_mean/_max`` for every metric in METRICS. Returns an empty
+    DataFrame when the store is disabled or has no rows for the range.
+    """
+    if observation_store is None:
+        return pd.DataFrame()
+    now = int(now if now is not None else time.time())
+    span = RANGES[range_key]
+    table = observation_store.scan("current", province=province, start_epoch=now - span, end_epoch=now,
+                                   columns=METRICS)
+    if table.num_rows == 0:
+        return pd.DataFrame()
+    frame = downsample(table, "observed_epoch", METRICS, bucket_seconds(span, max_points)).to_pandas()
+    frame["time"] = pd.to_datetime(frame.pop("bucket"), unit="s", utc=True).dt.tz_convert("Asia/Ho_Chi_Minh")
+    return frame
@@ -0,0 +1,224 @@
+"""Shared keep-alive HTTP client for WeatherAPI with retry and latency accounting."""
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import (Retrying, retry_if_exception, stop_after_attempt,
+                      wait_random_exponential)
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from vnforecast import config
+from vnforecast.breaker import weather_breaker
+from vnforecast.quota import quota_limiter
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Seconds spent opening connections (TCP + TLS) by the request on this thread
+_connect_time = threading.local()
+
+
+def _add_connect_time(seconds):
+    _connect_time.seconds = getattr(_connect_time, "seconds", 0.0) + seconds
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - started)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - started)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools record how long new connections take to open"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def _is_retryable(error):
+    if isinstance(error, requests.exceptions.HTTPError):
+        return error.response is not None and error.response.status_code in RETRYABLE_STATUS
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+class CallTiming:
+    __slots__ = ("endpoint", "status", "attempts", "connect", "transfer", "total", "reused", "size")
+
+    def __init__(self, endpoint, status, attempts, connect, transfer, total, reused, size):
+        self.endpoint = endpoint
+        self.status = status
+        self.attempts = attempts
+        self.connect = connect
+        self.transfer = transfer
+        self.total = total
+        self.reused = reused
+        self.size = size
+
+
+class WeatherHttpClient:
+    """One pooled requests.Session shared by every fetch in the process.
+
+    Connections are kept alive and reused across threads, connect and read
+    timeouts are separate, and 429/5xx/network errors are retried with
+    jittered exponential backoff. Each call records how much of its latency
+    was spent opening connections versus sending the request and reading the
+    response. With a ``quota`` (see vnforecast.quota), every attempt first
+    takes a token from it and is counted against the monthly budget. With a
+    ``breaker`` (see vnforecast.breaker), every attempt is let through by it
+    first and its outcome reported back; while it is open, calls raise
+    CircuitOpen without touching the network.
+    """
+
+    def __init__(self, pool_size=16, connect_timeout=3.05, read_timeout=10, retries=3,
+                 backoff=0.5, backoff_max=8, history=1000, quota=None, breaker=None):
+        self.timeout = (connect_timeout, read_timeout)
+        self._session = requests.Session()
+        adapter = _TimedAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=False)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._retrying = Retrying(
+            stop=stop_after_attempt(retries + 1),
+            wait=wait_random_exponential(multiplier=backoff, max=backoff_max),
+            retry=retry_if_exception(_is_retryable),
+            reraise=True,
+        )
+        self._timings = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._observers = []
+        self._quota = quota
+        self._breaker = breaker
+
+    def mount(self, prefix, adapter):
+        """Send requests for URLs starting with prefix through another transport adapter"""
+        self._session.mount(prefix, adapter)
+
+    def add_observer(self, observer):
+        """Call observer(timing) with every CallTiming, on the thread that made the call"""
+        self._observers.append(observer)
+
+    def get_json(self, url, params=None, endpoint=None):
+        """GET url and decode JSON, retrying transient failures"""
+        return self._request_json("GET", url, params=params, endpoint=endpoint)
+
+    def post_json(self, url, params=None, body=None, endpoint=None, cost=1):
+        """POST a JSON body to url and decode the JSON reply, retrying transient failures.
+
+        cost is how many calls the provider bills for one attempt (one per
+        location of a bulk request).
+        """
+        return self._request_json("POST", url, params=params, body=body, endpoint=endpoint, cost=cost)
+
+    def _request_json(self, method, url, params=None, body=None, endpoint=None, cost=1):
+        _connect_time.seconds = 0.0
+        attempts = 0
+        started = time.perf_counter()
+        response = None
+        try:
+            for attempt in self._retrying.copy():
+                with attempt:
+                    attempts += 1
+                    if self._breaker is not None:
+                        self._breaker.before_call()
+                    if self._quota is not None:
+                        self._quota.acquire(cost)
+                    response = self._attempt(method, url, params, body)
+            return response.json()
+        finally:
+            total = time.perf_counter() - started
+            connect = getattr(_connect_time, "seconds", 0.0)
+            self._record(CallTiming(
+                endpoint=endpoint or url,
+                status=response.status_code if response is not None else None,
+                attempts=attempts,
+                connect=connect,
+                transfer=total - connect,
+                total=total,
+                reused=connect == 0.0,
+                size=len(response.content) if response is not None else 0,
+            ))
+
+    def _attempt(self, method, url, params, body):
+        # One request, its outcome reported to the breaker
+        started = time.perf_counter()
+        try:
+            response = self._session.request(method, url, params=params, json=body, timeout=self.timeout)
+            response.raise_for_status()
+        except Exception as e:
+            if self._breaker is not None:
+                if _is_retryable(e):
+                    self._breaker.record_failure()
+                else:
+                    # The provider answered (e.g. 400 for an unknown location)
+                    self._breaker.record_success(time.perf_counter() - started)
+            raise
+        if self._breaker is not None:
+            self._breaker.record_success(time.perf_counter() - started)
+        return response
+
+    def timings(self):
+        """Most recent per-call timings, oldest first"""
+        with self._lock:
+            return list(self._timings)
+
+    def latency_stats(self):
+        """Aggregate connect/transfer latency over the recorded calls"""
+        timings = self.timings()
+        if not timings:
+            return {"calls": 0}
+        totals = sorted(t.total for t in timings)
+        return {
+            "calls": len(timings),
+            "reused_ratio": sum(t.reused for t in timings) / len(timings),
+            "retried_calls": sum(t.attempts > 1 for t in timings),
+            "connect_mean": sum(t.connect for t in timings) / len(timings),
+            "transfer_mean": sum(t.transfer for t in timings) / len(timings),
+            "total_p50": totals[len(totals) // 2],
+            "total_p95": totals[min(int(len(totals) * 0.95), len(totals) - 1)],
+        }
+
+    def _record(self, timing):
+        with self._lock:
+            self._timings.append(timing)
+        for observer in self._observers:
+            observer(timing)
+
+
+weather_http = WeatherHttpClient(
+    pool_size=config.HTTP_POOL_SIZE,
+    connect_timeout=config.HTTP_CONNECT_TIMEOUT,
+    read_timeout=config.HTTP_READ_TIMEOUT,
+    retries=config.HTTP_RETRIES,
+    quota=quota_limiter if config.QUOTA_ENABLED else None,
+    breaker=weather_breaker if config.BREAKER_ENABLED else None,
+)
+
+if config.WEATHER_PROVIDER == "fixtures":
+    from vnforecast.fixtures import FixtureAdapter, FixtureBackend
+
+    weather_http.mount(config.WEATHER_API_BASE_URL, FixtureAdapter(FixtureBackend.from_config()))
@@ -0,0 +1,421 @@
+"""Headless JSON API over the shared cache: current, hourly, daily and alerts per province.
+
+Runs on its own tornado event loop next to the dashboard, or alone with
+
+    python -m vnforecast.json_api --port 8502
+
+Routes (``<province>`` is a slug such as ``da-nang`` or a GSO code such as
+``48``; ``<view>`` is current, hourly, daily or alerts):
+
+    GET /api/v1/provinces                    the province registry
+    GET /api/v1/provinces/<province>         every view of one province
+    GET /api/v1/provinces/<province>/<view>  one view of one province
+    GET /api/v1/all[/<view>]                 the same for every province
+
+Each body is serialized and gzipped once per observation and then served
+as bytes. Responses carry a weak ETag and Last-Modified derived from the
+observation time, so clients polling with If-None-Match or
+If-Modified-Since mostly get an empty 304.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from email.utils import formatdate, parsedate_to_datetime
+from http.client import responses
+
+import numpy as np
+import requests
+import tornado.httpserver
+import tornado.httputil
+import tornado.netutil
+
+from vnforecast import config, overview, weather_api
+from vnforecast.breaker import CircuitOpen
+from vnforecast.model import HOURLY_FIELDS
+from vnforecast.provinces import PROVINCES, province_slug
+
+VIEWS = ("current", "hourly", "daily", "alerts")
+
+# Retry-After for a cold province the prefetcher has not fetched yet
+BUSY_RETRY_SECONDS = 5
+
+# Slug and GSO code -> Province
+PROVINCE_KEYS = {**{province_slug(p.name): p for p in PROVINCES}, **{p.code: p for p in PROVINCES}}
+
+
+class Document:
+    """One response body, its gzip encoding (None when that would not be smaller) and validators"""
+    __slots__ = ("body", "gzipped", "modified_epoch", "etag", "last_modified")
+
+    def __init__(self, body, modified_epoch=None):
+        self.body = body
+        gzipped = gzip.compress(body, compresslevel=6, mtime=0)
+        self.gzipped = gzipped if len(gzipped) < len(body) else None
+        self.modified_epoch = int(modified_epoch) if modified_epoch else None
+        # Weak: the identity and gzip encodings share it
+        self.etag = f'W/"{self.modified_epoch or 0:x}-{zlib.crc32(body):08x}"'
+        self.last_modified = formatdate(self.modified_epoch, usegmt=True) if self.modified_epoch else None
+
+
+def dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def hourly_rows(series):
+    """One dict per forecast hour; missing readings are null"""
+    if series is None:
+        return []
+    columns = {}
+    for name, (dtype, _) in HOURLY_FIELDS.items():
+        values = getattr(series, name)
+        if np.issubdtype(dtype, np.floating):
+            # float32 -> two decimals, so 27.3 is not written as 27.299999237060547
+            values = np.round(values.astype(np.float64), 2)
+            columns[name] = [None if v != v else v for v in values.tolist()]
+        else:
+            columns[name] = values.tolist()
+    conditions = [asdict(condition) for condition in series.conditions]
+    return [dict(zip(columns, hour), condition=condition)
+            for hour, condition in zip(zip(*columns.values()), conditions)]
+
+
+def province_info(province):
+    return {"name": province.name, "slug": province_slug(province.name), "code": province.code}
+
+
+def view_payload(province, forecast, view):
+    """JSON-ready dict of one view (or every view when view is None) of a cached forecast"""
+    payload = province_info(province)
+    payload["last_updated_epoch"] = forecast.current.last_updated_epoch
+    if view in (None, "current"):
+        payload["location"] = asdict(forecast.location)
+        payload["current"] = asdict(forecast.current)
+    if view in (None, "hourly"):
+        payload["hourly"] = hourly_rows(forecast.hourly)
+    if view in (None, "daily"):
+        payload["daily"] = [asdict(day) for day in forecast.days]
+    if view in (None, "alerts"):
+        payload["alerts"] = [asdict(alert) for alert in forecast.alerts]
+    return payload
+
+
+def registry_document():
+    provinces = [dict(province_info(p), capital=p.capital, lat=p.lat, lon=p.lon, merged_into=p.merged_into,
+                      url=f"/api/v1/provinces/{province_slug(p.name)}")
+                 for p in PROVINCES]
+    return Document(dumps({"provinces": provinces, "views": list(VIEWS)}))
+
+
+def accepts_gzip(header):
+    """Whether an Accept-Encoding header allows gzip"""
+    if not header or ("gzip" not in header and "*" not in header):
+        return False
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        name, _, value = params.strip().partition("=")
+        try:
+            return name.strip() != "q" or float(value) > 0
+        except ValueError:
+            return False
+    return False
+
+
+class JsonApi(tornado.httputil.HTTPServerConnectionDelegate):
+    """Documents built from the shared cache, and the HTTP server answering with them.
+
+    Documents are kept per (province, view) next to the Forecast they were
+    built from and rebuilt only when the cache holds a different one, so a
+    cached response costs a cache peek, an identity check and a header
+    comparison. Requests are handled by tornado's HTTP/1.1 connection layer
+    directly rather than through ``tornado.web``, whose per-request handler
+    setup costs more than everything else here put together. Everything runs
+    on the API's event loop thread except upstream fetches for provinces
+    missing from the cache, which go to a small thread pool.
+    """
+
+    def __init__(self, enabled=True, workers=4):
+        self.enabled = enabled
+        self.workers = workers
+        self.registry = registry_document()
+        self._documents = {}
+        self._collections = {}
+        self._pool = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._date = (0, "")
+        # Only updated on the event loop thread
+        self._stats = {"requests": 0, "not_modified": 0, "gzip": 0, "built": 0, "loads": 0, "errors": 0}
+
+    def start_request(self, server_conn, request_conn):
+        return _Request(self, request_conn)
+
+    def handle(self, method, path, headers):
+        """(status, headers, body) for a request, or an awaitable of it when data must be fetched first"""
+        route = self.route(path)
+        if route is None:
+            return self.error(404, "Not found")
+        if method not in ("GET", "HEAD"):
+            return self.error(405, f"{method} not allowed", extra={"Allow": "GET, HEAD"})
+        kind, key, view = route
+        if kind == "registry":
+            return self.respond(self.registry, headers)
+        if kind == "all":
+            found, missing = self.cached_forecasts()
+            if missing:
+                return self._respond_all_later(found, missing, view, headers)
+            return self.respond(self.collection(found, {}, view), headers)
+        province = PROVINCE_KEYS.get(key.lower())
+        if province is None:
+            return self.error(404, f"Unknown province: {key}")
+        scheduler = weather_api.prefetch_scheduler()
+        if scheduler is not None:
+            scheduler.record_access(province.query)
+        forecast = weather_api.peek_forecast(province.query, refresh_stale=True)
+        if forecast is None:
+            return self._respond_province_later(province, view, headers)
+        return self.respond(self.document(province, forecast, view), headers)
+
+    @staticmethod
+    def route(path):
+        """("registry" | "province" | "all", province key, view) for an API path, or None"""
+        parts = path.partition("?")[0].strip("/").split("/")
+        if parts[:2] != ["api", "v1"] or len(parts) < 3:
+            return None
+        kind, rest = parts[2], parts[3:]
+        if kind == "provinces" and not rest:
+            return "registry", None, None
+        if kind == "provinces" and len(rest) in (1, 2) and (len(rest) == 1 or rest[1] in VIEWS):
+            return "province", rest[0], rest[1] if len(rest) == 2 else None
+        if kind == "all" and (not rest or (len(rest) == 1 and rest[0] in VIEWS)):
+            return "all", None, rest[0] if rest else None
+        return None
+
+    def respond(self, document, request_headers):
+        """200 (identity or gzip) or 304 for a document, per the request's headers"""
+        self._stats["requests"] += 1
+        headers = {
+            "Date": self.date(),
+            "ETag": document.etag,
+            # Cacheable, but revalidated on every use: that is what the 304s are for
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if document.last_modified is not None:
+            headers["Last-Modified"] = document.last_modified
+        if not_modified(document, request_headers):
+            self._stats["not_modified"] += 1
+            return 304, headers, b""
+        body = document.body
+        if document.gzipped is not None and accepts_gzip(request_headers.get("Accept-Encoding")):
+            self._stats["gzip"] += 1
+            headers["Content-Encoding"] = "gzip"
+            body = document.gzipped
+        headers["Content-Type"] = "application/json; charset=utf-8"
+        headers["Content-Length"] = str(len(body))
+        return 200, headers, body
+
+    def error(self, status, message, retry_in=None, extra=None):
+        """A JSON error response"""
+        self._stats["errors"] += 1
+        body = dumps({"error": message})
+        headers = {"Date": self.date(), "Content-Type": "application/json; charset=utf-8",
+                   "Content-Length": str(len(body)), "Cache-Control": "no-store", **(extra or {})}
+        if retry_in is not None:
+            headers["Retry-After"] = str(max(int(retry_in + 0.999), 1))
+        return status, headers, body
+
+    def date(self):
+        # Formatted once per second
+        now = int(time.time())
+        if self._date[0] != now:
+            self._date = (now, formatdate(now, usegmt=True))
+        return self._date[1]
+
+    def document(self, province, forecast, view=None):
+        """The Document of one view of a province for this forecast"""
+        key = (province.name, view)
+        found = self._documents.get(key)
+        if found is not None and found[0] is forecast:
+            return found[1]
+        self._stats["built"] += 1
+        document = Document(dumps(view_payload(province, forecast, view)), forecast.current.last_updated_epoch)
+        self._documents[key] = (forecast, document)
+        return document
+
+    def collection(self, forecasts, errors, view=None):
+        """Every province's Document for view joined into one, reused while none of them changes"""
+        parts = tuple(self.document(province, forecast, view) for province, forecast in forecasts)
+        errors = tuple(sorted(errors.items()))
+        found = self._collections.get(view)
+        if found is not None and found[0] == parts and found[1] == errors:
+            return found[2]
+        self._stats["built"] += 1
+        body = b"".join([b'{"provinces":[', b",".join(part.body for part in parts),
+                         b'],"errors":', dumps(dict(errors)), b"}"])
+        document = Document(body, max((part.modified_epoch or 0 for part in parts), default=None))
+        self._collections[view] = (parts, errors, document)
+        return document
+
+    def cached_forecasts(self):
+        """([(province, forecast)] of the cached provinces, {name: location} of the others)"""
+        found = []
+        missing = {}
+        for province in PROVINCES:
+            forecast = weather_api.peek_forecast(province.query, refresh_stale=True)
+            if forecast is None:
+                missing[province.name] = province.query
+            else:
+                found.append((province, forecast))
+        return found, missing
+
+    async def _respond_province_later(self, province, view, headers):
+        self._stats["loads"] += 1
+        loop = asyncio.get_running_loop()
+        try:
+            views = await loop.run_in_executor(self._pool, weather_api.get_views, province.query)
+        except CircuitOpen as e:
+            return self.error(503, str(e), e.retry_in)
+        except (requests.exceptions.RequestException, LookupError, ValueError) as e:
+            return self.error(502, f"WeatherAPI request failed: {e}")
+        except OSError as e:
+            # TimeoutError included: the prefetcher did not get to the province
+            # within PREFETCH_WAIT, but is still on it
+            return self.error(503, f"Weather data not available yet: {str(e) or type(e).__name__}", BUSY_RETRY_SECONDS)
+        return self.respond(self.document(province, views["current"], view), headers)
+
+    async def _respond_all_later(self, found, missing, view, headers):
+        self._stats["loads"] += len(missing)
+        loop = asyncio.get_running_loop()
+        try:
+            loaded = await loop.run_in_executor(self._pool, lambda: list(overview.iter_views(missing)))
+        except Exception as e:
+            # iter_views reports failures per province; this is anything else
+            loaded = [(name, None, e) for name in missing]
+        forecasts = dict((province.name, forecast) for province, forecast in found)
+        errors = {}
+        for name, views, error in loaded:
+            if error is None:
+                forecasts[name] = views["current"]
+            else:
+                errors[name] = str(error) or type(error).__name__
+        if not forecasts:
+            return self.error(502, "WeatherAPI request failed for every province")
+        ordered = [(p, forecasts[p.name]) for p in PROVINCES if p.name in forecasts]
+        return self.respond(self.collection(ordered, errors, view), headers)
+
+    def stats(self):
+        """Response, 304, gzip, document build, cold load and error counters"""
+        return dict(self._stats)
+
+    def start(self, host="127.0.0.1", port=8502):
+        """Serve from a daemon thread with its own event loop, once per process.
+
+        Returns None when disabled or when the port is taken (e.g. by another
+        server process), leaving the dashboard unaffected.
+        """
+        with self._lock:
+            if self._thread is not None or not self.enabled or not port:
+                return self._thread
+            try:
+                sockets = tornado.netutil.bind_sockets(port, host)
+            except OSError:
+                return None
+            self._thread = threading.Thread(target=asyncio.run, args=(self.serve(sockets),),
+                                            name="json-api", daemon=True)
+            self._thread.start()
+            return self._thread
+
+    async def serve(self, sockets):
+        """Answer requests on already-bound sockets until cancelled"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="json-api-fetch")
+        server = tornado.httpserver.HTTPServer(self)
+        server.add_sockets(sockets)
+        await asyncio.Event().wait()
+
+
+def not_modified(document, headers):
+    """Whether a conditional request's validators still match document"""
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match is not None:
+        # Takes precedence over If-Modified-Since; weak comparison ignores W/
+        if if_none_match.strip() == "*":
+            return True
+        tag = document.etag[2:]
+        return any(candidate.strip().removeprefix("W/") == tag for candidate in if_none_match.split(","))
+    if_modified_since = headers.get("If-Modified-Since")
+    if if_modified_since is None or document.modified_epoch is None:
+        return False
+    if if_modified_since == document.last_modified:
+        return True
+    try:
+        return document.modified_epoch <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+class _Request(tornado.httputil.HTTPMessageDelegate):
+    # One request on a keep-alive connection; answered once its headers (and any body) are in
+
+    def __init__(self, api, connection):
+        self.api = api
+        self.connection = connection
+        self.start_line = None
+        self.headers = None
+
+    def headers_received(self, start_line, headers):
+        self.start_line = start_line
+        self.headers = headers
+
+    def finish(self):
+        try:
+            response = self.api.handle(self.start_line.method, self.start_line.path, self.headers)
+        except Exception as e:
+            response = self.api.error(500, f"Internal error: {e}")
+        if isinstance(response, tuple):
+            self.send(*response)
+        else:
+            asyncio.ensure_future(self.send_later(response))
+
+    async def send_later(self, response):
+        try:
+            response = await response
+        except Exception as e:
+            response = self.api.error(500, f"Internal error: {e}")
+        self.send(*response)
+
+    def send(self, status, headers, body):
+        if self.start_line.method == "HEAD":
+            body = b""
+        start_line = tornado.httputil.ResponseStartLine("HTTP/1.1", status, responses.get(status, "Unknown"))
+        self.connection.write_headers(start_line, tornado.httputil.HTTPHeaders(headers), body)
+        self.connection.finish()
+
+
+json_api = JsonApi(enabled=config.API_ENABLED, workers=config.API_WORKERS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=config.API_HOST)
+    parser.add_argument("--port", type=int, default=config.API_PORT)
+    args = parser.parse_args()
+    weather_api.start_prefetch()
+    sockets = tornado.netutil.bind_sockets(args.port, args.host)
+    print(f"JSON API on http://{args.host}:{args.port}/api/v1/provinces")
+    try:
+        asyncio.run(json_api.serve(sockets))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""Concurrent-session load test for the dashboard's main().
+
+Starts one ``streamlit run app.py`` server whose WeatherAPI traffic goes to
+the offline stand-in (vnforecast.fixtures, served from this process), then
+drives N simulated sessions against it over Streamlit's websocket protocol:
+open the page, pick provinces, toggle units, switch language and trigger
+refresh reruns. For each session count it reports p50/p95/p99 rerun latency
+(rerun request to script finished), messages and bytes the server sends per
+rerun, upstream calls per session and the server's RSS, and writes
+everything to a JSON file that can be diffed between releases::
+
+    python -m vnforecast.loadtest --sessions 1,10,50,100,250,500 --out loadtest.json
+
+With ``--ticks N`` every session then opens a province, turns auto refresh
+on and sends N refresh ticks the way the browser does (a fragment rerun when
+the page registered a timer-driven fragment, a full rerun otherwise), and
+the server's CPU time over those ticks is reported per tick and per
+session-hour.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+from vnforecast import fixtures
+from vnforecast.provinces import VIETNAMESE_PROVINCES
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Widget kinds the sessions interact with and the WidgetState field each uses
+WIDGET_VALUE_FIELDS = {"selectbox": "string_value", "checkbox": "bool_value", "radio": "int_value"}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_mb(pid):
+    """Resident set size of a process in MB, or None where /proc is unavailable"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def cpu_seconds(pid):
+    """User + system CPU time of a process in seconds, or None where /proc is unavailable"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Session:
+    """One simulated browser tab talking to the server over the websocket"""
+
+    def __init__(self, url, rng, timeout):
+        self.url = url
+        self.rng = rng
+        self.timeout = timeout
+        self.widgets = {}  # (container, kind, index) -> element proto of the last run
+        self.states = {}  # widget id -> WidgetState the "browser" holds
+        self.latencies = []
+        self.sent_bytes = []  # ForwardMsg bytes received per rerun
+        self.messages = []  # ForwardMsgs received per rerun
+        self.ticks = []  # (seconds, bytes, messages) per auto-refresh tick
+        self.fragment = None  # id of the timer-driven fragment the page registered
+        self.errors = 0
+        self._ws = None
+
+    async def play(self, actions):
+        try:
+            self._ws = await websocket_connect(self.url, subprotocols=["streamlit"])
+        except Exception:
+            self.errors += 1
+            return
+        try:
+            await self.rerun()
+            await self.rerun(("main", "selectbox", 0), self.rng.choice(list(VIETNAMESE_PROVINCES)))
+            steps = [
+                (("main", "selectbox", 0), lambda w: self.rng.choice(list(VIETNAMESE_PROVINCES))),
+                (("sidebar", "selectbox", 1), lambda w: self.rng.choice(list(w.options))),
+                (("sidebar", "selectbox", 2), lambda w: self.rng.choice(list(w.options))),
+                (("sidebar", "selectbox", 0), lambda w: self.rng.choice(list(w.options))),
+                (("sidebar", "checkbox", -1), lambda w: not self._current(w)),
+                (None, None),  # plain full rerun
+            ]
+            for _ in range(actions - 1):
+                target, pick = self.rng.choice(steps)
+                widget = self._widget(target) if target else None
+                await self.rerun(target, pick(widget) if widget is not None else None)
+        except Exception:
+            self.errors += 1
+
+    async def refresh_ticks(self, ticks):
+        """Open a province with auto refresh on, then send ticks as the browser's refresh timer would"""
+        if self._ws is None:
+            return
+        await self.rerun(("main", "selectbox", 0), self.rng.choice(list(VIETNAMESE_PROVINCES)))
+        auto_refresh = ("sidebar", "checkbox", -1)
+        widget = self._widget(auto_refresh)
+        if widget is not None and not self._current(widget):
+            await self.rerun(auto_refresh, True)
+        for _ in range(ticks):
+            if self.fragment is None:
+                await self.rerun()
+                self.ticks.append((self.latencies.pop(), self.sent_bytes.pop(), self.messages.pop()))
+            else:
+                self.ticks.append(await self._send(self._rerun_message(self.fragment)))
+
+    def close(self):
+        if self._ws is not None:
+            self._ws.close()
+
+    async def rerun(self, target=None, value=None):
+        widget = self._widget(target) if target else None
+        if widget is not None and value is not None:
+            state = self.states.setdefault(widget.id, _new_state(widget.id))
+            setattr(state, WIDGET_VALUE_FIELDS[target[1]], value)
+
+        self.widgets = {}
+        self.fragment = None
+        latency, received, count = await self._send(self._rerun_message())
+        self.latencies.append(latency)
+        self.sent_bytes.append(received)
+        self.messages.append(count)
+
+    def _rerun_message(self, fragment_id=None):
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = ""
+        message.rerun_script.widget_states.widgets.extend(self.states.values())
+        if fragment_id is not None:
+            message.rerun_script.fragment_id = fragment_id
+            message.rerun_script.is_auto_rerun = True
+        return message
+
+    async def _send(self, message):
+        # Send one rerun request and read until the run finishes
+        started = time.perf_counter()
+        await self._ws.write_message(message.SerializeToString(), binary=True)
+        counters = {}
+        received = 0
+        count = 0
+        try:
+            while True:
+                data = await asyncio.wait_for(self._ws.read_message(), self.timeout)
+                if data is None:
+                    raise ConnectionError("Server closed the websocket")
+                received += len(data)
+                count += 1
+                forward = ForwardMsg.FromString(data)
+                kind = forward.WhichOneof("type")
+                if kind == "delta":
+                    self._note_widget(forward, counters)
+                elif kind == "auto_rerun":
+                    self.fragment = forward.auto_rerun.fragment_id
+                elif kind == "script_finished":
+                    if forward.script_finished not in (ForwardMsg.FINISHED_SUCCESSFULLY,
+                                                       ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY):
+                        self.errors += 1
+                    break
+                elif kind == "session_event" and forward.session_event.HasField("script_compilation_exception"):
+                    self.errors += 1
+        except Exception:
+            self.errors += 1
+        return time.perf_counter() - started, received, count
+
+    def _note_widget(self, forward, counters):
+        element = forward.delta.new_element if forward.delta.HasField("new_element") else None
+        if element is None:
+            return
+        kind = element.WhichOneof("type")
+        if kind not in WIDGET_VALUE_FIELDS:
+            return
+        container = "sidebar" if forward.metadata.delta_path[:1] == [1] else "main"
+        index = counters.get((container, kind), 0)
+        counters[(container, kind)] = index + 1
+        widget = getattr(element, kind)
+        self.widgets[(container, kind, index)] = widget
+        self.widgets[(container, kind, -1)] = widget
+
+    def _widget(self, target):
+        return self.widgets.get(target)
+
+    def _current(self, widget):
+        state = self.states.get(widget.id)
+        return state.bool_value if state is not None else widget.default
+
+
+def _new_state(widget_id):
+    state = WidgetState()
+    state.id = widget_id
+    return state
+
+
+async def run_level(url, sessions, actions, seed, timeout, ramp, backend, server_pid, ticks=0,
+                    tick_interval=300):
+    """Run one concurrency level and return its summary"""
+    calls_before = backend.stats()["requests"]
+    players = [Session(url, random.Random(seed + i), timeout) for i in range(sessions)]
+    started = time.perf_counter()
+    tasks = []
+    for player in players:
+        tasks.append(asyncio.ensure_future(player.play(actions)))
+        if ramp:
+            await asyncio.sleep(ramp / sessions)
+    await asyncio.gather(*tasks)
+    wall = time.perf_counter() - started
+
+    tick_summary = None
+    try:
+        if ticks:
+            cpu_before = cpu_seconds(server_pid)
+            await asyncio.gather(*(player.refresh_ticks(ticks) for player in players))
+            cpu_after = cpu_seconds(server_pid)
+            tick_summary = _tick_summary(players, cpu_before, cpu_after, tick_interval)
+    finally:
+        for player in players:
+            player.close()
+
+    latencies = sorted(latency for player in players for latency in player.latencies)
+    first_load = [player.sent_bytes[0] for player in players if player.sent_bytes]
+    later = sorted(size for player in players for size in player.sent_bytes[1:])
+    messages = [count for player in players for count in player.messages[1:]]
+    upstream = backend.stats()["requests"] - calls_before
+    ms = lambda q: round(percentile(latencies, q) * 1000, 1) if latencies else None
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "errors": sum(player.errors for player in players),
+        "wall_seconds": round(wall, 3),
+        "reruns_per_second": round(len(latencies) / wall, 2) if wall else None,
+        "latency_ms": {"p50": ms(50), "p95": ms(95), "p99": ms(99), "max": ms(100)},
+        "bytes_first_load_mean": round(sum(first_load) / len(first_load)) if first_load else None,
+        "bytes_per_rerun": {"p50": percentile(later, 50), "mean": round(sum(later) / len(later)) if later else None},
+        "messages_per_rerun": round(sum(messages) / len(messages), 1) if messages else None,
+        "upstream_calls": upstream,
+        "upstream_calls_per_session": round(upstream / sessions, 2),
+        "server_rss_mb": rss_mb(server_pid),
+        "refresh_ticks": tick_summary,
+    }
+
+
+def _tick_summary(players, cpu_before, cpu_after, tick_interval):
+    ticks = [tick for player in players for tick in player.ticks]
+    if not ticks:
+        return None
+    cpu_per_tick = (cpu_after - cpu_before) / len(ticks) if cpu_before is not None else None
+    return {
+        "ticks": len(ticks),
+        "fragment_ticks": sum(len(player.ticks) for player in players if player.fragment is not None),
+        "latency_ms_p50": round(percentile(sorted(t[0] for t in ticks), 50) * 1000, 1),
+        "bytes_per_tick": round(sum(t[1] for t in ticks) / len(ticks)),
+        "messages_per_tick": round(sum(t[2] for t in ticks) / len(ticks), 1),
+        "server_cpu_ms_per_tick": round(cpu_per_tick * 1000, 2) if cpu_per_tick is not None else None,
+        "tick_interval_seconds": tick_interval,
+        "server_cpu_seconds_per_session_hour": (round(cpu_per_tick * 3600 / tick_interval, 3)
+                                                if cpu_per_tick is not None else None),
+    }
+
+
+def start_stub(backend):
+    """Serve the fixture backend on a free local port from a daemon thread"""
+    port = free_port()
+    threading.Thread(target=fixtures.serve, args=("127.0.0.1", port, backend), daemon=True).start()
+    return f"http://127.0.0.1:{port}/v1"
+
+
+def start_app(port, base_url, extra_env):
+    env = dict(os.environ, WEATHER_API_BASE_URL=base_url, WEATHER_PROVIDER="weatherapi",
+               WEATHER_OBSERVATION_STORE_ENABLED="0", **extra_env)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", os.path.join(REPO_ROOT, "app.py"),
+         "--server.port", str(port), "--server.headless", "true", "--server.address", "127.0.0.1",
+         "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                return process
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Streamlit server did not start within 30s")
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=REPO_ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for app.py")
+    parser.add_argument("--sessions", default="1,10,50,100,250,500",
+                        help="comma-separated session counts to run, in order")
+    parser.add_argument("--actions", type=int, default=10, help="reruns per session after the first page load")
+    parser.add_argument("--ramp", type=float, default=1.0, help="seconds over which each level's sessions connect")
+    parser.add_argument("--timeout", type=float, default=60, help="per-rerun timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=120, help="median stand-in response time")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of stand-in requests failing with 5xx")
+    parser.add_argument("--prefetch", action="store_true", help="keep the prefetch scheduler on in the app")
+    parser.add_argument("--ticks", type=int, default=0, help="auto-refresh ticks per session after the actions")
+    parser.add_argument("--tick-interval", type=float, default=300,
+                        help="auto-refresh interval in seconds, for the per-hour CPU figure")
+    parser.add_argument("--out", default="loadtest-results.json")
+    args = parser.parse_args()
+
+    backend = fixtures.FixtureBackend(latency_ms=args.latency_ms, error_rate=args.error_rate, seed=args.seed)
+    base_url = start_stub(backend)
+    port = free_port()
+    server = start_app(port, base_url, {"WEATHER_PREFETCH_ENABLED": "1" if args.prefetch else "0"})
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+
+    results = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "stub_latency_ms": args.latency_ms,
+        "stub_error_rate": args.error_rate,
+        "prefetch": args.prefetch,
+        "actions_per_session": args.actions,
+        "levels": [],
+    }
+    loop = asyncio.new_event_loop()
+    try:
+        for sessions in (int(n) for n in args.sessions.split(",")):
+            level = loop.run_until_complete(run_level(url, sessions, args.actions, args.seed, args.timeout,
+                                                      args.ramp, backend, server.pid, args.ticks,
+                                                      args.tick_interval))
+            results["levels"].append(level)
+            latency = level["latency_ms"]
+            print(f"{sessions:>4} sessions  p50 {latency['p50']:>8.1f}ms  p95 {latency['p95']:>8.1f}ms  "
+                  f"p99 {latency['p99']:>8.1f}ms  upstream/session {level['upstream_calls_per_session']:>5.2f}  "
+                  f"KB/rerun {(level['bytes_per_rerun']['mean'] or 0) / 1024:>6.1f}  "
+                  f"msgs/rerun {level['messages_per_rerun'] or 0:>5.1f}  "
+                  f"rss {level['server_rss_mb'] or 0:>7.1f}MB  errors {level['errors']}")
+            ticks = level["refresh_ticks"]
+            if ticks is not None:
+                print(f"      refresh ticks {ticks['ticks']} ({ticks['fragment_ticks']} fragment)  "
+                      f"p50 {ticks['latency_ms_p50']:>7.1f}ms  KB/tick {ticks['bytes_per_tick'] / 1024:>6.2f}  "
+                      f"cpu/tick {ticks['server_cpu_ms_per_tick'] or 0:>6.2f}ms  "
+                      f"cpu/session-hour {ticks['server_cpu_seconds_per_session_hour'] or 0:>6.3f}s")
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+    finally:
+        loop.close()
+        server.terminate()
+        server.wait(10)
+    print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""Opt-in render and fetch timing with a debug view and Prometheus text export."""
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from vnforecast import config
+from vnforecast.breaker import weather_breaker
+from vnforecast.fragments import fragment_cache
+from vnforecast.http_client import weather_http
+from vnforecast.json_api import json_api
+from vnforecast.quota import quota_limiter
+from vnforecast.weather_cache import response_cache
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Prometheus-style histogram; counts are per bucket, made cumulative on export"""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RunTrace:
+    """Sections and fetches of one script run (one rerun of one session)"""
+    __slots__ = ("started", "sections", "fetches", "total")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sections = []
+        self.fetches = []
+        self.total = None
+
+
+class _NullContext:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullContext()
+
+
+class _Section:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.metrics.observe_section(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _Fetch:
+    __slots__ = ("metrics", "record", "started", "previous")
+
+    def __init__(self, metrics, kind, location):
+        self.metrics = metrics
+        self.record = {"kind": kind, "location": location, "seconds": None, "outcome": None,
+                       "upstream_calls": 0, "upstream_seconds": 0.0, "bytes": 0}
+
+    def __enter__(self):
+        local = self.metrics._local
+        self.previous = getattr(local, "fetch", None)
+        local.fetch = self.record
+        self.started = time.perf_counter()
+
+    def __exit__(self, exc_type, *exc):
+        self.record["seconds"] = time.perf_counter() - self.started
+        self.record["outcome"] = "error" if exc_type is not None else response_cache.last_outcome()
+        self.metrics._local.fetch = self.previous
+        self.metrics.observe_fetch(self.record)
+        return False
+
+
+class RenderMetrics:
+    """Per-section render timings and per-fetch cache outcome and upstream cost.
+
+    Disabled, ``section()`` and ``fetch()`` return a shared no-op context
+    manager and nothing is recorded. Enabled, every observation goes into
+    process-wide histograms (exported by ``prometheus_text()``) and into the
+    trace of the script run on the current thread (read by the debug panel).
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sections = {}
+        self._fetches = {}
+        self._upstream_seconds = {}
+        self._upstream_bytes = {}
+        self._upstream_status = {}
+        self._server = None
+
+    def section(self, name):
+        """Context manager timing one logical section of the page"""
+        if not self.enabled:
+            return _NULL
+        return _Section(self, name)
+
+    def fetch(self, kind, location):
+        """Context manager timing one data fetch and noting its cache outcome"""
+        if not self.enabled:
+            return _NULL
+        return _Fetch(self, kind, location)
+
+    def start_run(self):
+        """Begin a new trace for the script run on this thread"""
+        if self.enabled:
+            self._local.trace = RunTrace()
+
+    def finish_run(self):
+        """Close this thread's trace and record the whole run as section "total" """
+        trace = self.current_run()
+        if trace is not None and trace.total is None:
+            trace.total = time.perf_counter() - trace.started
+            self._observe(self._sections, ("total",), SECONDS_BUCKETS, trace.total)
+        return trace
+
+    def current_run(self):
+        """Trace of the current or last script run on this thread, or None"""
+        return getattr(self._local, "trace", None) if self.enabled else None
+
+    def observe_section(self, name, seconds):
+        self._observe(self._sections, (name,), SECONDS_BUCKETS, seconds)
+        trace = getattr(self._local, "trace", None)
+        if trace is not None:
+            trace.sections.append((name, seconds))
+
+    def observe_fetch(self, record):
+        self._observe(self._fetches, (record["kind"], record["outcome"]), SECONDS_BUCKETS, record["seconds"])
+        trace = getattr(self._local, "trace", None)
+        if trace is not None:
+            trace.fetches.append(record)
+
+    def observe_upstream(self, timing):
+        """weather_http observer: upstream latency, size and status per endpoint"""
+        self._observe(self._upstream_seconds, (timing.endpoint,), SECONDS_BUCKETS, timing.total)
+        self._observe(self._upstream_bytes, (timing.endpoint,), BYTES_BUCKETS, timing.size)
+        with self._lock:
+            key = (timing.endpoint, str(timing.status or "error"))
+            self._upstream_status[key] = self._upstream_status.get(key, 0) + 1
+        fetch = getattr(self._local, "fetch", None)
+        if fetch is not None:
+            fetch["upstream_calls"] += 1
+            fetch["upstream_seconds"] += timing.total
+            fetch["bytes"] += timing.size
+
+    def section_summary(self):
+        """{section: (count, mean seconds)} over the process lifetime"""
+        with self._lock:
+            return {labels[0]: (h.count, h.sum / h.count) for labels, h in self._sections.items() if h.count}
+
+    def prometheus_text(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            _histogram_lines(lines, "vnforecast_render_section_seconds",
+                             "Time spent rendering each section of the page", ("section",), self._sections)
+            _histogram_lines(lines, "vnforecast_fetch_seconds",
+                             "Time the page spent getting weather data, by cache outcome",
+                             ("kind", "outcome"), self._fetches)
+            _histogram_lines(lines, "vnforecast_upstream_request_seconds",
+                             "WeatherAPI request latency including retries", ("endpoint",), self._upstream_seconds)
+            _histogram_lines(lines, "vnforecast_upstream_response_bytes",
+                             "WeatherAPI response body size", ("endpoint",), self._upstream_bytes)
+            _metric_header(lines, "vnforecast_upstream_requests_total", "counter", "WeatherAPI requests by status")
+            for (endpoint, status), value in sorted(self._upstream_status.items()):
+                lines.append(f'vnforecast_upstream_requests_total{_labels(("endpoint", "status"), (endpoint, status))} {value}')
+
+        cache = response_cache.stats()
+        _metric_header(lines, "vnforecast_cache_events_total", "counter", "Shared response cache events")
+        for event in ("hits", "misses", "stale", "refreshes", "refresh_errors", "evictions", "upstream_calls", "coalesced",
+                      "fallbacks"):
+            lines.append(f'vnforecast_cache_events_total{{event="{event}"}} {cache[event]}')
+        _metric_header(lines, "vnforecast_cache_entries", "gauge", "Entries in the shared response cache")
+        lines.append(f"vnforecast_cache_entries {cache['size']}")
+
+        fragments = fragment_cache.stats()
+        _metric_header(lines, "vnforecast_fragment_cache_events_total", "counter", "Rendered HTML fragment cache events")
+        for event in ("hits", "misses", "evictions"):
+            lines.append(f'vnforecast_fragment_cache_events_total{{event="{event}"}} {fragments[event]}')
+        _metric_header(lines, "vnforecast_fragment_cache_entries", "gauge", "Fragments in the rendered HTML cache")
+        lines.append(f"vnforecast_fragment_cache_entries {fragments['size']}")
+
+        breaker = weather_breaker.stats()
+        _metric_header(lines, "vnforecast_breaker_state", "gauge", "WeatherAPI circuit breaker state (1 for the current one)")
+        for state in ("closed", "open", "half_open"):
+            lines.append(f'vnforecast_breaker_state{{state="{state}"}} {int(breaker["state"] == state)}')
+        _metric_header(lines, "vnforecast_breaker_events_total", "counter", "WeatherAPI circuit breaker events")
+        for event in ("opened", "rejected", "probes", "failures", "slow"):
+            lines.append(f'vnforecast_breaker_events_total{{event="{event}"}} {breaker[event]}')
+
+        quota = quota_limiter.stats()
+        for name, key, help_text in (
+                ("vnforecast_quota_budget_calls", "budget", "Monthly WeatherAPI call budget"),
+                ("vnforecast_quota_used_calls", "used", "WeatherAPI calls counted this month"),
+                ("vnforecast_quota_burn_rate_calls_per_hour", "burn_rate_per_hour", "Recent WeatherAPI calls per hour"),
+                ("vnforecast_quota_projected_calls", "projected_month_total", "Month total if the burn rate holds"),
+                ("vnforecast_quota_stretch", "stretch", "Factor applied to cache TTLs and the prefetch interval")):
+            _metric_header(lines, name, "gauge", help_text)
+            lines.append(f"{name} {quota[key]}")
+        if quota["exhaustion_epoch"] is not None:
+            _metric_header(lines, "vnforecast_quota_exhaustion_timestamp_seconds", "gauge",
+                           "When the budget runs out at the current burn rate")
+            lines.append(f"vnforecast_quota_exhaustion_timestamp_seconds {quota['exhaustion_epoch']}")
+        _metric_header(lines, "vnforecast_quota_wait_seconds_total", "counter",
+                       "Time upstream calls waited for a per-second token")
+        lines.append(f"vnforecast_quota_wait_seconds_total {quota['wait_seconds']}")
+
+        if json_api.enabled:
+            api = json_api.stats()
+            _metric_header(lines, "vnforecast_api_events_total", "counter", "JSON API responses and document builds")
+            for event in ("requests", "not_modified", "gzip", "built", "loads", "errors"):
+                lines.append(f'vnforecast_api_events_total{{event="{event}"}} {api[event]}')
+        return "\n".join(lines) + "\n"
+
+    def start_exporter(self, host="127.0.0.1", port=9464):
+        """Serve prometheus_text() on http://host:port/metrics from a daemon thread, once per process"""
+        with self._lock:
+            if self._server is not None or not self.enabled or not port:
+                return self._server
+            metrics = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def log_message(self, *args):
+                    pass
+
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = metrics.prometheus_text().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            try:
+                self._server = ThreadingHTTPServer((host, port), Handler)
+            except OSError:
+                # Port taken (e.g. another server process); the debug panel still works
+                return None
+            self._server.daemon_threads = True
+            threading.Thread(target=self._server.serve_forever, name="metrics-exporter", daemon=True).start()
+            return self._server
+
+    def _observe(self, histograms, labels, bounds, value):
+        with self._lock:
+            histogram = histograms.get(labels)
+            if histogram is None:
+                histogram = histograms[labels] = Histogram(bounds)
+            histogram.observe(value)
+
+
+def _labels(names, values):
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, escaped)) + "}"
+
+
+def _metric_header(lines, name, kind, help_text):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _histogram_lines(lines, name, help_text, label_names, histograms):
+    _metric_header(lines, name, "histogram", help_text)
+    for labels, histogram in sorted(histograms.items(), key=lambda item: tuple(map(str, item[0]))):
+        cumulative = 0
+        for bound, count in zip(histogram.bounds + (float("inf"),), histogram.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(float(bound))
+            lines.append(f"{name}_bucket{_labels(label_names + ('le',), labels + (le,))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(label_names, labels)} {histogram.sum}")
+        lines.append(f"{name}_count{_labels(label_names, labels)} {histogram.count}")
+
+
+render_metrics = RenderMetrics(enabled=config.METRICS_ENABLED)
+
+if render_metrics.enabled:
+    weather_http.add_observer(render_metrics.observe_upstream)
@@ -0,0 +1,216 @@
+"""Compact representation of WeatherAPI payloads, decoded once at fetch time.
+
+The raw ``response.json()`` of a combined request is mostly per-hour dicts
+carrying dozens of fields the dashboard never shows (imperial duplicates,
+air quality per hour, astronomy ...). ``decode`` keeps only what the UI
+reads: scalar blocks become ``__slots__`` dataclasses, the hourly series
+becomes one numpy array per field, and condition blocks are interned so
+every hour with the same condition shares one object.
+"""
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True, slots=True)
+class Condition:
+    text: str
+    icon: str
+    code: int
+
+
+@dataclass(frozen=True, slots=True)
+class Location:
+    name: str
+    region: str
+    country: str
+    tz_id: str
+    localtime: str
+    localtime_epoch: int
+
+
+@dataclass(frozen=True, slots=True)
+class AirQuality:
+    co: float
+    no2: float
+    pm2_5: float
+    us_epa_index: int
+
+
+@dataclass(frozen=True, slots=True)
+class Current:
+    last_updated_epoch: int
+    temp_c: float
+    feelslike_c: float
+    dewpoint_c: float
+    windchill_c: float
+    heatindex_c: float
+    humidity: int
+    wind_kph: float
+    gust_kph: float
+    wind_dir: str
+    pressure_mb: float
+    precip_mm: float
+    cloud: int
+    vis_km: float
+    uv: float
+    is_day: int
+    condition: Condition
+    air_quality: AirQuality = None
+
+
+@dataclass(frozen=True, slots=True)
+class Day:
+    date: str
+    maxtemp_c: float
+    mintemp_c: float
+    maxwind_kph: float
+    uv: float
+    condition: Condition
+
+
+@dataclass(frozen=True, slots=True)
+class Alert:
+    headline: str
+    desc: str
+    effective: str
+    expires: str
+
+
+@dataclass(frozen=True, slots=True)
+class HourlySeries:
+    """Forecast hours across all days, one array per field, in time order.
+
+    ``day`` is the index of the forecast day each hour belongs to;
+    ``conditions`` holds the (interned) condition of each hour.
+    """
+    time_epoch: np.ndarray
+    temp_c: np.ndarray
+    feelslike_c: np.ndarray
+    chance_of_rain: np.ndarray
+    precip_mm: np.ndarray
+    humidity: np.ndarray
+    wind_kph: np.ndarray
+    is_day: np.ndarray
+    day: np.ndarray
+    conditions: tuple
+
+    def __len__(self):
+        return len(self.time_epoch)
+
+
+@dataclass(frozen=True, slots=True)
+class Forecast:
+    """One location's decoded payload: location, current conditions, forecast days and alerts.
+
+    ``days`` is empty when the payload had no forecast block (current
+    conditions only).
+    """
+    location: Location
+    current: Current
+    days: tuple = ()
+    hourly: HourlySeries = None
+    alerts: tuple = ()
+
+    @property
+    def has_forecast(self):
+        return bool(self.days)
+
+
+# name -> (dtype, missing value) of the hourly arrays
+HOURLY_FIELDS = {
+    "time_epoch": (np.int64, 0),
+    "temp_c": (np.float32, np.nan),
+    "feelslike_c": (np.float32, np.nan),
+    "chance_of_rain": (np.float32, np.nan),
+    "precip_mm": (np.float32, np.nan),
+    "humidity": (np.float32, np.nan),
+    "wind_kph": (np.float32, np.nan),
+    "is_day": (np.int8, 0),
+}
+
+_conditions = {}
+_conditions_lock = threading.Lock()
+
+
+def condition(block):
+    """The shared Condition for a raw condition block"""
+    block = block or {}
+    key = (block.get("text"), block.get("icon"), block.get("code"))
+    found = _conditions.get(key)
+    if found is None:
+        with _conditions_lock:
+            found = _conditions.setdefault(key, Condition(*key))
+    return found
+
+
+def _location(block):
+    return Location(block.get("name"), block.get("region"), block.get("country"), block.get("tz_id"),
+                    block.get("localtime"), block.get("localtime_epoch"))
+
+
+def _air_quality(block):
+    if block is None:
+        return None
+    return AirQuality(block.get("co"), block.get("no2"), block.get("pm2_5"), block.get("us-epa-index"))
+
+
+def _current(block):
+    return Current(
+        last_updated_epoch=block.get("last_updated_epoch"),
+        temp_c=block.get("temp_c"),
+        feelslike_c=block.get("feelslike_c"),
+        dewpoint_c=block.get("dewpoint_c"),
+        windchill_c=block.get("windchill_c"),
+        heatindex_c=block.get("heatindex_c"),
+        humidity=block.get("humidity"),
+        wind_kph=block.get("wind_kph"),
+        gust_kph=block.get("gust_kph"),
+        wind_dir=block.get("wind_dir"),
+        pressure_mb=block.get("pressure_mb"),
+        precip_mm=block.get("precip_mm"),
+        cloud=block.get("cloud"),
+        vis_km=block.get("vis_km"),
+        uv=block.get("uv"),
+        is_day=block.get("is_day"),
+        condition=condition(block.get("condition")),
+        air_quality=_air_quality(block.get("air_quality")),
+    )
+
+
+def _day(block):
+    day = block.get("day", {})
+    return Day(block.get("date"), day.get("maxtemp_c"), day.get("mintemp_c"), day.get("maxwind_kph"),
+               day.get("uv"), condition(day.get("condition")))
+
+
+def _hourly(forecast_days):
+    hours = [hour for day in forecast_days for hour in day.get("hour", [])]
+    columns = {}
+    for name, (dtype, missing) in HOURLY_FIELDS.items():
+        values = [hour.get(name) for hour in hours]
+        columns[name] = np.array([missing if v is None else v for v in values], dtype=dtype)
+    days = np.repeat(np.arange(len(forecast_days), dtype=np.int16),
+                     [len(day.get("hour", [])) for day in forecast_days])
+    conditions = tuple(condition(hour.get("condition")) for hour in hours)
+    # Days (and hours within them) normally arrive in order; sort if not
+    order = np.argsort(columns["time_epoch"], kind="stable")
+    if not np.array_equal(order, np.arange(len(order))):
+        columns = {name: values[order] for name, values in columns.items()}
+        days = days[order]
+        conditions = tuple(conditions[i] for i in order)
+    return HourlySeries(day=days, conditions=conditions, **columns)
+
+
+def decode(payload):
+    """Forecast for a combined (or current-only) WeatherAPI payload"""
+    forecast_days = payload.get("forecast", {}).get("forecastday", [])
+    return Forecast(
+        location=_location(payload["location"]),
+        current=_current(payload["current"]),
+        days=tuple(_day(day) for day in forecast_days),
+        hourly=_hourly(forecast_days),
+        alerts=tuple(Alert(a.get("headline"), a.get("desc"), a.get("effective"), a.get("expires"))
+                     for a in payload.get("alerts", {}).get("alert", [])),
+    )
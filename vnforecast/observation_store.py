@@ -0,0 +1,343 @@
+"""Append-only Parquet history of every observation the dashboard fetches.
+
+Rows live in two hive-partitioned datasets under the store root::
+
+    current/date=2026-10-18/province=ha-noi/part-....parquet
+    hourly/date=2026-10-18/province=ha-noi/part-....parquet
+
+``current`` holds one row per new observation (deduplicated on
+``last_updated_epoch``), ``hourly`` the forecast hours issued with it.
+Payloads are queued by the fetch path and written by one background thread,
+so recording never blocks a page render.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+from vnforecast import config
+from vnforecast.provinces import PROVINCE_BY_LOCATION, province_slug
+
+VN_TZ = ZoneInfo("Asia/Ho_Chi_Minh")
+
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string()), ("province", pa.string())]), flavor="hive")
+
+
+def _get(block, *path):
+    for key in path:
+        if not isinstance(block, dict):
+            return None
+        block = block.get(key)
+    return block
+
+
+# column name -> (type, path inside the payload block)
+CURRENT_COLUMNS = {
+    "observed_epoch": (pa.int64(), ("last_updated_epoch",)),
+    "temp_c": (pa.float32(), ("temp_c",)),
+    "feelslike_c": (pa.float32(), ("feelslike_c",)),
+    "humidity": (pa.float32(), ("humidity",)),
+    "dewpoint_c": (pa.float32(), ("dewpoint_c",)),
+    "wind_kph": (pa.float32(), ("wind_kph",)),
+    "wind_degree": (pa.float32(), ("wind_degree",)),
+    "gust_kph": (pa.float32(), ("gust_kph",)),
+    "pressure_mb": (pa.float32(), ("pressure_mb",)),
+    "precip_mm": (pa.float32(), ("precip_mm",)),
+    "cloud": (pa.float32(), ("cloud",)),
+    "vis_km": (pa.float32(), ("vis_km",)),
+    "uv": (pa.float32(), ("uv",)),
+    "is_day": (pa.int8(), ("is_day",)),
+    "condition_code": (pa.int32(), ("condition", "code")),
+    "condition_text": (pa.string(), ("condition", "text")),
+    "pm2_5": (pa.float32(), ("air_quality", "pm2_5")),
+    "pm10": (pa.float32(), ("air_quality", "pm10")),
+    "co": (pa.float32(), ("air_quality", "co")),
+    "no2": (pa.float32(), ("air_quality", "no2")),
+    "o3": (pa.float32(), ("air_quality", "o3")),
+    "so2": (pa.float32(), ("air_quality", "so2")),
+    "us_epa_index": (pa.int8(), ("air_quality", "us-epa-index")),
+}
+
+HOURLY_COLUMNS = {
+    "time_epoch": (pa.int64(), ("time_epoch",)),
+    "temp_c": (pa.float32(), ("temp_c",)),
+    "feelslike_c": (pa.float32(), ("feelslike_c",)),
+    "humidity": (pa.float32(), ("humidity",)),
+    "wind_kph": (pa.float32(), ("wind_kph",)),
+    "gust_kph": (pa.float32(), ("gust_kph",)),
+    "precip_mm": (pa.float32(), ("precip_mm",)),
+    "chance_of_rain": (pa.float32(), ("chance_of_rain",)),
+    "cloud": (pa.float32(), ("cloud",)),
+    "uv": (pa.float32(), ("uv",)),
+    "condition_code": (pa.int32(), ("condition", "code")),
+    "pm2_5": (pa.float32(), ("air_quality", "pm2_5")),
+    "us_epa_index": (pa.int8(), ("air_quality", "us-epa-index")),
+}
+
+DATASETS = {
+    "current": CURRENT_COLUMNS,
+    "hourly": HOURLY_COLUMNS,
+}
+
+
+def _schema(columns, extra):
+    return pa.schema(extra + [(name, column_type) for name, (column_type, _) in columns.items()])
+
+
+SCHEMAS = {
+    "current": _schema(CURRENT_COLUMNS, [("fetched_epoch", pa.int64())]),
+    "hourly": _schema(HOURLY_COLUMNS, [("fetched_epoch", pa.int64()), ("issued_epoch", pa.int64())]),
+}
+
+
+def local_date(epoch):
+    """Vietnam calendar date of a UNIX timestamp, as used for partitioning"""
+    return datetime.fromtimestamp(epoch, VN_TZ).strftime("%Y-%m-%d")
+
+
+def _extract(block, columns):
+    return {name: _get(block, *path) for name, (_, path) in columns.items()}
+
+
+def normalize(payload, province, fetched_epoch):
+    """Flatten one combined payload into (current rows, hourly rows)"""
+    current = payload.get("current")
+    if not current or current.get("last_updated_epoch") is None:
+        return [], []
+    observed = current["last_updated_epoch"]
+    current_row = {"fetched_epoch": fetched_epoch, **_extract(current, CURRENT_COLUMNS)}
+    current_row["province"] = province
+    hourly_rows = []
+    for day in _get(payload, "forecast", "forecastday") or []:
+        for hour in day.get("hour", []):
+            row = {"fetched_epoch": fetched_epoch, "issued_epoch": observed, **_extract(hour, HOURLY_COLUMNS)}
+            row["province"] = province
+            hourly_rows.append(row)
+    return [current_row], hourly_rows
+
+
+class ObservationStore:
+    """Batched, append-only Parquet writer plus memory-mapped reader"""
+
+    def __init__(self, root, flush_interval=300, flush_rows=2000, compact_interval=3600,
+                 compact_min_files=8, max_queue=1000):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.compact_interval = compact_interval
+        self.compact_min_files = compact_min_files
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._buffers = defaultdict(list)
+        self._last_observed = {}
+        self._thread = None
+        self._lock = threading.Lock()
+        # Held while compaction swaps part files and while scans list them,
+        # so a listing sees either the parts or their compacted file, never both
+        self._files_lock = threading.Lock()
+        self._filesystem = fs.LocalFileSystem(use_mmap=True)
+        self._stats = {"queued": 0, "dropped": 0, "rows_written": 0, "files_written": 0, "compactions": 0}
+
+    def record(self, payload, location=None):
+        """Queue a fetched payload for writing; never blocks the caller"""
+        self._start()
+        location = location or _get(payload, "location", "name")
+        try:
+            self._queue.put_nowait((payload, location, int(time.time())))
+            self._stats["queued"] += 1
+        except queue.Full:
+            self._stats["dropped"] += 1
+
+    def flush(self, timeout=10):
+        """Write everything queued so far (blocks until the writer has done it)"""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done, timeout=timeout)
+        done.wait(timeout)
+
+    def stats(self):
+        """Queue and write counters"""
+        snapshot = dict(self._stats)
+        snapshot["pending"] = self._queue.qsize()
+        return snapshot
+
+    def dataset(self, kind):
+        """pyarrow Dataset over one kind ("current" or "hourly"), or None if empty"""
+        path = os.path.join(self.root, kind)
+        if not os.path.isdir(path):
+            return None
+        return ds.dataset(path, schema=SCHEMAS[kind].append(pa.field("date", pa.string())).append(
+            pa.field("province", pa.string())), format="parquet", partitioning=PARTITIONING,
+            filesystem=self._filesystem)
+
+    def scan(self, kind, province=None, start_epoch=None, end_epoch=None, columns=None):
+        """Read rows for one province and time range as a pyarrow Table.
+
+        Only the requested columns are read. For a single province the
+        matching date=/province= directories are listed directly, so files of
+        other provinces and days are never discovered, let alone opened.
+        """
+        time_column = "observed_epoch" if kind == "current" else "time_epoch"
+        columns = list(columns) if columns else None
+        if columns is not None and time_column not in columns:
+            columns.append(time_column)
+
+        expression = None
+        if start_epoch is not None:
+            expression = _and(expression, ds.field(time_column) >= start_epoch)
+        if end_epoch is not None:
+            expression = _and(expression, ds.field(time_column) <= end_epoch)
+
+        if province is None:
+            if start_epoch is not None:
+                expression = _and(expression, ds.field("date") >= local_date(start_epoch))
+            if end_epoch is not None:
+                expression = _and(expression, ds.field("date") <= local_date(end_epoch))
+
+        for attempt in range(2):
+            with self._files_lock:
+                if province is not None:
+                    files = self._partition_files(kind, province, start_epoch, end_epoch)
+                    dataset = ds.dataset(files, schema=SCHEMAS[kind], format="parquet",
+                                         filesystem=self._filesystem) if files else None
+                else:
+                    dataset = self.dataset(kind)
+            if dataset is None:
+                empty = SCHEMAS[kind].empty_table()
+                return empty.select(columns) if columns else empty
+            try:
+                table = dataset.to_table(columns=columns, filter=expression)
+                break
+            except FileNotFoundError:
+                # Compacted away after the listing; the next listing has the merged file
+                if attempt:
+                    raise
+        return table.take(pc.sort_indices(table, [(time_column, "ascending")]))
+
+    def _partition_files(self, kind, province, start_epoch, end_epoch):
+        base = os.path.join(self.root, kind)
+        if not os.path.isdir(base):
+            return []
+        first = local_date(start_epoch) if start_epoch is not None else ""
+        last = local_date(end_epoch) if end_epoch is not None else "9999-12-31"
+        slug = province_slug(province)
+        files = []
+        for entry in os.listdir(base):
+            # ISO dates compare correctly as strings
+            if not entry.startswith("date=") or not first <= entry[5:] <= last:
+                continue
+            directory = os.path.join(base, entry, f"province={slug}")
+            if os.path.isdir(directory):
+                files.extend(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".parquet"))
+        return files
+
+    def compact(self, min_files=None):
+        """Merge partitions holding many small files into one file each"""
+        min_files = min_files or self.compact_min_files
+        merged = 0
+        for kind in DATASETS:
+            base = os.path.join(self.root, kind)
+            for directory, _, files in os.walk(base):
+                parts = sorted(f for f in files if f.endswith(".parquet"))
+                if len(parts) < min_files:
+                    continue
+                paths = [os.path.join(directory, f) for f in parts]
+                table = pa.concat_tables(pq.read_table(p, schema=SCHEMAS[kind]) for p in paths)
+                with self._files_lock:
+                    self._write_file(directory, table, prefix="compact")
+                    for path in paths:
+                        os.remove(path)
+                merged += 1
+        self._stats["compactions"] += merged
+        return merged
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="observation-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        last_flush = last_compact = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=1)
+            except queue.Empty:
+                item = None
+            if isinstance(item, threading.Event):
+                self._write_buffers()
+                item.set()
+                continue
+            if item is not None:
+                self._buffer(*item)
+            now = time.monotonic()
+            buffered = sum(len(rows) for rows in self._buffers.values())
+            if buffered >= self.flush_rows or (buffered and now - last_flush >= self.flush_interval):
+                self._write_buffers()
+                last_flush = now
+            if now - last_compact >= self.compact_interval:
+                try:
+                    self.compact()
+                except Exception:
+                    pass
+                last_compact = now
+
+    def _buffer(self, payload, location, fetched_epoch):
+        province = PROVINCE_BY_LOCATION.get(location, location)
+        if not province:
+            return
+        observed = _get(payload, "current", "last_updated_epoch")
+        if observed is None or self._last_observed.get(province) == observed:
+            return
+        self._last_observed[province] = observed
+        current_rows, hourly_rows = normalize(payload, province, fetched_epoch)
+        self._buffers["current"].extend(current_rows)
+        self._buffers["hourly"].extend(hourly_rows)
+
+    def _write_buffers(self):
+        for kind, rows in self._buffers.items():
+            if not rows:
+                continue
+            time_column = "observed_epoch" if kind == "current" else "time_epoch"
+            partitions = defaultdict(list)
+            for row in rows:
+                key = (local_date(row[time_column] or row["fetched_epoch"]), province_slug(row.pop("province")))
+                partitions[key].append(row)
+            for (date, slug), partition_rows in partitions.items():
+                directory = os.path.join(self.root, kind, f"date={date}", f"province={slug}")
+                table = pa.Table.from_pylist(partition_rows, schema=SCHEMAS[kind])
+                self._write_file(directory, table)
+                self._stats["rows_written"] += table.num_rows
+        self._buffers.clear()
+
+    def _write_file(self, directory, table, prefix="part"):
+        os.makedirs(directory, exist_ok=True)
+        name = f"{prefix}-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = os.path.join(directory, f".{name}.tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        # Readers only ever see complete files
+        os.replace(tmp_path, os.path.join(directory, name))
+        self._stats["files_written"] += 1
+
+
+def _and(expression, clause):
+    return clause if expression is None else expression & clause
+
+
+observation_store = None
+if config.OBSERVATION_STORE_ENABLED:
+    observation_store = ObservationStore(config.OBSERVATION_DIR, flush_interval=config.OBSERVATION_FLUSH_INTERVAL)
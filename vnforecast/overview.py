@@ -0,0 +1,64 @@
+"""Concurrent fetch of every province for the nationwide overview."""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from vnforecast import config, weather_api
+
+
+def iter_views(provinces, max_workers=None, days=None):
+    """Yield (province, views, error) for each province as its data arrives.
+
+    Cached provinces are yielded first. The rest are fetched on a bounded
+    thread pool, in bulk batches when the plan supports them and one request
+    per province otherwise; a batch the plan rejects is retried per province.
+    A failed province yields its exception instead of aborting the rest.
+    """
+    pending = {}
+    for name, location in provinces.items():
+        views = weather_api.peek_views(location, days)
+        if views is not None:
+            yield name, views, None
+        else:
+            pending[name] = location
+    if not pending:
+        return
+
+    max_workers = max_workers or config.OVERVIEW_WORKERS
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="overview") as pool:
+        futures = {}
+
+        def submit_single(name):
+            # Fetched inline so the pool is not serialized behind the prefetch thread
+            future = pool.submit(weather_api.get_views, pending[name], days, True)
+            futures[future] = ("single", name)
+
+        if weather_api.bulk_available() and len(pending) >= config.BULK_MIN_LOCATIONS:
+            for batch in weather_api.chunked(list(pending.items()), config.BULK_BATCH_SIZE):
+                future = pool.submit(weather_api.load_bulk, dict(batch), days)
+                futures[future] = ("bulk", dict(batch))
+        else:
+            for name in pending:
+                submit_single(name)
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, target = futures.pop(future)
+                if kind == "single":
+                    try:
+                        yield target, future.result(), None
+                    except Exception as e:
+                        yield target, None, e
+                    continue
+                try:
+                    results = future.result()
+                except weather_api.BulkUnsupported:
+                    for name in target:
+                        submit_single(name)
+                    continue
+                except Exception as e:
+                    results = {name: e for name in target}
+                for name, result in results.items():
+                    if isinstance(result, Exception):
+                        yield name, None, result
+                    else:
+                        yield name, result, None
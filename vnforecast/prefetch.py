@@ -0,0 +1,166 @@
+"""Background scheduler that keeps every province warm in the shared cache."""
+import threading
+import time
+from collections import Counter, deque
+
+
+class PrefetchScheduler:
+    """Refreshes a fixed set of locations on a steady cadence.
+
+    One pass over all locations takes ``interval`` seconds; refreshes are
+    spaced evenly across it instead of being sent in a burst. Each pass visits
+    the most frequently accessed locations first, and access counts are halved
+    after every pass so the ordering follows recent traffic. ``request()`` lets
+    a page view jump the queue for a location that is not warm yet.
+
+    With ``refresh_many`` and ``batch_size`` > 1, each step of a pass refreshes
+    a batch of locations in one call (WeatherAPI bulk requests); steps are
+    spaced the same way.
+
+    ``stretch``, if given, is read at the start of every pass and multiplies
+    that pass's length (used to slow down while the call budget is tight).
+    """
+
+    def __init__(self, locations, refresh, interval=900, seed=(), seed_weight=5.0, decay=0.5,
+                 refresh_many=None, batch_size=1, stretch=None):
+        self._locations = list(locations)
+        self._refresh = refresh
+        self._refresh_many = refresh_many
+        self.batch_size = batch_size
+        self.interval = interval
+        self._stretch = stretch
+        self._decay = decay
+        self._access = Counter({location: seed_weight for location in seed})
+        self._urgent = deque()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"passes": 0, "refreshed": 0, "failures": 0, "urgent": 0, "last_pass_seconds": 0.0,
+                       "stretch": 1.0}
+
+    def start(self):
+        """Start the worker thread if it is not already running"""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="weather-prefetch", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Ask the worker to exit and wait for it"""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def record_access(self, location):
+        """Count a page view so the location is refreshed earlier next pass"""
+        with self._cond:
+            self._access[location] += 1
+
+    def request(self, location, timeout=None):
+        """Warm location ahead of the schedule and wait for the attempt.
+
+        Re-raises the refresh error, or raises TimeoutError if the worker did
+        not get to it in time.
+        """
+        done = threading.Event()
+        outcome = [None]
+        with self._cond:
+            self._urgent.append((location, done, outcome))
+            self._stats["urgent"] += 1
+            self._cond.notify_all()
+        if not done.wait(timeout):
+            raise TimeoutError(f"Prefetch of {location} did not finish within {timeout}s")
+        if outcome[0] is not None:
+            raise outcome[0]
+
+    def stats(self):
+        """Snapshot of pass/refresh counters"""
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot["top"] = [location for location, _ in self._access.most_common(5)]
+        return snapshot
+
+    def _order(self):
+        with self._cond:
+            access = dict(self._access)
+            for location in self._access:
+                self._access[location] *= self._decay
+        # sorted() is stable, so ties keep the registry order
+        return sorted(self._locations, key=lambda location: -access.get(location, 0))
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            order = self._order()
+            size = self.batch_size if self._refresh_many is not None else 1
+            steps = [order[start:start + size] for start in range(0, len(order), max(size, 1))]
+            stretch = self._stretch() if self._stretch is not None else 1.0
+            with self._cond:
+                self._stats["stretch"] = stretch
+            delay = self.interval * stretch / max(len(steps), 1)
+            for step in steps:
+                self._drain_urgent()
+                if self._stop.is_set():
+                    return
+                if len(step) == 1:
+                    self._warm(step[0])
+                else:
+                    self._warm_batch(step)
+                self._sleep(delay)
+            with self._cond:
+                self._stats["passes"] += 1
+                self._stats["last_pass_seconds"] = time.monotonic() - started
+
+    def _sleep(self, delay):
+        # Wait out the spacing between refreshes, serving urgent requests meanwhile
+        deadline = time.monotonic() + delay
+        while not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            with self._cond:
+                if not self._urgent:
+                    self._cond.wait(remaining)
+            self._drain_urgent()
+
+    def _drain_urgent(self):
+        while True:
+            with self._cond:
+                if not self._urgent:
+                    return
+                location = self._urgent[0][0]
+                waiters = [item for item in self._urgent if item[0] == location]
+                self._urgent = deque(item for item in self._urgent if item[0] != location)
+            # One refresh answers every session waiting on the same location
+            error = self._warm(location)
+            for _, done, outcome in waiters:
+                outcome[0] = error
+                done.set()
+
+    def _warm_batch(self, locations):
+        try:
+            failed = len(self._refresh_many(locations))
+        except Exception:
+            failed = len(locations)
+        with self._cond:
+            self._stats["failures"] += failed
+            self._stats["refreshed"] += len(locations) - failed
+
+    def _warm(self, location):
+        try:
+            self._refresh(location)
+        except Exception as e:
+            with self._cond:
+                self._stats["failures"] += 1
+            return e
+        with self._cond:
+            self._stats["refreshed"] += 1
+        return None
@@ -0,0 +1,142 @@
+"""Registry of the provinces shown in the dashboard: codes, coordinates, aliases and WeatherAPI queries."""
+import re
+import unicodedata
+from collections import namedtuple
+
+
+class Province(namedtuple("Province", ["name", "code", "capital", "lat", "lon", "merged_into"])):
+    """One of the 63 provinces the dashboard shows.
+
+    ``code`` is the GSO administrative code, ``lat``/``lon`` the provincial
+    capital (where most people live, and what the old free-text queries
+    geocoded to) and ``merged_into`` the province it belongs to since the
+    2025 reorganization into 34 provinces.
+    """
+    __slots__ = ()
+
+    @property
+    def query(self):
+        """WeatherAPI query for the province: coordinates, so nothing needs geocoding"""
+        return f"{self.lat:.4f},{self.lon:.4f}"
+
+
+PROVINCES = [
+    Province("An Giang", "89", "Long Xuyên", 10.3864, 105.4352, "An Giang"),
+    Province("Bà Rịa - Vũng Tàu", "77", "Bà Rịa", 10.4963, 107.1684, "TP. Hồ Chí Minh"),
+    Province("Bạc Liêu", "95", "Bạc Liêu", 9.2940, 105.7272, "Cà Mau"),
+    Province("Bắc Giang", "24", "Bắc Giang", 21.2731, 106.1946, "Bắc Ninh"),
+    Province("Bắc Kạn", "06", "Bắc Kạn", 22.1470, 105.8348, "Thái Nguyên"),
+    Province("Bắc Ninh", "27", "Bắc Ninh", 21.1861, 106.0763, "Bắc Ninh"),
+    Province("Bến Tre", "83", "Bến Tre", 10.2434, 106.3756, "Vĩnh Long"),
+    Province("Bình Dương", "74", "Thủ Dầu Một", 10.9804, 106.6519, "TP. Hồ Chí Minh"),
+    Province("Bình Định", "52", "Quy Nhơn", 13.7765, 109.2237, "Gia Lai"),
+    Province("Bình Phước", "70", "Đồng Xoài", 11.5349, 106.8832, "Đồng Nai"),
+    Province("Bình Thuận", "60", "Phan Thiết", 10.9289, 108.1021, "Lâm Đồng"),
+    Province("Cà Mau", "96", "Cà Mau", 9.1769, 105.1524, "Cà Mau"),
+    Province("Cần Thơ", "92", "Cần Thơ", 10.0452, 105.7469, "Cần Thơ"),
+    Province("Cao Bằng", "04", "Cao Bằng", 22.6657, 106.2579, "Cao Bằng"),
+    Province("Đà Nẵng", "48", "Đà Nẵng", 16.0544, 108.2022, "Đà Nẵng"),
+    Province("Đắk Lắk", "66", "Buôn Ma Thuột", 12.6667, 108.0383, "Đắk Lắk"),
+    Province("Đắk Nông", "67", "Gia Nghĩa", 12.0042, 107.6907, "Lâm Đồng"),
+    Province("Điện Biên", "11", "Điện Biên Phủ", 21.3860, 103.0230, "Điện Biên"),
+    Province("Đồng Nai", "75", "Biên Hòa", 10.9574, 106.8427, "Đồng Nai"),
+    Province("Đồng Tháp", "87", "Cao Lãnh", 10.4600, 105.6329, "Đồng Tháp"),
+    Province("Gia Lai", "64", "Pleiku", 13.9833, 108.0000, "Gia Lai"),
+    Province("Hà Giang", "02", "Hà Giang", 22.8233, 104.9836, "Tuyên Quang"),
+    Province("Hà Nam", "35", "Phủ Lý", 20.5411, 105.9139, "Ninh Bình"),
+    Province("Hà Nội", "01", "Hà Nội", 21.0285, 105.8542, "Hà Nội"),
+    Province("Hà Tĩnh", "42", "Hà Tĩnh", 18.3428, 105.9057, "Hà Tĩnh"),
+    Province("Hải Dương", "30", "Hải Dương", 20.9399, 106.3309, "Hải Phòng"),
+    Province("Hải Phòng", "31", "Hải Phòng", 20.8449, 106.6881, "Hải Phòng"),
+    Province("Hậu Giang", "93", "Vị Thanh", 9.7845, 105.4701, "Cần Thơ"),
+    Province("Hòa Bình", "17", "Hòa Bình", 20.8171, 105.3376, "Phú Thọ"),
+    Province("Hưng Yên", "33", "Hưng Yên", 20.6464, 106.0511, "Hưng Yên"),
+    Province("Khánh Hòa", "56", "Nha Trang", 12.2388, 109.1967, "Khánh Hòa"),
+    Province("Kiên Giang", "91", "Rạch Giá", 10.0125, 105.0809, "An Giang"),
+    Province("Kon Tum", "62", "Kon Tum", 14.3497, 108.0005, "Quảng Ngãi"),
+    Province("Lai Châu", "12", "Lai Châu", 22.3964, 103.4582, "Lai Châu"),
+    Province("Lâm Đồng", "68", "Đà Lạt", 11.9404, 108.4583, "Lâm Đồng"),
+    Province("Lạng Sơn", "20", "Lạng Sơn", 21.8537, 106.7615, "Lạng Sơn"),
+    Province("Lào Cai", "10", "Lào Cai", 22.4856, 103.9707, "Lào Cai"),
+    Province("Long An", "80", "Tân An", 10.5359, 106.4137, "Tây Ninh"),
+    Province("Nam Định", "36", "Nam Định", 20.4338, 106.1770, "Ninh Bình"),
+    Province("Nghệ An", "40", "Vinh", 18.6796, 105.6813, "Nghệ An"),
+    Province("Ninh Bình", "37", "Ninh Bình", 20.2506, 105.9745, "Ninh Bình"),
+    Province("Ninh Thuận", "58", "Phan Rang-Tháp Chàm", 11.5649, 108.9886, "Khánh Hòa"),
+    Province("Phú Thọ", "25", "Việt Trì", 21.3227, 105.4019, "Phú Thọ"),
+    Province("Phú Yên", "54", "Tuy Hòa", 13.0955, 109.3209, "Đắk Lắk"),
+    Province("Quảng Bình", "44", "Đồng Hới", 17.4684, 106.6222, "Quảng Trị"),
+    Province("Quảng Nam", "49", "Tam Kỳ", 15.5736, 108.4740, "Đà Nẵng"),
+    Province("Quảng Ngãi", "51", "Quảng Ngãi", 15.1205, 108.7923, "Quảng Ngãi"),
+    Province("Quảng Ninh", "22", "Hạ Long", 20.9517, 107.0800, "Quảng Ninh"),
+    Province("Quảng Trị", "45", "Đông Hà", 16.8163, 107.1003, "Quảng Trị"),
+    Province("Sóc Trăng", "94", "Sóc Trăng", 9.6025, 105.9739, "Cần Thơ"),
+    Province("Sơn La", "14", "Sơn La", 21.3270, 103.9141, "Sơn La"),
+    Province("Tây Ninh", "72", "Tây Ninh", 11.3100, 106.0983, "Tây Ninh"),
+    Province("Thái Bình", "34", "Thái Bình", 20.4463, 106.3366, "Hưng Yên"),
+    Province("Thái Nguyên", "19", "Thái Nguyên", 21.5942, 105.8482, "Thái Nguyên"),
+    Province("Thanh Hóa", "38", "Thanh Hóa", 19.8067, 105.7852, "Thanh Hóa"),
+    Province("Thừa Thiên Huế", "46", "Huế", 16.4637, 107.5909, "Huế"),
+    Province("Tiền Giang", "82", "Mỹ Tho", 10.3600, 106.3600, "Đồng Tháp"),
+    Province("TP. Hồ Chí Minh", "79", "Hồ Chí Minh", 10.7769, 106.7009, "TP. Hồ Chí Minh"),
+    Province("Trà Vinh", "84", "Trà Vinh", 9.9347, 106.3453, "Vĩnh Long"),
+    Province("Tuyên Quang", "08", "Tuyên Quang", 21.8233, 105.2141, "Tuyên Quang"),
+    Province("Vĩnh Long", "86", "Vĩnh Long", 10.2537, 105.9722, "Vĩnh Long"),
+    Province("Vĩnh Phúc", "26", "Vĩnh Yên", 21.3089, 105.6049, "Phú Thọ"),
+    Province("Yên Bái", "15", "Yên Bái", 21.7051, 104.8750, "Lào Cai"),
+]
+
+REGISTRY = {province.name: province for province in PROVINCES}
+
+# Province name -> WeatherAPI query
+VIETNAMESE_PROVINCES = {province.name: province.query for province in PROVINCES}
+
+# The 34 provinces from the 2025 reorganization and the former provinces each covers
+MERGED_PROVINCES = {}
+for _province in PROVINCES:
+    MERGED_PROVINCES.setdefault(_province.merged_into, []).append(_province.name)
+
+# Shown as quick links on the welcome page and warmed first by the prefetcher
+POPULAR_PROVINCES = ["Hà Nội", "TP. Hồ Chí Minh", "Đà Nẵng"]
+
+# Other names people search for besides the province and its capital: abbreviations,
+# spellings without spaces and well-known cities
+PROVINCE_ALIASES = {
+    "Bà Rịa - Vũng Tàu": ["BRVT", "Vũng Tàu", "Bà Rịa"],
+    "Bình Thuận": ["Phan Thiết", "Mũi Né"],
+    "Cần Thơ": ["CT"],
+    "Đà Nẵng": ["ĐN", "Danang"],
+    "Đắk Lắk": ["Buôn Ma Thuột", "BMT", "Daklak"],
+    "Gia Lai": ["Pleiku"],
+    "Hà Nội": ["HN", "Hanoi"],
+    "Hải Phòng": ["HP", "Haiphong"],
+    "Khánh Hòa": ["Nha Trang"],
+    "Kiên Giang": ["Phú Quốc", "Rạch Giá"],
+    "Lâm Đồng": ["Đà Lạt", "Dalat"],
+    "Lào Cai": ["Sa Pa", "Sapa"],
+    "Quảng Nam": ["Hội An", "Tam Kỳ"],
+    "Quảng Ninh": ["Hạ Long", "Halong"],
+    "Thừa Thiên Huế": ["Huế", "TTH"],
+    "TP. Hồ Chí Minh": ["HCM", "TPHCM", "HCMC", "Hồ Chí Minh", "Sài Gòn", "Saigon", "SG"],
+}
+
+# Reverse lookup from the WeatherAPI query back to the province name
+PROVINCE_BY_LOCATION = {location: name for name, location in VIETNAMESE_PROVINCES.items()}
+
+
+def aliases(name):
+    """Every alternative name of a province: its capital plus PROVINCE_ALIASES"""
+    province = REGISTRY[name]
+    extra = PROVINCE_ALIASES.get(name, [])
+    return extra if province.capital == name else [province.capital, *extra]
+
+
+def fold_diacritics(text):
+    """Lowercase text and strip Vietnamese diacritics ("Đà Nẵng" -> "da nang")"""
+    text = text.lower().replace("đ", "d")
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def province_slug(name):
+    """ASCII identifier for a province, safe for file and partition names"""
+    return re.sub(r"[^a-z0-9]+", "-", fold_diacritics(name)).strip("-")
@@ -0,0 +1,237 @@
+"""WeatherAPI call budget: per-second token bucket and a monthly quota persisted across restarts."""
+import atexit
+import calendar
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from vnforecast import config
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: saves stay atomic but are not serialized across processes
+    fcntl = None
+
+
+def month_bounds(now):
+    """(label, start epoch, end epoch) of the UTC calendar month containing now"""
+    moment = datetime.fromtimestamp(now, timezone.utc)
+    start = datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+    days = calendar.monthrange(moment.year, moment.month)[1]
+    return f"{moment.year:04d}-{moment.month:02d}", start.timestamp(), start.timestamp() + days * 86400
+
+
+class QuotaLimiter:
+    """Spaces upstream calls and accounts them against a monthly budget.
+
+    ``acquire()`` is called once per upstream request. It waits for a token
+    from a bucket refilled at ``per_second`` (so bursts from many sessions
+    are smoothed instead of answered with 429s), then counts ``cost`` calls
+    against the month. Calls are never refused for budget reasons; instead
+    ``stretch()`` grows above 1 once the month is projected to end above
+    ``stretch_at`` of the budget, and the cache and prefetcher multiply
+    their TTLs and intervals by it, which lowers the burn rate.
+
+    The month's count is kept in a small JSON file. Saves add this
+    process's unsaved calls to what the file holds, so several server
+    processes sharing the file keep one running total.
+    """
+
+    def __init__(self, monthly_budget=1000000, per_second=10, burst=None, state_path=None,
+                 stretch_at=0.8, max_stretch=4.0, window=3600, save_interval=60, clock=time.time):
+        self.monthly_budget = monthly_budget
+        self.per_second = per_second
+        self.burst = burst or max(per_second, 1)
+        self.state_path = state_path
+        self.stretch_at = stretch_at
+        self.max_stretch = max_stretch
+        self.window = window
+        self.save_interval = save_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+        self._started = clock()
+        # (minute, calls) for the burn-rate window
+        self._minutes = deque()
+        self._month, month_start, self._month_end = month_bounds(self._started)
+        self._saved_used = self._load()
+        # Calls per second before this process started, from the month so far
+        self._baseline = self._saved_used / max(self._started - month_start, window)
+        self._unsaved = 0
+        self._last_save = self._started
+        self._stats = {"calls": 0, "waits": 0, "wait_seconds": 0.0, "saves": 0, "save_errors": 0}
+
+    def acquire(self, cost=1):
+        """Wait for a token (if per-second limiting is on), then count cost calls against the month"""
+        if self.per_second > 0:
+            self._take_token()
+        now = self._clock()
+        save = False
+        with self._lock:
+            self._roll_month(now)
+            minute = int(now // 60)
+            if self._minutes and self._minutes[-1][0] == minute:
+                self._minutes[-1][1] += cost
+            else:
+                self._minutes.append([minute, cost])
+            self._unsaved += cost
+            self._stats["calls"] += cost
+            save = self.state_path is not None and now - self._last_save >= self.save_interval
+            if save:
+                self._last_save = now
+        if save:
+            self.save()
+
+    def _take_token(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.per_second)
+                self._refilled = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.per_second
+                self._stats["waits"] += 1
+                self._stats["wait_seconds"] += wait
+            time.sleep(wait)
+
+    def used(self):
+        """Calls counted this month, including other processes' as of the last save"""
+        with self._lock:
+            self._roll_month(self._clock())
+            return self._saved_used + self._unsaved
+
+    def burn_rate(self, now=None):
+        """Calls per hour over the recent window"""
+        now = self._clock() if now is None else now
+        with self._lock:
+            return self._burn_rate(now)
+
+    def _burn_rate(self, now):
+        # Called with self._lock held
+        first_minute = int((now - self.window) // 60)
+        while self._minutes and self._minutes[0][0] < first_minute:
+            self._minutes.popleft()
+        calls = sum(count for _, count in self._minutes)
+        # Until a full window has been seen, its unobserved part counts at the
+        # month-to-date average, so a startup burst (the first prefetch pass)
+        # is not extrapolated over the rest of the month
+        unobserved = self.window - min(max(now - self._started, 0), self.window)
+        return (calls + self._baseline * unobserved) * 3600 / self.window
+
+    def stretch(self):
+        """Factor (1 to max_stretch) to multiply cache TTLs and refresh intervals by"""
+        now = self._clock()
+        with self._lock:
+            self._roll_month(now)
+            projected = self._projected(now)
+        if self.monthly_budget <= 0:
+            return 1.0
+        return min(max(projected / (self.monthly_budget * self.stretch_at), 1.0), self.max_stretch)
+
+    def _projected(self, now):
+        # Called with self._lock held: month total if the current burn rate holds
+        return self._saved_used + self._unsaved + self._burn_rate(now) * (self._month_end - now) / 3600
+
+    def stats(self):
+        """Usage, burn rate, projection and the date the budget runs out at the current rate"""
+        now = self._clock()
+        with self._lock:
+            self._roll_month(now)
+            used = self._saved_used + self._unsaved
+            rate = self._burn_rate(now)
+            projected = self._projected(now)
+            snapshot = dict(self._stats)
+        remaining = max(self.monthly_budget - used, 0)
+        if remaining == 0:
+            exhausted_at = now
+        elif rate > 0 and now + remaining / rate * 3600 < self._month_end:
+            exhausted_at = now + remaining / rate * 3600
+        else:
+            exhausted_at = None
+        snapshot.update({
+            "month": self._month,
+            "budget": self.monthly_budget,
+            "used": used,
+            "remaining": remaining,
+            "burn_rate_per_hour": rate,
+            "projected_month_total": projected,
+            "exhaustion_epoch": exhausted_at,
+            "exhaustion_date": (datetime.fromtimestamp(exhausted_at, timezone.utc).strftime("%Y-%m-%d")
+                                if exhausted_at is not None else None),
+            "stretch": self.stretch(),
+        })
+        return snapshot
+
+    def save(self):
+        """Add this process's unsaved calls to the state file"""
+        if self.state_path is None or not self._unsaved:
+            return
+        with self._lock:
+            month, unsaved = self._month, self._unsaved
+        try:
+            directory = os.path.dirname(self.state_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Read-merge-write under an exclusive lock so concurrent savers
+            # never overwrite each other's counts
+            with open(f"{self.state_path}.lock", "a") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                state = self._read_state()
+                used = (state.get("used", 0) if state.get("month") == month else 0) + unsaved
+                temporary = f"{self.state_path}.{os.getpid()}.tmp"
+                with open(temporary, "w") as f:
+                    json.dump({"month": month, "used": used}, f)
+                # Readers see the old file or the new one, never a partial write
+                os.replace(temporary, self.state_path)
+        except OSError:
+            with self._lock:
+                self._stats["save_errors"] += 1
+            return
+        with self._lock:
+            # Calls counted while the file was written stay unsaved for next time
+            if self._month == month:
+                self._unsaved -= unsaved
+                self._saved_used = used
+            self._stats["saves"] += 1
+
+    def _load(self):
+        state = self._read_state()
+        return state.get("used", 0) if state.get("month") == self._month else 0
+
+    def _read_state(self):
+        if self.state_path is None:
+            return {}
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def _roll_month(self, now):
+        # Called with self._lock held; the budget starts over each month
+        if now < self._month_end:
+            return
+        self._month, _, self._month_end = month_bounds(now)
+        self._saved_used = 0
+        self._unsaved = 0
+        self._baseline = 0.0
+
+
+quota_limiter = QuotaLimiter(
+    monthly_budget=config.QUOTA_MONTHLY_CALLS,
+    per_second=config.QUOTA_PER_SECOND,
+    burst=config.QUOTA_BURST,
+    state_path=config.QUOTA_STATE_PATH if config.QUOTA_PERSIST else None,
+    stretch_at=config.QUOTA_STRETCH_AT,
+    max_stretch=config.QUOTA_MAX_STRETCH,
+)
+atexit.register(quota_limiter.save)
@@ -0,0 +1,116 @@
+"""Accent-insensitive place search: exact names and aliases, token prefixes, trigram fuzzy matches."""
+import heapq
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from vnforecast.geo import nearest_province, parse_coordinates
+from vnforecast.provinces import VIETNAMESE_PROVINCES, aliases, fold_diacritics
+
+
+def normalize(text):
+    """Folded, punctuation-free, single-spaced form used for both names and queries"""
+    return " ".join(re.split(r"[^a-z0-9]+", fold_diacritics(text or ""))).strip()
+
+
+def trigrams(term):
+    """Character trigrams of a normalized term, ignoring spaces ("da nang" and "danang" match)"""
+    padded = f"  {term.replace(' ', '')} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """In-memory index over place names and their aliases, built once.
+
+    Every name and alias is a *term*. Lookups go through three dicts:
+    normalized term -> entries (exact), token prefix -> entries (typing
+    "quang n" finds Quảng Nam and Quảng Ngãi, "danan" finds Đà Nẵng), and
+    trigram -> terms for fuzzy matches ("ha noii", "kontum"). Memory grows
+    with the number of distinct prefixes and trigrams, so tens of thousands
+    of districts and communes still answer in well under a millisecond.
+    """
+
+    def __init__(self, entries, min_similarity=0.35):
+        """entries: iterable of (name, aliases); results are names, in entry order on ties"""
+        self.min_similarity = min_similarity
+        self.names = []
+        self._exact = defaultdict(set)
+        self._prefix = defaultdict(set)
+        postings = defaultdict(list)
+        term_entry = []
+        term_size = []
+        for entry, (name, alias_list) in enumerate(entries):
+            self.names.append(name)
+            for term in {normalize(name), *(normalize(alias) for alias in alias_list)}:
+                if not term:
+                    continue
+                self._exact[term].add(entry)
+                for token in term.split() + [term.replace(" ", "")]:
+                    for end in range(1, len(token) + 1):
+                        self._prefix[token[:end]].add(entry)
+                grams = trigrams(term)
+                for gram in grams:
+                    postings[gram].append(len(term_entry))
+                term_entry.append(entry)
+                term_size.append(len(grams))
+        # Arrays, so fuzzy scoring is a bincount instead of a Python loop per posting
+        self._trigrams = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._term_entry = np.array(term_entry, dtype=np.int32)
+        self._term_size = np.array(term_size, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, limit=10):
+        """Names matching query, best first: exact name or alias, then prefix, then fuzzy"""
+        query = normalize(query)
+        if not query:
+            return []
+        exact = self._exact.get(query, set())
+        results = sorted(exact)[:limit]
+
+        # Every query token must start a token of one of the entry's terms
+        if len(results) < limit:
+            tokens = query.split()
+            matches = set(self._prefix.get(tokens[0], ()))
+            for token in tokens[1:]:
+                matches &= self._prefix.get(token, set())
+            matches |= self._prefix.get(query.replace(" ", ""), set())
+            results += heapq.nsmallest(limit - len(results), matches - exact)
+
+        if len(results) < limit:
+            seen = set(results)
+            fuzzy = [(-score, entry) for entry, score in self._fuzzy(query).items() if entry not in seen]
+            results += [entry for _, entry in heapq.nsmallest(limit - len(results), fuzzy)]
+        return [self.names[entry] for entry in results]
+
+    def _fuzzy(self, query):
+        # Dice coefficient between the query's trigrams and each term's
+        grams = trigrams(query)
+        lists = [self._trigrams[gram] for gram in grams if gram in self._trigrams]
+        if not lists:
+            return {}
+        shared = np.bincount(np.concatenate(lists), minlength=len(self._term_entry))
+        scores = 2 * shared / (len(grams) + self._term_size)
+        similarity = {}
+        for term_id in np.flatnonzero(scores >= self.min_similarity):
+            entry = int(self._term_entry[term_id])
+            similarity[entry] = max(similarity.get(entry, 0.0), float(scores[term_id]))
+        return similarity
+
+
+# Built once per server process, on first import
+province_index = SearchIndex((name, aliases(name)) for name in VIETNAMESE_PROVINCES)
+
+
+def search_provinces(query, limit=10):
+    """Province names matching a free-text query ("da nang", "hcm", "sai gon").
+
+    A "lat,lon" query returns the nearest province instead, if one is close.
+    """
+    coordinates = parse_coordinates(query)
+    if coordinates is not None:
+        name = nearest_province(*coordinates)
+        return [name] if name is not None else []
+    return province_index.search(query, limit)
@@ -0,0 +1,67 @@
+"""In-flight request deduplication shared by all script threads."""
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "value", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run at most one call per key at a time.
+
+    Threads that ask for a key while a call for it is already running wait
+    for that call and receive its result, or re-raise its exception.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {"leaders": 0, "coalesced": 0}
+
+    def do(self, key, fn):
+        """Return fn() for key, sharing one in-flight call between threads"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._stats["leaders"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        """Keys with a call currently running"""
+        with self._lock:
+            return list(self._calls)
+
+    def stats(self):
+        """Leader/coalesced counters; coalesced / leaders is the fan-in ratio"""
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot["fan_in"] = (snapshot["leaders"] + snapshot["coalesced"]) / snapshot["leaders"] if snapshot["leaders"] else 0.0
+        return snapshot
@@ -0,0 +1,74 @@
+"""Dashboard stylesheet, shipped to each browser session once."""
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+from vnforecast import conditions
+
+STYLESHEET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard.css")
+
+with open(STYLESHEET_PATH, encoding="utf-8") as f:
+    STYLESHEET = f.read()
+
+# Changes whenever dashboard.css does, so an open tab picks up a new version
+STYLESHEET_HASH = hashlib.sha256(STYLESHEET.encode("utf-8")).hexdigest()[:12]
+
+# Kind of weather (see conditions.KINDS) -> classes defined in dashboard.css
+ANIMATIONS = {"clear": "anim-sunny", "rain": "anim-rain", "cloud": "anim-cloudy", "storm": "anim-storm"}
+DEFAULT_ANIMATION = "anim-gentle"
+GRADIENTS = {"rain": "grad-rain", "cloud": "grad-cloud", "fog": "grad-fog", "snow": "grad-snow", "storm": "grad-storm"}
+
+ConditionStyle = namedtuple("ConditionStyle", ["kind", "gradient", "animation"])
+
+
+def _style(kind, is_day):
+    # gradient is None where it depends on the temperature (see gradient_class)
+    if kind == "clear" and not is_day:
+        return ConditionStyle(kind, "grad-clear-night", DEFAULT_ANIMATION)
+    return ConditionStyle(kind, GRADIENTS.get(kind), ANIMATIONS.get(kind, DEFAULT_ANIMATION))
+
+
+# (code, is_day) -> ConditionStyle for every known condition, built once at import
+CONDITION_STYLES = {key: _style(kind, key[1]) for key, kind in conditions.KIND_BY_CODE.items()}
+
+
+def condition_style(code, is_day, text=None):
+    """ConditionStyle for a condition code, classifying text only for unknown codes (see conditions.kind)"""
+    style = CONDITION_STYLES.get((code, 1 if is_day else 0))
+    if style is None:
+        style = _style(conditions.kind(code, is_day, text), is_day)
+    return style
+
+
+def gradient_class(style, temp_c):
+    """Background gradient class for a ConditionStyle at temperature temp_c"""
+    if style.gradient is not None:
+        return style.gradient
+    if style.kind == "clear":
+        return "grad-clear-hot" if temp_c > 25 else "grad-clear"
+    if temp_c > 30:
+        return "grad-hot"
+    return "grad-warm" if temp_c > 20 else "grad-mild"
+
+
+def injector_html():
+    """Script that adds the stylesheet to the parent page's <head> unless that version is already there.
+
+    Rendered in a zero-height component iframe; the <style> element lives in
+    the parent document, so it survives the iframe being dropped on later
+    reruns and only has to be sent once per browser session.
+    """
+    css = json.dumps(STYLESHEET).replace("</", "<\\/")
+    return f"""<script>
+(function() {{
+    var doc = window.parent.document;
+    var id = "vnforecast-css-{STYLESHEET_HASH}";
+    if (doc.getElementById(id)) return;
+    doc.querySelectorAll("style[id^='vnforecast-css-']").forEach(function(old) {{ old.remove(); }});
+    var style = doc.createElement("style");
+    style.id = id;
+    style.textContent = {css};
+    doc.head.appendChild(style);
+}})();
+</script>"""
@@ -0,0 +1,71 @@
+"""Unit systems and vectorized conversion of WeatherAPI's metric fields."""
+from collections import namedtuple
+
+import numpy as np
+
+# unit -> (scale, offset, symbol) applied to the metric value WeatherAPI sends
+TEMPERATURE = {"celsius": (1.0, 0.0, "°C"), "fahrenheit": (1.8, 32.0, "°F")}
+WIND = {"kmh": (1.0, 0.0, "km/h"), "mph": (0.621371, 0.0, "mph")}
+PRESSURE = {"mbar": (1.0, 0.0, "mbar"), "inhg": (0.02953, 0.0, "inHg")}
+KINDS = {"temperature": TEMPERATURE, "wind": WIND, "pressure": PRESSURE}
+
+# Metric source column -> (kind, name of the converted column)
+COLUMNS = {
+    "temp_c": ("temperature", "temp"),
+    "feelslike_c": ("temperature", "feelslike"),
+    "dewpoint_c": ("temperature", "dewpoint"),
+    "windchill_c": ("temperature", "windchill"),
+    "heatindex_c": ("temperature", "heatindex"),
+    "maxtemp_c": ("temperature", "maxtemp"),
+    "mintemp_c": ("temperature", "mintemp"),
+    "wind_kph": ("wind", "wind"),
+    "gust_kph": ("wind", "gust"),
+    "maxwind_kph": ("wind", "maxwind"),
+    "pressure_mb": ("pressure", "pressure"),
+}
+
+
+class UnitSystem(namedtuple("UnitSystem", ["temperature", "wind", "pressure"])):
+    """The units a session displays, e.g. UnitSystem("fahrenheit", "mph", "inhg")"""
+    __slots__ = ()
+
+    def symbol(self, kind):
+        return KINDS[kind][getattr(self, kind)][2]
+
+
+METRIC = UnitSystem("celsius", "kmh", "mbar")
+
+
+def convert(values, kind, unit):
+    """Convert a scalar or array from WeatherAPI's metric unit of kind to unit"""
+    scale, offset, _ = KINDS[kind][unit]
+    if scale == 1.0 and offset == 0.0:
+        return values
+    return values * scale + offset
+
+
+def convert_delta(delta, kind, unit):
+    """Convert a difference between two values (no offset applied)"""
+    return delta * KINDS[kind][unit][0]
+
+
+def convert_record(record, units):
+    """{converted name: value} for every metric attribute of record; None where it is missing"""
+    converted = {}
+    for column, (kind, name) in COLUMNS.items():
+        value = getattr(record, column, None)
+        converted[name] = None if value is None else convert(float(value), kind, getattr(units, kind))
+    return converted
+
+
+def convert_frame(frame, units):
+    """frame plus one converted column per metric column it has, in a single pass each.
+
+    Missing values (a field the provider omitted) stay NaN.
+    """
+    converted = {}
+    for column, (kind, name) in COLUMNS.items():
+        if column in frame:
+            values = frame[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            converted[name] = convert(values, kind, getattr(units, kind))
+    return frame.assign(**converted)
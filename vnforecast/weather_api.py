@@ -0,0 +1,330 @@
+"""WeatherAPI.com client used by the dashboard, fronted by the shared cache."""
+import threading
+
+import requests
+
+from vnforecast import config, model
+from vnforecast.http_client import weather_http
+from vnforecast.observation_store import observation_store
+from vnforecast.prefetch import PrefetchScheduler
+from vnforecast.provinces import POPULAR_PROVINCES, VIETNAMESE_PROVINCES
+from vnforecast.quota import quota_limiter
+from vnforecast.weather_cache import response_cache
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+# Cleared for the rest of the process the first time the plan rejects a bulk request
+_bulk_supported = True
+
+# WeatherAPI 400 error codes the split calls would hit too: parameter q
+# missing (1003), invalid request URL (1005), no matching location (1006)
+REQUEST_ERROR_CODES = {1003, 1005, 1006}
+# "API key does not have access to the resource": the plan excludes it
+NO_ACCESS_ERROR_CODE = 2009
+
+
+class BulkUnsupported(Exception):
+    """The WeatherAPI plan does not accept bulk requests"""
+
+
+class LocationError(LookupError):
+    """WeatherAPI returned an error for one location inside a bulk response"""
+
+
+def cache_key(endpoint, location, days=None, aqi=False, alerts=False):
+    """Cache key for one upstream request"""
+    return (endpoint, location, days, aqi, alerts)
+
+
+def fetch_current(location):
+    """Call current.json directly, raising on any HTTP or network error"""
+    return weather_http.get_json(
+        f"{config.WEATHER_API_BASE_URL}/current.json",
+        params={"key": config.WEATHER_API_KEY, "q": location, "aqi": "yes"},
+        endpoint="current",
+    )
+
+
+def fetch_forecast(location, days=None):
+    """Call forecast.json directly, raising on any HTTP or network error"""
+    days = days or config.FORECAST_DAYS
+    return weather_http.get_json(
+        f"{config.WEATHER_API_BASE_URL}/forecast.json",
+        params={"key": config.WEATHER_API_KEY, "q": location, "days": days, "aqi": "no", "alerts": "yes"},
+        endpoint="forecast",
+    )
+
+
+def fetch_combined(location, days=None):
+    """One forecast.json call carrying current conditions, AQI, forecast and alerts.
+
+    forecast.json already includes the ``current`` block, so a page view needs
+    a single upstream request. If the provider rejects the combined
+    parameters (a 400 that is not about the location or the query itself),
+    fall back to the separate current.json and forecast.json calls. Bad or
+    disabled keys (401/403), unknown locations and throttling are raised as
+    is: the split calls would fail the same way and cost two more calls.
+    """
+    days = days or config.FORECAST_DAYS
+    try:
+        payload = weather_http.get_json(
+            f"{config.WEATHER_API_BASE_URL}/forecast.json",
+            params={"key": config.WEATHER_API_KEY, "q": location, "days": days, "aqi": "yes", "alerts": "yes"},
+            endpoint="combined",
+        )
+    except requests.exceptions.HTTPError as e:
+        if not _combined_rejected(e.response):
+            raise
+        payload = _fetch_split(location, days)
+        _record(payload, location)
+        return payload
+    if "current" not in payload:
+        payload["current"] = fetch_current(location)["current"]
+    _record(payload, location)
+    return payload
+
+
+def _error_code(response):
+    # WeatherAPI's error code from an error response body, or None
+    try:
+        return response.json().get("error", {}).get("code")
+    except (ValueError, AttributeError):
+        return None
+
+
+def _combined_rejected(response):
+    # True for a 400 that splitting the request could get past
+    if response is None or response.status_code != 400:
+        return False
+    return _error_code(response) not in REQUEST_ERROR_CODES
+
+
+def _fetch_split(location, days):
+    payload = fetch_current(location)
+    try:
+        forecast = fetch_forecast(location, days)
+    except requests.exceptions.HTTPError:
+        # Current conditions alone are still worth rendering
+        return payload
+    forecast["current"] = payload["current"]
+    return forecast
+
+
+def chunked(items, size):
+    """Split a list into consecutive chunks of at most size items"""
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def bulk_available():
+    """Whether bulk requests are enabled and have not been rejected"""
+    return config.BULK_ENABLED and _bulk_supported
+
+
+def fetch_bulk(provinces, days=None):
+    """Combined payloads for many locations from one bulk POST.
+
+    provinces maps a name (sent back as ``custom_id``) to its WeatherAPI
+    query and must not exceed the provider's per-request limit. Returns
+    {name: payload or LocationError}. Raises BulkUnsupported if the plan
+    rejects bulk requests (error 2009); other HTTP errors propagate.
+    """
+    global _bulk_supported
+    days = days or config.FORECAST_DAYS
+    body = {"locations": [{"q": location, "custom_id": name} for name, location in provinces.items()]}
+    try:
+        response = weather_http.post_json(
+            f"{config.WEATHER_API_BASE_URL}/forecast.json",
+            params={"key": config.WEATHER_API_KEY, "q": "bulk", "days": days, "aqi": "yes", "alerts": "yes"},
+            body=body,
+            endpoint="bulk",
+            cost=len(provinces),
+        )
+    except requests.exceptions.HTTPError as e:
+        # Only a plan rejection turns bulk off; a bad key or an exhausted
+        # quota fails single requests just the same and is raised as is
+        if _error_code(e.response) == NO_ACCESS_ERROR_CODE:
+            _bulk_supported = False
+            raise BulkUnsupported(str(e)) from e
+        raise
+
+    results = {}
+    for item in response.get("bulk", []):
+        query = item.get("query", {})
+        name = query.get("custom_id")
+        if name not in provinces:
+            continue
+        if "error" in query:
+            results[name] = LocationError(query["error"].get("message", "Unknown error"))
+        else:
+            results[name] = {k: v for k, v in query.items() if k not in ("custom_id", "q")}
+    for name in provinces:
+        results.setdefault(name, LocationError("Missing from bulk response"))
+    return results
+
+
+def load_bulk(provinces, days=None):
+    """Bulk-fetch provinces into the shared cache and return {name: views or exception}"""
+    days = days or config.FORECAST_DAYS
+    results = fetch_bulk(provinces, days)
+    views = {}
+    for name, result in results.items():
+        if isinstance(result, Exception):
+            views[name] = result
+        else:
+            _record(result, provinces[name])
+            forecast = model.decode(result)
+            response_cache.set(cache_key("forecast", provinces[name], days=days, aqi=True, alerts=True), forecast)
+            views[name] = split_views(forecast)
+    return views
+
+
+def peek_views(location, days=None, refresh_stale=False):
+    """Views for location if it is already cached, else None.
+
+    Never blocks; with refresh_stale, a stale entry is refreshed in the background.
+    """
+    forecast = peek_forecast(location, days, refresh_stale)
+    return split_views(forecast) if forecast is not None else None
+
+
+def peek_forecast(location, days=None, refresh_stale=False):
+    """The cached model.Forecast for location, or None; see peek_views"""
+    days = days or config.FORECAST_DAYS
+    loader = (lambda: load_forecast(location, days)) if refresh_stale else None
+    return response_cache.peek(cache_key("forecast", location, days=days, aqi=True, alerts=True), loader=loader)
+
+
+def load_forecast(location, days):
+    """fetch_combined decoded into a model.Forecast, as stored in the shared cache"""
+    return model.decode(fetch_combined(location, days))
+
+
+def split_views(forecast):
+    """Split a cached model.Forecast into the views the dashboard renders.
+
+    The views share the forecast's objects, nothing is copied: ``current``
+    is the forecast itself (read for ``.location`` and ``.current``),
+    ``forecast`` is it too unless it has no forecast days (then None),
+    ``hourly`` the hourly series, ``daily`` the forecast days and ``alerts``
+    the alerts.
+    """
+    return {
+        "current": forecast,
+        "forecast": forecast if forecast.has_forecast else None,
+        "hourly": forecast.hourly,
+        "daily": forecast.days,
+        "alerts": forecast.alerts,
+    }
+
+
+def get_views(location, days=None, fetch_inline=False):
+    """Current/hourly/daily/alerts views for location from one cached request.
+
+    With fetch_inline, a cold location is fetched on the calling thread even
+    while the prefetch scheduler runs (used by pooled multi-province views).
+    """
+    days = days or config.FORECAST_DAYS
+    key = cache_key("forecast", location, days=days, aqi=True, alerts=True)
+    loader = lambda: load_forecast(location, days)
+    if fetch_inline:
+        return split_views(response_cache.get(key, loader))
+    return split_views(_read(key, location, loader))
+
+
+def get_current(location):
+    """Current conditions for location, served from the shared cache"""
+    scheduler = prefetch_scheduler()
+    if scheduler is not None:
+        scheduler.record_access(location)
+    return get_views(location)["current"]
+
+
+def get_forecast(location, days=None):
+    """Forecast for location, served from the shared cache"""
+    return get_views(location, days)["forecast"]
+
+
+def warm(location):
+    """Refresh every payload the dashboard needs for location"""
+    days = config.FORECAST_DAYS
+    response_cache.refresh(cache_key("forecast", location, days=days, aqi=True, alerts=True),
+                           lambda: load_forecast(location, days))
+
+
+def warm_many(locations):
+    """Refresh several locations, in one bulk request when the plan allows.
+
+    Returns {location: exception} for the locations that failed.
+    """
+    if bulk_available() and len(locations) >= config.BULK_MIN_LOCATIONS:
+        try:
+            results = load_bulk({location: location for location in locations})
+        except BulkUnsupported:
+            # Fall back to single requests, spread out again from the next pass
+            if _scheduler is not None:
+                _scheduler.batch_size = 1
+        else:
+            return {location: result for location, result in results.items() if isinstance(result, Exception)}
+
+    errors = {}
+    for location in locations:
+        try:
+            warm(location)
+        except Exception as e:
+            errors[location] = e
+    return errors
+
+
+def start_prefetch():
+    """Start the per-process prefetch scheduler once; later calls are no-ops"""
+    global _scheduler
+    if not config.PREFETCH_ENABLED:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PrefetchScheduler(
+                VIETNAMESE_PROVINCES.values(),
+                warm,
+                refresh_many=warm_many,
+                batch_size=config.BULK_BATCH_SIZE if bulk_available() else 1,
+                interval=config.PREFETCH_INTERVAL,
+                seed=[VIETNAMESE_PROVINCES[name] for name in POPULAR_PROVINCES],
+                stretch=quota_limiter.stretch if config.QUOTA_ENABLED else None,
+            )
+        _scheduler.start()
+    return _scheduler
+
+
+def prefetch_scheduler():
+    """The running scheduler, or None when prefetch is disabled or not started"""
+    return _scheduler if _scheduler is not None and _scheduler.running else None
+
+
+def _record(payload, location):
+    # Queued for the background writer; costs nothing on the render path
+    if observation_store is not None:
+        observation_store.record(payload, location)
+
+
+def _read(key, location, loader):
+    # With the scheduler running, page views only read the warmed store; a cold
+    # location is handed to the scheduler thread instead of fetched inline, and
+    # a stale one is still refreshed in the background instead of waiting its turn.
+    scheduler = prefetch_scheduler()
+    if scheduler is None or key[2] != config.FORECAST_DAYS:
+        return response_cache.get(key, loader)
+    value = response_cache.peek(key, loader=loader)
+    if value is None:
+        try:
+            scheduler.request(location, timeout=config.PREFETCH_WAIT)
+        except Exception:
+            value = response_cache.fallback(key)
+            if value is None:
+                raise
+            return value
+        value = response_cache.peek(key)
+        if value is not None:
+            response_cache.note_outcome("prefetch_wait")
+    if value is None:
+        return response_cache.get(key, loader)
+    return value
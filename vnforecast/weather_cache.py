@@ -0,0 +1,217 @@
+"""Process-wide TTL cache for WeatherAPI payloads with stale-while-revalidate."""
+import threading
+import time
+from collections import OrderedDict
+
+from vnforecast import config
+from vnforecast.quota import quota_limiter
+from vnforecast.singleflight import SingleFlight
+
+
+class _Entry:
+    __slots__ = ("value", "fetched_at", "expires_at", "stale_until")
+
+    def __init__(self, value, fetched_at, expires_at, stale_until):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+
+class ResponseCache:
+    """Bounded LRU cache shared by all sessions in the server process.
+
+    Entries expire when WeatherAPI is expected to publish a newer observation
+    (``last_updated_epoch`` + update interval, clamped to [min_ttl, max_ttl]).
+    Expired entries are still served for ``stale_ttl`` seconds while a single
+    background thread refreshes them. Concurrent misses and refreshes of the
+    same key share one upstream call. Past that window an entry stays in the
+    LRU as the last good value, returned only when a load fails.
+
+    ``stretch``, if given, is called when an entry is stored and returns a
+    factor >= 1 applied to the interval, the TTL bounds and the stale
+    window, so entries live longer while the call budget is under pressure.
+    """
+
+    def __init__(self, max_entries=512, update_interval=900, min_ttl=60, max_ttl=1800,
+                 stale_ttl=3600, clock=time.time, stretch=None):
+        self.max_entries = max_entries
+        self.update_interval = update_interval
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._stretch = stretch
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._flights = SingleFlight()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "evictions": 0,
+            "upstream_calls": 0,
+            "fallbacks": 0,
+        }
+
+    def ttl_for(self, payload, now=None, stretch=1.0):
+        """Seconds until WeatherAPI is expected to have a newer observation (times stretch)"""
+        now = self._clock() if now is None else now
+        interval = self.update_interval * stretch
+        min_ttl, max_ttl = self.min_ttl * stretch, self.max_ttl * stretch
+        last_updated = getattr(getattr(payload, "current", None), "last_updated_epoch", None)
+        if last_updated is None:
+            return min(max(interval, min_ttl), max_ttl)
+        ttl = last_updated + interval - now
+        return min(max(ttl, min_ttl), max_ttl)
+
+    def get(self, key, loader):
+        """Return the cached value for key, calling loader() on a miss.
+
+        Errors raised by loader on a miss propagate to the caller (and to every
+        caller coalesced onto the same load) unless an older value for key is
+        still held, which is returned instead (outcome "fallback"); errors in
+        a background refresh are counted and the stale value is kept.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now < entry.expires_at:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._local.outcome = "hit"
+                    return entry.value
+                if now < entry.stale_until:
+                    self._entries.move_to_end(key)
+                    self._stats["stale"] += 1
+                    self._local.outcome = "stale"
+                    self._start_refresh(key, loader)
+                    return entry.value
+            self._stats["misses"] += 1
+            self._local.outcome = "miss"
+
+        try:
+            return self._flights.do(key, lambda: self._load(key, loader))
+        except Exception:
+            value = self.fallback(key)
+            if value is None:
+                raise
+            return value
+
+    def fallback(self, key):
+        """The last value stored under key however old it is, or None; for when loading failed"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._stats["fallbacks"] += 1
+            self._local.outcome = "fallback"
+            return entry.value
+
+    def peek(self, key, allow_stale=True, loader=None):
+        """Return the cached value without loading, or None.
+
+        With loader, a stale value also starts a background refresh, as get()
+        does, so a caller that must not block still keeps the entry current.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.expires_at:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                self._local.outcome = "hit"
+                return entry.value
+            if allow_stale and entry is not None and now < entry.stale_until:
+                self._entries.move_to_end(key)
+                self._stats["stale"] += 1
+                self._local.outcome = "stale"
+                if loader is not None:
+                    self._start_refresh(key, loader)
+                return entry.value
+            self._stats["misses"] += 1
+            self._local.outcome = "miss"
+            return None
+
+    def last_outcome(self):
+        """Outcome of this thread's most recent lookup: "hit", "stale", "miss", "fallback" or None"""
+        return getattr(self._local, "outcome", None)
+
+    def note_outcome(self, outcome):
+        """Override what last_outcome() reports for this thread (e.g. a wait on the prefetcher)"""
+        self._local.outcome = outcome
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entries"""
+        now = self._clock()
+        stretch = self._stretch() if self._stretch is not None else 1.0
+        expires_at = now + self.ttl_for(value, now, stretch)
+        entry = _Entry(value, now, expires_at, expires_at + self.stale_ttl * stretch)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def refresh(self, key, loader):
+        """Load key synchronously and store the result"""
+        return self._flights.do(key, lambda: self._load(key, loader))
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """Snapshot of hit/miss/stale counters and current size"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["size"] = len(self._entries)
+        snapshot["coalesced"] = self._flights.stats()["coalesced"]
+        lookups = snapshot["hits"] + snapshot["misses"] + snapshot["stale"]
+        snapshot["hit_rate"] = (snapshot["hits"] + snapshot["stale"]) / lookups if lookups else 0.0
+        return snapshot
+
+    def _start_refresh(self, key, loader):
+        # Called with self._lock held
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        self._stats["refreshes"] += 1
+        threading.Thread(target=self._refresh_worker, args=(key, loader), daemon=True).start()
+
+    def _load(self, key, loader):
+        with self._lock:
+            self._stats["upstream_calls"] += 1
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def _refresh_worker(self, key, loader):
+        try:
+            self.refresh(key, loader)
+        except Exception:
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+response_cache = ResponseCache(
+    max_entries=config.CACHE_MAX_ENTRIES,
+    update_interval=config.CACHE_UPDATE_INTERVAL,
+    min_ttl=config.CACHE_MIN_TTL,
+    max_ttl=config.CACHE_MAX_TTL,
+    stale_ttl=config.CACHE_STALE_TTL,
+    stretch=quota_limiter.stretch if config.QUOTA_ENABLED else None,
+)